@@ -0,0 +1,148 @@
+"""Ablation microbenchmark for the suffix-tree engine variants.
+
+Builds each variant on the same replayable corpus, measures speculate time
+per generated token (and per decode step), update time per inserted token
+and peak resident memory, and writes the results file that
+blog-post2/ablation/plot_ablation.py reads. Both plotted times are per
+token, so the two bar groups share one axis.
+
+``--histograms`` instruments each engine (suffix_decoding.instrument) and
+adds p50/p99/p999 columns of the per-call speculate and update latencies,
+plus the match length, draft length and nodes visited distributions to the
+results file. The wrappers add a little to every call, so the means of an
+instrumented run are not comparable to those of a plain one.
+
+Run from the repository root:
+
+    python -m benchmarks.ablation --out blog-post2/ablation/ablation_results.json
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import resource
+import sys
+from pathlib import Path
+
+from suffix_decoding import (CompressedSuffixTree, HashmapSuffixTree, LinkedSuffixTree,
+                             MemoSuffixTree, SuffixArrayEngine, SuffixTree, load_corpus, replay,
+                             synthetic_corpus)
+from suffix_decoding.instrument import instrument
+
+DEFAULT_OUT = Path(__file__).resolve().parents[1] / "blog-post2" / "ablation" / "ablation_results.json"
+
+# (name, plot label, engine factory), in the order the figure shows them.
+VARIANTS = [
+    ("baseline", "Baseline", lambda max_depth: SuffixTree(max_depth)),
+    ("hashmap", "+Custom Hashmap", lambda max_depth: HashmapSuffixTree(max_depth)),
+    ("linked", "+Custom Hashmap\n+Double Linked List", lambda max_depth: LinkedSuffixTree(max_depth)),
+    ("compressed", "Path-compressed\nzero-copy edges", lambda max_depth: CompressedSuffixTree(max_depth)),
+    ("memo", "+Custom Hashmap\n+Memoized paths", lambda max_depth: MemoSuffixTree(max_depth)),
+    ("suffix_array", "Suffix array\n+LCP, delta", lambda max_depth: SuffixArrayEngine(max_depth)),
+]
+# The variants in the published figure.
+DEFAULT_VARIANTS = ["baseline", "hashmap", "linked"]
+
+
+def _current_rss_kb() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() // 1024
+
+
+def _peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _run_variant(name, corpus, max_depth, max_spec_tokens, min_token_prob, incremental,
+                 histograms=False):
+    """Build and replay one variant; runs in a fresh process for clean RSS."""
+    factory = dict((n, f) for n, _, f in VARIANTS)[name]
+    try:
+        rss_before = _current_rss_kb()
+    except OSError:
+        rss_before = _peak_rss_kb()
+    engine = factory(max_depth)
+    calls = instrument(engine) if histograms else None
+    stats = replay(engine, corpus, max_spec_tokens, min_token_prob, incremental)
+    row = {
+        "spec_us_per_token": stats.spec_us_per_token,
+        "spec_us_per_step": stats.spec_us,
+        "update_us": stats.update_us,
+        "memory_mb": (_peak_rss_kb() - rss_before) / 1024,
+        "tokens_per_step": stats.tokens_per_step,
+        "num_nodes": engine.num_nodes,
+        "steps": stats.steps,
+        "update_tokens": stats.update_tokens,
+    }
+    if calls is not None:
+        row["histograms"] = calls.snapshot()
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", type=Path, default=None,
+                        help="JSONL corpus with prompt/response token IDs; "
+                             "a seeded synthetic corpus is used if omitted")
+    parser.add_argument("--num-requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-depth", type=int, default=64)
+    parser.add_argument("--max-spec-tokens", type=int, default=32)
+    parser.add_argument("--min-token-prob", type=float, default=0.1)
+    parser.add_argument("--incremental", action="store_true",
+                        help="keep a per-request match pointer instead of "
+                             "re-matching the context from the root every step")
+    parser.add_argument("--variants", nargs="+", default=DEFAULT_VARIANTS,
+                        choices=[v[0] for v in VARIANTS])
+    parser.add_argument("--histograms", action="store_true",
+                        help="record per-call latency percentiles and match/draft distributions")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT)
+    args = parser.parse_args()
+
+    if args.corpus is not None:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = synthetic_corpus(args.num_requests, seed=args.seed)
+
+    labels = {n: label for n, label, _ in VARIANTS}
+    ctx = mp.get_context("spawn")
+    results = []
+    for name in args.variants:
+        with ctx.Pool(1) as pool:
+            row = pool.apply(_run_variant, (name, corpus, args.max_depth,
+                                            args.max_spec_tokens, args.min_token_prob,
+                                            args.incremental, args.histograms))
+        row = {"name": name, "label": labels[name], **row}
+        results.append(row)
+        label = labels[name].replace("\n", " ")
+        print(f"{label:<40} spec {row['spec_us_per_token']:8.2f} us/token  "
+              f"update {row['update_us']:6.2f} us/token  mem {row['memory_mb']:7.1f} MB  "
+              f"{row['tokens_per_step']:.2f} tok/step")
+        if args.histograms:
+            h = row["histograms"]
+            spec, update = h["speculate_ns"], h["update_ns"]
+            print(f"{'':<40} spec p50/p99/p999 {spec['p50'] / 1e3:.1f}/{spec['p99'] / 1e3:.1f}/"
+                  f"{spec['p999'] / 1e3:.1f} us  update p50/p99/p999 {update['p50'] / 1e3:.1f}/"
+                  f"{update['p99'] / 1e3:.1f}/{update['p999'] / 1e3:.1f} us  "
+                  f"match p50 {h['match_len']['p50']}  nodes p50/p99 "
+                  f"{h['nodes_visited']['p50']}/{h['nodes_visited']['p99']}")
+
+    config = {
+        "corpus": str(args.corpus) if args.corpus else f"synthetic(seed={args.seed})",
+        "num_requests": len(corpus),
+        "max_depth": args.max_depth,
+        "max_spec_tokens": args.max_spec_tokens,
+        "min_token_prob": args.min_token_prob,
+        "incremental": args.incremental,
+        "histograms": args.histograms,
+    }
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump({"config": config, "variants": results}, f, indent=2)
+    print(f"Saved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
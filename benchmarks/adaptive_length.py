@@ -0,0 +1,75 @@
+"""Fixed vs adaptive per-request speculation length.
+
+Replays a corpus with a fixed draft length (32 in every experiment of
+blog-post2/results_summary.md) and with AdaptiveSpecLength controllers,
+reports accepted and wasted (verified but rejected) draft tokens per step,
+and feeds the recorded traces to the offline TPOT simulator.
+
+Run from the repository root:
+
+    python -m benchmarks.adaptive_length --gains 1 1.5 2 --confident-prob 0.8
+"""
+
+import argparse
+from pathlib import Path
+
+from suffix_decoding import (AdaptiveSpecLength, LinearStepModel, LinkedSuffixTree, SpecCostModel,
+                             load_corpus, replay, simulate_tpot, synthetic_corpus, vanilla_trace)
+from suffix_decoding.latency import SPECBENCH_VANILLA_TPOT
+from suffix_decoding.simulator import format_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--num-requests", type=int, default=100,
+                        help="synthetic requests; raised to the largest --concurrency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", type=float, default=0.2)
+    parser.add_argument("--max-depth", type=int, default=32)
+    parser.add_argument("--max-spec-tokens", type=int, default=32)
+    parser.add_argument("--min-token-prob", type=float, default=0.1)
+    parser.add_argument("--gains", type=float, nargs="+", default=[1.0, 1.5, 2.0])
+    parser.add_argument("--alpha", type=float, default=0.3)
+    parser.add_argument("--confident-prob", type=float, default=0.8,
+                        help="path probability that overrides the limit; <= 0 disables")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--spec-cost-scale", type=float, default=1.0,
+                        help="multiply measured drafting cost in the TPOT simulation")
+    args = parser.parse_args()
+
+    corpus = (load_corpus(args.corpus) if args.corpus
+              else synthetic_corpus(max(args.num_requests, *args.concurrency), noise=args.noise,
+                                    seed=args.seed))
+    confident = args.confident_prob if args.confident_prob > 0 else None
+    policies = {f"fixed-{args.max_spec_tokens}": None}
+    for gain in args.gains:
+        policies[f"adaptive (gain={gain:g})"] = AdaptiveSpecLength(
+            alpha=args.alpha, gain=gain, max_tokens=args.max_spec_tokens, confident_prob=confident)
+
+    print(f"{'policy':<22} {'spec us':>8} {'tok/step':>9} {'draft/step':>11} "
+          f"{'wasted/step':>12} {'wasted %':>9}")
+    traces = {}
+    for label, controller in policies.items():
+        trace = []
+        stats = replay(LinkedSuffixTree(args.max_depth), corpus, args.max_spec_tokens,
+                       args.min_token_prob, incremental=True, trace=trace, spec_length=controller)
+        traces[label] = (trace, stats.spec_us * args.spec_cost_scale)
+        steps = max(stats.steps, 1)
+        wasted = stats.draft_tokens - stats.accepted_tokens
+        print(f"{label:<22} {stats.spec_us:>8.1f} {stats.tokens_per_step:>9.2f} "
+              f"{stats.draft_tokens / steps:>11.2f} {wasted / steps:>12.2f} "
+              f"{wasted / max(stats.draft_tokens, 1):>9.1%}")
+
+    step_model = LinearStepModel.fit(list(SPECBENCH_VANILLA_TPOT), list(SPECBENCH_VANILLA_TPOT.values()))
+    first = next(iter(traces.values()))[0]
+    rows = {"vanilla": [simulate_tpot(vanilla_trace(first), c, step_model) for c in args.concurrency]}
+    for label, (trace, spec_us) in traces.items():
+        rows[label] = [simulate_tpot(trace, c, step_model, SpecCostModel(spec_us))
+                       for c in args.concurrency]
+    print()
+    print(format_table("Simulated", rows, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Per-step speculation cost of speculate_batch() versus a speculate_seq() loop.
+
+Builds a tree from the first half of a corpus, then positions ``batch_size``
+requests from the second half at random decode offsets and times one engine
+step of drafting for all of them, both ways. Both end with the drafts in a
+BatchDraft buffer, ready for verification: the loop writes each draft with
+BatchDraft.write_row(). ``--shared-frac`` of the batch
+replays another slot's request and offset, standing in for concurrent
+requests that follow the same template. Reported times are medians.
+
+Run from the repository root:
+
+    python -m benchmarks.batch --batch-sizes 1 4 16 64
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from suffix_decoding import BatchDraft, LinkedSuffixTree, load_corpus, synthetic_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", default=None)
+    parser.add_argument("--num-requests", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-depth", type=int, default=64)
+    parser.add_argument("--max-spec-tokens", type=int, default=32)
+    parser.add_argument("--min-token-prob", type=float, default=0.1)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--shared-frac", type=float, default=0.25)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.num_requests, seed=args.seed)
+    half = len(corpus) // 2
+    engine = LinkedSuffixTree(args.max_depth)
+    for seq_id, req in enumerate(corpus[:half]):
+        engine.extend(seq_id, req.prompt + req.response)
+        engine.finish(seq_id)
+
+    rng = random.Random(args.seed)
+    queries = corpus[half:]
+    print(f"{'batch':>6} {'loop us/step':>14} {'batched us/step':>16} {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        seq_ids = list(range(10**6, 10**6 + batch_size))
+        prefixes = []
+        for seq_id in seq_ids:
+            if prefixes and rng.random() < args.shared_frac:
+                prefix = rng.choice(prefixes)
+            else:
+                req = rng.choice(queries)
+                tokens = req.prompt + req.response
+                prefix = tokens[:rng.randrange(len(req.prompt), len(tokens))]
+            prefixes.append(prefix)
+            engine.advance(seq_id, prefix)
+        out = BatchDraft.allocate(batch_size, args.max_spec_tokens)
+
+        loop_times, batch_times = [], []
+        for _ in range(args.repeats):
+            t0 = time.perf_counter()
+            for i, seq_id in enumerate(seq_ids):
+                out.write_row(i, engine.speculate_seq(seq_id, args.max_spec_tokens,
+                                                      args.min_token_prob))
+            loop_times.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            engine.speculate_batch(seq_ids, args.max_spec_tokens, args.min_token_prob, out)
+            batch_times.append(time.perf_counter() - t0)
+        loop_us = 1e6 * statistics.median(loop_times)
+        batch_us = 1e6 * statistics.median(batch_times)
+
+        print(f"{batch_size:>6} {loop_us:>14.1f} {batch_us:>16.1f} {loop_us / batch_us:>7.2f}x")
+        for seq_id in seq_ids:
+            engine.finish(seq_id)
+
+
+if __name__ == "__main__":
+    main()
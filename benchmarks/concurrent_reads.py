@@ -0,0 +1,164 @@
+"""Speculate latency under write load: one lock vs snapshot-isolated reads.
+
+A writer thread inserts a corpus the way a decode loop at fixed
+concurrency would, one batch of accepted tokens per step, while reader
+threads draft for random contexts. With ``locked`` one lock guards a
+single tree; with ``left-right`` readers use ConcurrentSuffixTree. Reports
+speculate latency percentiles per mode.
+
+``--check`` turns the run into a stress test: every read asserts that the
+tree it pinned holds exactly the tokens of its version and does not change
+while pinned, and at the end the two replicas must be identical. Exits
+non-zero on any violation.
+
+Run from the repository root:
+
+    python -m benchmarks.concurrent_reads --readers 4 --check
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from suffix_decoding import LinkedSuffixTree, load_corpus, synthetic_corpus
+from suffix_decoding.concurrent import ConcurrentSuffixTree
+
+
+class LockedTree:
+    """Baseline: one lock around one tree, with the ConcurrentSuffixTree interface."""
+
+    def __init__(self, engine):
+        self._engine = engine
+        self._lock = threading.Lock()
+        self.version = 0
+
+    @contextmanager
+    def read(self):
+        with self._lock:
+            yield self.version, self._engine
+
+    def apply(self, updates, finished=()):
+        with self._lock:
+            for seq_id, tokens in updates:
+                self._engine.extend(seq_id, tokens)
+            for seq_id in finished:
+                self._engine.finish(seq_id)
+            self.version += 1
+            return self.version
+
+
+def batches(corpus, concurrency, step_tokens):
+    """Yield ``(updates, finished)`` per decode step."""
+    streams = [list(req.prompt) + list(req.response) for req in corpus]
+    pending = iter(range(len(streams)))
+    running = {}
+    while True:
+        while len(running) < concurrency:
+            seq_id = next(pending, None)
+            if seq_id is None:
+                break
+            running[seq_id] = 0
+        if not running:
+            return
+        updates, finished = [], []
+        for seq_id, pos in list(running.items()):
+            chunk = streams[seq_id][pos:pos + step_tokens]
+            updates.append((seq_id, chunk))
+            if pos + len(chunk) >= len(streams[seq_id]):
+                finished.append(seq_id)
+                del running[seq_id]
+            else:
+                running[seq_id] = pos + len(chunk)
+        yield updates, finished
+
+
+def run(tree, corpus, contexts, args) -> tuple[np.ndarray, list[str]]:
+    expected = {0: 0}  # version -> root count (tokens inserted)
+    errors: list[str] = []
+    latencies: list[list[float]] = [[] for _ in range(args.readers)]
+    done = threading.Event()
+
+    def writer():
+        total = 0
+        for updates, finished in batches(corpus, args.concurrency, args.step_tokens):
+            total += sum(len(tokens) for _, tokens in updates)
+            expected[tree.version + 1] = total
+            tree.apply(updates, finished)
+        done.set()
+
+    def reader(idx):
+        rng = random.Random(idx)
+        clock = time.perf_counter
+        while not done.is_set():
+            ctx = rng.choice(contexts)
+            t0 = clock()
+            with tree.read() as (version, engine):
+                before = engine._count[0]
+                engine.speculate(ctx, args.max_spec_tokens, args.min_token_prob)
+                after = engine._count[0]
+            latencies[idx].append(clock() - t0)
+            if args.check and not before == after == expected[version]:
+                errors.append(f"version {version}: root count {before} -> {after}, "
+                              f"expected {expected[version]}")
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return np.array([x for lat in latencies for x in lat]) * 1e6, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--num-requests", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-depth", type=int, default=32)
+    parser.add_argument("--max-spec-tokens", type=int, default=32)
+    parser.add_argument("--min-token-prob", type=float, default=0.1)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--step-tokens", type=int, default=4)
+    parser.add_argument("--modes", nargs="+", choices=["locked", "left-right"],
+                        default=["locked", "left-right"])
+    parser.add_argument("--check", action="store_true",
+                        help="assert snapshot consistency on every read")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.num_requests, seed=args.seed)
+    contexts = [(list(req.prompt) + list(req.response[:p]))[-args.max_depth:]
+                for req in corpus for p in range(0, len(req.response), 32)]
+
+    print(f"{'mode':<11} {'reads':>8} {'p50 us':>9} {'p99 us':>9} {'p999 us':>9} {'max us':>9}")
+    failed = False
+    for mode in args.modes:
+        if mode == "locked":
+            tree = LockedTree(LinkedSuffixTree(args.max_depth))
+        else:
+            tree = ConcurrentSuffixTree(lambda: LinkedSuffixTree(args.max_depth))
+        lat, errors = run(tree, corpus, contexts, args)
+        p50, p99, p999 = np.percentile(lat, [50, 99, 99.9]) if lat.size else (0, 0, 0)
+        print(f"{mode:<11} {lat.size:>8} {p50:>9.1f} {p99:>9.1f} {p999:>9.1f} {lat.max(initial=0):>9.1f}")
+        if args.check and mode == "left-right":
+            tree.apply([])  # Bring both replicas to the same version.
+            a, b = tree._replicas
+            if a._count != b._count or a._child1 != b._child1 or a._link != b._link:
+                errors.append("replicas differ after the final batch")
+        for err in errors[:10]:
+            print(f"  {mode}: {err}")
+        failed |= bool(errors)
+    if args.check:
+        print("check: FAILED" if failed else "check: OK")
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
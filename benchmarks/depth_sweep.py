@@ -0,0 +1,88 @@
+"""Sweep the suffix-tree depth and recommend one per concurrency band.
+
+Replays a token trace at each depth and concurrency level, measures the
+speculation cost and accepted tokens per step, and predicts TPOT with a
+step-latency model fitted to the vanilla TPOT column of
+blog-post2/results_summary.md. The recommended depth per concurrency is
+the one with the lowest predicted TPOT; the bands are written in the
+format suffix_decoding.DepthSchedule.load() reads.
+
+Run from the repository root:
+
+    python -m benchmarks.depth_sweep --depths 16 24 32 48 64 --out depth_bands.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from suffix_decoding import (LinearStepModel, LinkedSuffixTree, load_corpus, predict_tpot_ms,
+                             replay_concurrent, synthetic_corpus)
+from suffix_decoding.latency import SPECBENCH_VANILLA_TPOT
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--num-requests", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--depths", type=int, nargs="+", default=[16, 24, 32, 48, 64])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--max-spec-tokens", type=int, default=32)
+    parser.add_argument("--min-token-prob", type=float, default=0.1)
+    parser.add_argument("--use-cap", action="store_true",
+                        help="build one tree at the largest depth and sweep the "
+                             "runtime depth cap instead of rebuilding per depth")
+    parser.add_argument("--spec-cost-scale", type=float, default=1.0,
+                        help="multiply measured speculation time, e.g. to project "
+                             "this Python engine onto a native implementation")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.num_requests, seed=args.seed)
+    model = LinearStepModel.fit(list(SPECBENCH_VANILLA_TPOT), list(SPECBENCH_VANILLA_TPOT.values()))
+
+    rows = []
+    print(f"{'depth':>5} {'conc':>5} {'spec us/step':>13} {'tok/step':>9} {'draft/step':>11} {'TPOT ms':>8}")
+    for depth in args.depths:
+        for concurrency in args.concurrency:
+            if args.use_cap:
+                engine = LinkedSuffixTree(max(args.depths))
+                engine.set_depth_cap(depth)
+            else:
+                engine = LinkedSuffixTree(depth)
+            stats = replay_concurrent(engine, corpus, concurrency,
+                                      args.max_spec_tokens, args.min_token_prob)
+            spec_ms = args.spec_cost_scale * stats.spec_us / 1000
+            draft_per_step = stats.draft_tokens / max(stats.steps, 1)
+            tpot = predict_tpot_ms(model, concurrency, stats.tokens_per_step,
+                                   draft_per_step, spec_ms)
+            rows.append({
+                "depth": depth,
+                "concurrency": concurrency,
+                "spec_us": stats.spec_us,
+                "tokens_per_step": stats.tokens_per_step,
+                "draft_tokens_per_step": draft_per_step,
+                "tpot_ms": tpot,
+            })
+            print(f"{depth:>5} {concurrency:>5} {stats.spec_us:>13.1f} "
+                  f"{stats.tokens_per_step:>9.2f} {draft_per_step:>11.2f} {tpot:>8.2f}")
+
+    bands = []
+    print("\nRecommended depth per concurrency band:")
+    for concurrency in args.concurrency:
+        best = min((r for r in rows if r["concurrency"] == concurrency), key=lambda r: r["tpot_ms"])
+        bands.append([concurrency, best["depth"]])
+        print(f"  concurrency >= {concurrency:<3}: depth {best['depth']} "
+              f"(predicted TPOT {best['tpot_ms']:.2f} ms)")
+
+    if args.out is not None:
+        with open(args.out, "w") as f:
+            json.dump({"bands": bands, "rows": rows,
+                       "step_model": {"base_ms": model.base_ms, "ms_per_token": model.ms_per_token}},
+                      f, indent=2)
+        print(f"Saved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Acceptance vs node budget for the memory-bounded suffix tree.
+
+Replays one long trace through an unbounded tree to find how many nodes
+(or bytes, with ``--unit bytes``) it needs, then through BoundedSuffixTree
+at fractions of that size under each eviction policy, and reports tokens
+per step, acceptance rate, evictions and per-token cost at each budget.
+It also reports how many times a sequence's state was dropped because
+pinned nodes alone exceeded the budget.
+
+Run from the repository root:
+
+    python -m benchmarks.eviction --fractions 1 0.5 0.25 0.1 --policies lru decay --out eviction.json
+    python -m benchmarks.eviction --unit bytes --fractions 0.5 0.25
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from suffix_decoding import BoundedSuffixTree, LinkedSuffixTree, load_corpus, replay, synthetic_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--num-requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-depth", type=int, default=32)
+    parser.add_argument("--max-spec-tokens", type=int, default=32)
+    parser.add_argument("--min-token-prob", type=float, default=0.1)
+    parser.add_argument("--fractions", type=float, nargs="+", default=[1.0, 0.5, 0.25, 0.1, 0.05],
+                        help="budgets as fractions of the unbounded tree's size")
+    parser.add_argument("--unit", choices=["nodes", "bytes"], default="nodes",
+                        help="budget live nodes (max_nodes) or bytes (max_bytes, against "
+                             "the unbounded tree's memory_report total)")
+    parser.add_argument("--policies", nargs="+", choices=["lru", "decay"], default=["lru", "decay"])
+    parser.add_argument("--half-life", type=float, default=None,
+                        help="decay half-life in tokens (default: a tenth of the trace)")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.num_requests, seed=args.seed)
+    total_tokens = sum(len(r.prompt) + len(r.response) for r in corpus)
+    half_life = args.half_life or total_tokens / 10
+
+    def run(engine):
+        stats = replay(engine, corpus, args.max_spec_tokens, args.min_token_prob, incremental=True)
+        return {
+            "live_nodes": engine.num_nodes,
+            "evicted": getattr(engine, "evicted", 0),
+            "live_bytes": getattr(engine, "num_bytes", None) or engine.memory_report().total,
+            "dropped": getattr(engine, "dropped", 0),
+            "tokens_per_step": stats.tokens_per_step,
+            "accept_rate": stats.accepted_tokens / max(stats.draft_tokens, 1),
+            "spec_us": stats.spec_us,
+            "update_us": stats.update_us,
+        }
+
+    print(f"{'policy':<9} {'budget':>10} {'live':>9} {'live bytes':>11} {'dropped':>8} {'evicted':>9} "
+          f"{'tok/step':>9} {'accept rate':>12} {'spec us':>8} {'update us':>10}")
+
+    def show(policy, budget, row):
+        print(f"{policy:<9} {budget:>10} {row['live_nodes']:>9} {row['live_bytes']:>11} "
+              f"{row['dropped']:>8} {row['evicted']:>9} {row['tokens_per_step']:>9.2f} {row['accept_rate']:>12.2%} "
+              f"{row['spec_us']:>8.1f} {row['update_us']:>10.2f}")
+
+    full = run(LinkedSuffixTree(args.max_depth))
+    full_size = full["live_nodes"] if args.unit == "nodes" else full["live_bytes"]
+    rows = [{"policy": "none", "budget": full_size, **full}]
+    show("none", full_size, full)
+    for policy in args.policies:
+        for fraction in args.fractions:
+            if args.unit == "nodes":
+                budget = max(2, int(full_size * fraction))
+                limits = {"max_nodes": budget}
+            else:
+                budget = int(full_size * fraction)
+                limits = {"max_nodes": None, "max_bytes": budget}
+            row = run(BoundedSuffixTree(args.max_depth, policy=policy, half_life=half_life, **limits))
+            rows.append({"policy": policy, "budget": budget, "fraction": fraction, **row})
+            show(policy, budget, row)
+
+    if args.out is not None:
+        config = {
+            "corpus": str(args.corpus) if args.corpus else f"synthetic(seed={args.seed})",
+            "num_requests": len(corpus),
+            "total_tokens": total_tokens,
+            "max_depth": args.max_depth,
+            "max_spec_tokens": args.max_spec_tokens,
+            "min_token_prob": args.min_token_prob,
+            "half_life": half_life,
+            "unit": args.unit,
+        }
+        with open(args.out, "w") as f:
+            json.dump({"config": config, "rows": rows}, f, indent=2)
+        print(f"Saved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Build every figure, re-rendering only those whose inputs changed.
+
+Finds the plot scripts (blog-post2/*/plot_*.py and
+poster_and_slides/neurips_presentation/*.py) and runs the stale ones in a
+process pool, each in its own directory with the Agg backend. A script is
+up to date when its fingerprint matches the last build and its outputs are
+unchanged on disk. The fingerprint hashes:
+
+- the script source, the matplotlib version and the active matplotlibrc
+  (the style);
+- every file the script opened for reading, plus the data files (.json,
+  .npz, .csv) next to it, so a results file appearing later is noticed;
+- the values of the results-store cells it read (ResultsStore.mean), not the
+  whole store, so adding a trial only rebuilds the figures that show it.
+
+Dependencies and outputs are recorded while the script runs and kept in
+``.figure_cache.json`` at the repository root.
+
+Run from the repository root:
+
+    python -m benchmarks.figures --jobs 4
+"""
+
+import argparse
+import builtins
+import contextlib
+import hashlib
+import io
+import json
+import math
+import os
+import runpy
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+PATTERNS = ["blog-post2/*/plot_*.py", "poster_and_slides/neurips_presentation/*.py"]
+CACHE = ROOT / ".figure_cache.json"
+DATA_SUFFIXES = {".json", ".npz", ".csv"}
+
+
+def find_scripts() -> list[Path]:
+    return sorted(p for pattern in PATTERNS for p in ROOT.glob(pattern))
+
+
+def _sha256(path: Path) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    except OSError:
+        return None
+
+
+def _rel(path: Path) -> str:
+    path = Path(path).resolve()
+    return str(path.relative_to(ROOT)) if path.is_relative_to(ROOT) else str(path)
+
+
+def _style() -> str:
+    import matplotlib
+    return f"{matplotlib.__version__}:{_sha256(Path(matplotlib.matplotlib_fname()))}"
+
+
+def fingerprint(script: Path, deps: dict) -> str:
+    """Hash of everything the figure depends on, given the recorded ``deps``."""
+    from suffix_decoding.results import Cell, ResultsStore
+
+    h = hashlib.sha256()
+    h.update(_style().encode())
+    h.update((_sha256(script) or "").encode())
+    data = {_rel(p) for p in script.parent.iterdir() if p.suffix in DATA_SUFFIXES}
+    for name in sorted(data | set(deps.get("files", []))):
+        h.update(f"{name}:{_sha256(ROOT / name)}".encode())
+    for store_path, reads in sorted(deps.get("store_reads", {}).items()):
+        store = ResultsStore(ROOT / store_path)
+        values = [store.mean(metric, Cell(*cell)) for *cell, metric in reads]
+        h.update(json.dumps([store_path, reads, [None if math.isnan(v) else v for v in values]]).encode())
+    return h.hexdigest()
+
+
+def _render(script: str) -> dict:
+    """Run one plot script, recording its outputs and dependencies (pool worker)."""
+    os.environ["MPLBACKEND"] = "Agg"
+    sys.path.insert(0, str(ROOT))
+    import matplotlib.figure
+    from suffix_decoding.results import ResultsStore
+
+    script = Path(script)
+    outputs: list[str] = []
+    files: set[str] = set()
+    store_reads: dict[str, set] = {}
+    real_open, real_savefig, real_mean = builtins.open, matplotlib.figure.Figure.savefig, ResultsStore.mean
+
+    def open_(file, mode="r", *args, **kwargs):
+        if isinstance(file, (str, os.PathLike)) and not any(c in mode for c in "wax+"):
+            path = Path(file).resolve()
+            if path.suffix != ".py" and path.is_relative_to(ROOT):
+                files.add(_rel(path))
+        return real_open(file, mode, *args, **kwargs)
+
+    def savefig(self, fname, *args, **kwargs):
+        outputs.append(_rel(Path(fname)))
+        return real_savefig(self, fname, *args, **kwargs)
+
+    def mean(self, metric, cell):
+        if self.path is not None:
+            store_reads.setdefault(_rel(self.path), set()).add((*cell, metric))
+        return real_mean(self, metric, cell)
+
+    cwd, argv = os.getcwd(), sys.argv
+    builtins.open, matplotlib.figure.Figure.savefig, ResultsStore.mean = open_, savefig, mean
+    log = io.StringIO()
+    t0 = time.perf_counter()
+    try:
+        os.chdir(script.parent)
+        sys.argv = [str(script)]
+        with contextlib.redirect_stdout(log):
+            runpy.run_path(str(script), run_name="__main__")
+        error = None
+    except BaseException:
+        error = traceback.format_exc()
+    finally:
+        builtins.open, matplotlib.figure.Figure.savefig, ResultsStore.mean = real_open, real_savefig, real_mean
+        os.chdir(cwd)
+        sys.argv = argv
+        import matplotlib.pyplot as plt
+        plt.close("all")
+    return {
+        "seconds": time.perf_counter() - t0,
+        "error": error,
+        "outputs": sorted(set(outputs)),
+        # Stores are tracked per cell read, not as whole files.
+        "deps": {"files": sorted(files - store_reads.keys()),
+                 "store_reads": {k: [list(r) for r in sorted(v)] for k, v in store_reads.items()}},
+    }
+
+
+def is_fresh(script: Path, entry: dict | None) -> bool:
+    if not entry or not entry["outputs"]:
+        return False
+    if any(_sha256(ROOT / out) != digest for out, digest in entry["outputs"].items()):
+        return False
+    return fingerprint(script, entry["deps"]) == entry["fingerprint"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--force", action="store_true", help="rebuild every figure")
+    parser.add_argument("--dry-run", action="store_true", help="list stale scripts only")
+    parser.add_argument("--only", nargs="+", default=None,
+                        help="build only scripts whose path contains one of these")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    cache = json.loads(CACHE.read_text()) if CACHE.exists() else {}
+    scripts = [s for s in find_scripts()
+               if args.only is None or any(o in _rel(s) for o in args.only)]
+    stale = [s for s in scripts if args.force or not is_fresh(s, cache.get(_rel(s)))]
+    for s in scripts:
+        print(f"{'stale' if s in stale else 'fresh':<6} {_rel(s)}")
+    if args.dry_run or not stale:
+        return
+
+    t0 = time.perf_counter()
+    failed = False
+    with ProcessPoolExecutor(min(args.jobs, len(stale)), mp_context=get_context("spawn")) as pool:
+        futures = {pool.submit(_render, str(s)): s for s in stale}
+        for future in as_completed(futures):
+            script = futures[future]
+            result = future.result()
+            if result["error"]:
+                failed = True
+                cache.pop(_rel(script), None)
+                print(f"FAILED {_rel(script)}\n{result['error']}")
+                continue
+            cache[_rel(script)] = {
+                "fingerprint": fingerprint(script, result["deps"]),
+                "deps": result["deps"],
+                "outputs": {out: _sha256(ROOT / out) for out in result["outputs"]},
+            }
+            print(f"built  {_rel(script)}: {len(result['outputs'])} outputs "
+                  f"in {result['seconds']:.1f} s")
+    CACHE.write_text(json.dumps(cache, indent=1, sort_keys=True))
+    print(f"{len(stale)} scripts in {time.perf_counter() - t0:.1f} s")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Sweep the suffix-score threshold of the hybrid dispatcher.
+
+Replays a corpus through HybridDispatcher (suffix tree plus the CPU stub
+drafter) at each threshold and reports how often the drafter ran and how
+often its draft was the one used, the measured CPU time of each path, the
+modeled drafter device time, accepted tokens per step and predicted TPOT.
+``inf`` runs the drafter every step like an always-on hybrid; ``0`` never
+runs it.
+
+The default corpus is the ``spec_bench`` workload, whose open-ended
+requests leave the suffix tree with weak matches often enough for the
+fallback to matter. The default drafter drafts from a tree built once from
+``--train-requests`` further requests of the same corpus, a stand-in for a
+draft model trained on similar traffic; ``--drafter ngram`` uses prompt
+lookup instead, which the suffix tree already covers, so its drafts are
+almost never used.
+
+The drafter runs batched on the device, so a step pays its device time if
+any request in the batch takes the model path.
+
+Run from the repository root:
+
+    python -m benchmarks.hybrid --thresholds 0 1 2 4 inf --log hybrid_steps.jsonl
+    python -m benchmarks.hybrid --workload synthetic --drafter ngram
+"""
+
+import argparse
+import json
+from dataclasses import asdict
+from pathlib import Path
+
+from suffix_decoding import (HybridDispatcher, LinearStepModel, LinkedSuffixTree, NgramProposer,
+                             StubDrafter, load_corpus, predict_tpot_ms, replay, synthetic_corpus)
+from suffix_decoding.latency import SPECBENCH_VANILLA_TPOT
+from suffix_decoding.workloads import WORKLOADS, workload_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--workload", choices=["synthetic", *sorted(WORKLOADS)], default="spec_bench",
+                        help="generated corpus when no --corpus is given")
+    parser.add_argument("--num-requests", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-depth", type=int, default=32)
+    parser.add_argument("--max-spec-tokens", type=int, default=32)
+    parser.add_argument("--min-token-prob", type=float, default=0.1)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0, 1, 2, 4, float("inf")])
+    parser.add_argument("--drafter", choices=["pretrained", "ngram"], default="pretrained")
+    parser.add_argument("--train-requests", type=int, default=100,
+                        help="requests the pretrained drafter is built from, taken from the end "
+                             "of the corpus (generated in addition to --num-requests)")
+    parser.add_argument("--drafter-token-prob", type=float, default=0.7)
+    parser.add_argument("--drafter-base-ms", type=float, default=0.2)
+    parser.add_argument("--drafter-ms-per-token", type=float, default=0.4)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--spec-cost-scale", type=float, default=1.0,
+                        help="multiply measured CPU drafting cost in the TPOT prediction")
+    parser.add_argument("--log", type=Path, default=None,
+                        help="write every DispatchStep as JSONL, tagged with its threshold")
+    args = parser.parse_args()
+
+    train = args.train_requests if args.drafter == "pretrained" else 0
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    elif args.workload == "synthetic":
+        corpus = synthetic_corpus(args.num_requests + train, seed=args.seed)
+    else:
+        corpus = workload_corpus(args.workload, args.num_requests + train, args.seed)
+    corpus, train_corpus = corpus[:len(corpus) - train], corpus[len(corpus) - train:]
+    pretrained = LinkedSuffixTree(args.max_depth)
+    for seq_id, req in enumerate(train_corpus):
+        pretrained.extend(seq_id, list(req.prompt) + list(req.response))
+        pretrained.finish(seq_id)
+    model = LinearStepModel.fit(list(SPECBENCH_VANILLA_TPOT), list(SPECBENCH_VANILLA_TPOT.values()))
+    log = open(args.log, "w") if args.log is not None else None
+
+    print(f"{'threshold':>9} {'model %':>8} {'used %':>7} {'suffix us':>10} {'drafter us':>11} {'drafter ms':>11} "
+          f"{'tok/step':>9} {'draft/step':>11} " + " ".join(f"{f'TPOT@{c}':>9}" for c in args.concurrency))
+    for threshold in args.thresholds:
+        # The pretrained tree is never extended, so every threshold shares it.
+        proposer = pretrained if args.drafter == "pretrained" else NgramProposer()
+        drafter = StubDrafter(proposer, args.drafter_token_prob,
+                              args.drafter_base_ms, args.drafter_ms_per_token)
+        engine = HybridDispatcher(LinkedSuffixTree(args.max_depth), drafter, threshold)
+        stats = replay(engine, corpus, args.max_spec_tokens, args.min_token_prob, incremental=True)
+
+        steps = engine.steps
+        n = max(len(steps), 1)
+        model_steps = [s for s in steps if s.path == "model"]
+        model_frac = len(model_steps) / n
+        used_frac = sum(s.source == "model" for s in steps) / n
+        suffix_us = sum(s.suffix_us for s in steps) / n
+        drafter_us = sum(s.drafter_us for s in steps) / n
+        drafter_ms = sum(s.drafter_ms for s in model_steps) / max(len(model_steps), 1)
+        draft_per_step = stats.draft_tokens / max(stats.steps, 1)
+        spec_ms = args.spec_cost_scale * stats.spec_us / 1000
+        tpots = []
+        for c in args.concurrency:
+            device_ms = (1 - (1 - model_frac) ** c) * drafter_ms
+            tpots.append(predict_tpot_ms(model, c, stats.tokens_per_step, draft_per_step, spec_ms)
+                         + device_ms / max(stats.tokens_per_step, 1e-9))
+        print(f"{threshold:>9} {model_frac:>8.1%} {used_frac:>7.1%} {suffix_us:>10.1f} {drafter_us:>11.1f} "
+              f"{drafter_ms:>11.2f} {stats.tokens_per_step:>9.2f} {draft_per_step:>11.2f} "
+              + " ".join(f"{t:>9.2f}" for t in tpots))
+        if log is not None:
+            for step in steps:
+                log.write(json.dumps({"threshold": threshold, **asdict(step)}) + "\n")
+
+    if log is not None:
+        log.close()
+        print(f"Saved: {args.log}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Memoized best-continuation paths: cache hit rate and invalidation cost.
+
+Replays the same corpus through HashmapSuffixTree, which scans every child
+table on each drafted token, and MemoSuffixTree, which caches the chain of
+best children per node and drops a cached path only when a best child along
+it changes. Reports speculate and update time for both, the cache hit rate
+of the drafts, and the invalidation cost: best-child changes on cached
+paths and paths dropped per inserted token, and nodes walked per change.
+The update time over the hashmap tree is the cost of keeping the best
+child of every node. ``--hot-repeats`` also times speculating on one hot
+context over and over, the case the cache is built for.
+
+Run from the repository root:
+
+    python -m benchmarks.memo --num-requests 200 --out memo.json
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from suffix_decoding import HashmapSuffixTree, MemoSuffixTree, load_corpus, replay, synthetic_corpus
+
+
+def _hot_us(engine, context, repeats, max_spec_tokens, min_token_prob) -> float:
+    """Mean speculate() time on the same context, in microseconds."""
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        engine.speculate(context, max_spec_tokens, min_token_prob)
+    return 1e6 * (time.perf_counter() - t0) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--num-requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-depth", type=int, default=64)
+    parser.add_argument("--max-spec-tokens", type=int, default=32)
+    parser.add_argument("--min-token-prob", type=float, default=0.1)
+    parser.add_argument("--incremental", action="store_true",
+                        help="match with advance() and suffix links instead of re-walking")
+    parser.add_argument("--hot-repeats", type=int, default=1000)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.num_requests, seed=args.seed)
+    # The most common context: the prompt tail shared by the most requests.
+    tails = [tuple(r.prompt[-args.max_depth:]) for r in corpus]
+    hot = list(max(set(tails), key=tails.count))
+
+    def run(engine):
+        stats = replay(engine, corpus, args.max_spec_tokens, args.min_token_prob,
+                       incremental=args.incremental)
+        row = {
+            "tokens_per_step": stats.tokens_per_step,
+            "spec_us": stats.spec_us,
+            "update_us": stats.update_us,
+            "update_tokens": stats.update_tokens,
+            "hot_spec_us": _hot_us(engine, hot, args.hot_repeats, args.max_spec_tokens,
+                                   args.min_token_prob),
+        }
+        if isinstance(engine, MemoSuffixTree):
+            row.update(hit_rate=engine.hit_rate, hits=engine.memo_hits, misses=engine.memo_misses,
+                       rank_changes=engine.rank_changes, invalidated=engine.invalidated,
+                       invalidation_steps=engine.invalidation_steps)
+        return row
+
+    base = run(HashmapSuffixTree(args.max_depth))
+    memo = run(MemoSuffixTree(args.max_depth))
+    tokens = max(memo["update_tokens"], 1)
+    changes = max(memo["rank_changes"], 1)
+    rows = [{"engine": "hashmap", **base}, {"engine": "memo", **memo}]
+
+    print(f"{'engine':<8} {'tok/step':>9} {'spec us':>8} {'hot us':>8} {'update us':>10}")
+    for row in rows:
+        print(f"{row['engine']:<8} {row['tokens_per_step']:>9.2f} {row['spec_us']:>8.1f} "
+              f"{row['hot_spec_us']:>8.1f} {row['update_us']:>10.2f}")
+    print(f"memo: hit rate {memo['hit_rate']:.1%} ({memo['hits']} hits, {memo['misses']} misses), "
+          f"{memo['rank_changes'] / tokens:.4f} changes and {memo['invalidated'] / tokens:.4f} "
+          f"dropped paths per token, {memo['invalidation_steps'] / changes:.1f} nodes walked "
+          f"per change, best-child upkeep {memo['update_us'] - base['update_us']:+.2f} us/token")
+
+    if args.out is not None:
+        config = {
+            "corpus": str(args.corpus) if args.corpus else f"synthetic(seed={args.seed})",
+            "num_requests": len(corpus),
+            "max_depth": args.max_depth,
+            "max_spec_tokens": args.max_spec_tokens,
+            "min_token_prob": args.min_token_prob,
+            "incremental": args.incremental,
+            "hot_repeats": args.hot_repeats,
+        }
+        with open(args.out, "w") as f:
+            json.dump({"config": config, "rows": rows}, f, indent=2)
+        print(f"Saved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Memory breakdown by component for each engine variant.
+
+Builds every variant from the same corpus under tracemalloc and prints
+engine.memory_report(): exact buffer sizes of the array columns, walked
+sizes of the object-based parts, and the traced bytes the walk missed
+("untracked"). Bytes per stored token and per node compare the variants;
+``--forecast-tokens`` extrapolates each to larger corpora.
+
+Run from the repository root:
+
+    python -m benchmarks.memory --num-requests 200 --forecast-tokens 1e7 1e8
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from suffix_decoding import (CompressedSuffixTree, HashmapSuffixTree, LinkedSuffixTree,
+                             MemoSuffixTree, SuffixArrayEngine, SuffixTree, load_corpus,
+                             synthetic_corpus, traced_report)
+
+VARIANTS = {
+    "baseline": SuffixTree,
+    "hashmap": HashmapSuffixTree,
+    "linked": LinkedSuffixTree,
+    "compressed": CompressedSuffixTree,
+    "memo": MemoSuffixTree,
+    "suffix_array": SuffixArrayEngine,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--num-requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-depth", type=int, default=64)
+    parser.add_argument("--variants", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--forecast-tokens", type=float, nargs="+", default=[1e7, 1e8])
+    parser.add_argument("--out", type=Path, default=None, help="write the reports as JSON")
+    args = parser.parse_args()
+
+    if args.corpus is not None:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = synthetic_corpus(args.num_requests, seed=args.seed)
+
+    reports = {}
+    for name in args.variants:
+        _, report = traced_report(lambda: VARIANTS[name](args.max_depth), corpus)
+        reports[name] = report
+        print(f"== {name}: {report.num_nodes} nodes, {report.stored_tokens} tokens, "
+              f"{report.bytes_per_node:.1f} B/node")
+        print(report.format())
+        print()
+
+    print(f"{'variant':<12} {'MB':>8} {'B/token':>8} "
+          + " ".join(f"{f'GB @ {t:.0e}':>11}" for t in args.forecast_tokens))
+    for name, report in reports.items():
+        print(f"{name:<12} {report.total / 2**20:>8.1f} {report.bytes_per_token:>8.1f} "
+              + " ".join(f"{report.forecast(int(t)) / 2**30:>11.2f}" for t in args.forecast_tokens))
+
+    if args.out is not None:
+        with open(args.out, "w") as f:
+            json.dump({name: {"components": r.components, "stored_tokens": r.stored_tokens,
+                              "num_nodes": r.num_nodes, "traced_bytes": r.traced_bytes,
+                              "bytes_per_token": r.bytes_per_token}
+                       for name, r in reports.items()}, f, indent=2)
+        print(f"Saved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""N-gram (prompt lookup) vs suffix-tree speculation on identical traces.
+
+Replays the same corpus through the n-gram proposers and the suffix engine
+with the same harness, reports speculation cost and acceptance, and feeds
+the recorded acceptance traces to the offline TPOT simulator. Row labels
+follow blog-post2/results_summary.md, so ``--compare`` prints the
+published numbers for the same methods.
+
+Run from the repository root:
+
+    python -m benchmarks.ngram_compare --compare blog-post2/results_summary.md --section Blazedit
+"""
+
+import argparse
+from pathlib import Path
+
+from suffix_decoding import (LinearStepModel, LinkedSuffixTree, NgramProposer, SpecCostModel,
+                             load_corpus, parse_summary_concurrency, parse_summary_tables, replay,
+                             simulate_tpot, synthetic_corpus, vanilla_trace)
+from suffix_decoding.latency import SPECBENCH_VANILLA_TPOT
+from suffix_decoding.simulator import format_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--num-requests", type=int, default=100,
+                        help="synthetic requests; raised to the largest --concurrency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ngram", type=int, nargs=2, action="append", metavar=("MIN", "MAX"),
+                        help="n-gram range; may be repeated (default: 3 5 and 5 5)")
+    parser.add_argument("--depths", type=int, nargs="+", default=[24])
+    parser.add_argument("--max-spec-tokens", type=int, default=32)
+    parser.add_argument("--min-token-prob", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--spec-cost-scale", type=float, default=1.0,
+                        help="multiply measured drafting cost in the TPOT simulation")
+    parser.add_argument("--compare", type=Path, default=None)
+    parser.add_argument("--section", default="Spec Bench")
+    args = parser.parse_args()
+
+    corpus = (load_corpus(args.corpus) if args.corpus
+              else synthetic_corpus(max(args.num_requests, *args.concurrency), seed=args.seed))
+    methods = {f"ngram [{lo}, {hi}]": (lambda lo=lo, hi=hi: NgramProposer(lo, hi))
+               for lo, hi in (args.ngram or [(3, 5), (5, 5)])}
+    for depth in args.depths:
+        methods[f"suffix_new (depth={depth})"] = lambda depth=depth: LinkedSuffixTree(depth)
+
+    print(f"{'method':<24} {'spec us/step':>13} {'tok/step':>9} {'draft/step':>11} {'accept rate':>12}")
+    traces = {}
+    for label, factory in methods.items():
+        trace = []
+        stats = replay(factory(), corpus, args.max_spec_tokens, args.min_token_prob,
+                       incremental=True, trace=trace)
+        traces[label] = (trace, stats.spec_us * args.spec_cost_scale)
+        accept_rate = stats.accepted_tokens / max(stats.draft_tokens, 1)
+        print(f"{label:<24} {stats.spec_us:>13.1f} {stats.tokens_per_step:>9.2f} "
+              f"{stats.draft_tokens / max(stats.steps, 1):>11.2f} {accept_rate:>12.2%}")
+
+    step_model = LinearStepModel.fit(list(SPECBENCH_VANILLA_TPOT), list(SPECBENCH_VANILLA_TPOT.values()))
+    first = next(iter(traces.values()))[0]
+    rows = {"vanilla": [simulate_tpot(vanilla_trace(first), c, step_model) for c in args.concurrency]}
+    for label, (trace, spec_us) in traces.items():
+        rows[label] = [simulate_tpot(trace, c, step_model, SpecCostModel(spec_us))
+                       for c in args.concurrency]
+    print()
+    print(format_table("Simulated", rows, args.concurrency))
+
+    if args.compare is not None:
+        published = parse_summary_tables(args.compare).get(args.section, {})
+        columns = parse_summary_concurrency(args.compare).get(args.section, [])
+        matched = {label: published[label] for label in rows if label in published}
+        if matched:
+            print()
+            print(format_table(f"{args.section} (published)", matched, columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Print or regenerate the results tables from the columnar results store.
+
+Every published number lives in results/published.npz (see
+suffix_decoding.results); blog-post2/results_summary.md and the plot
+scripts are generated from it. Without ``--summary`` this prints each cell
+with its trial count, mean and standard deviation.
+
+Run from the repository root:
+
+    python -m benchmarks.results --summary blog-post2/results_summary.md
+"""
+
+import argparse
+import math
+from pathlib import Path
+
+from suffix_decoding.results import DEFAULT_STORE, ResultsStore
+from suffix_decoding.simulator import format_table
+
+CONCURRENCY = [1, 4, 16, 64]
+
+# (section title, dataset) of the TPOT tables, and their rows as (method, depth).
+SUMMARY_SECTIONS = [("Blazedit", "Blazedit"), ("Spec Bench", "Spec-Bench")]
+SUMMARY_ROWS = [("vanilla", 0), ("ngram [3, 5]", 0), ("ngram [5, 5]", 0), ("suffix_old", 0),
+                ("suffix_new", 64), ("suffix_new", 32), ("suffix_new", 24)]
+
+SUMMARY_HEADER = """\
+# Experiment Results Summary
+
+## Experimental Setup
+
+- **Model**: meta-llama/Llama-3.1-8B-Instruct
+- **Datasets**: Spec-Bench and BlazeEdit
+- **Tree depth**: 64, 32, or 24
+- **Speculation length**: 32
+- **Trials per configuration**: 3
+- **Concurrency levels**: 1, 4, 16, 64
+- **Baselines**:
+  - Vanilla (no speculative decoding)
+  - N-gram [3, 5] and [5, 5] (prompt lookup decoding)
+  - Suffix matching (old and new implementations)
+- **Metric**: Mean Time Per Output Token (TPOT) in milliseconds, averaged across trials
+"""
+
+
+def render_summary(store: ResultsStore, spec_len: int = 32) -> str:
+    """results_summary.md: one TPOT table per dataset, means over trials."""
+    sections = [SUMMARY_HEADER]
+    for title, dataset in SUMMARY_SECTIONS:
+        rows = {}
+        for method, depth in SUMMARY_ROWS:
+            label = f"{method} (depth={depth})" if depth else method
+            rows[label] = store.series("tpot_ms", method, dataset, CONCURRENCY, depth, spec_len)
+        sections.append(format_table(title, rows, CONCURRENCY) + "\n")
+    return "\n".join(sections) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--store", type=Path, default=DEFAULT_STORE)
+    parser.add_argument("--summary", type=Path, default=None,
+                        help="write the results_summary.md tables to this path")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.store)
+    if args.summary is not None:
+        args.summary.write_text(render_summary(store))
+        print(f"Saved: {args.summary}")
+        return
+
+    print(f"{len(store)} trials in {args.store}")
+    print(f"{'method':<16} {'dataset':<11} {'depth':>5} {'spec':>4} {'conc':>4} "
+          f"{'metric':<16} {'n':>2} {'mean':>8} {'std':>7}")
+    for cell in store.cells():
+        for metric in store.metrics:
+            mean = store.mean(metric, cell)
+            if math.isnan(mean):
+                continue
+            std = store.std(metric, cell)
+            print(f"{cell.method:<16} {cell.dataset:<11} {cell.depth:>5} {cell.spec_len:>4} "
+                  f"{cell.concurrency:>4} {metric:<16} {store.trials(cell):>2} {mean:>8.3f} "
+                  f"{'-' if math.isnan(std) else f'{std:.3f}':>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Update and speculate throughput of the sharded tree from 1 to N processes.
+
+Feeds a corpus to ShardedSuffixTree the way a decode loop at fixed
+concurrency would (every step each running request inserts a few tokens,
+sent to the shards as one batch), then drafts for batches of held-out
+contexts, and reports tokens inserted and contexts drafted per second
+against the in-process LinkedSuffixTree. ``--tree`` drafts trees instead
+of linear drafts.
+
+Scaling needs a free core per shard: rows with more shards than the CPUs
+this process may run on are marked, since their workers take turns on the
+same cores and only measure the IPC overhead, not a speedup.
+
+Run from the repository root:
+
+    python -m benchmarks.sharded --shards 1 2 4 8 --concurrency 64
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from suffix_decoding import LinkedSuffixTree, load_corpus, synthetic_corpus
+from suffix_decoding.sharded import ShardedSuffixTree
+
+
+def run(engine, corpus, held_out, args) -> tuple[float, float]:
+    streams = [list(req.prompt) + list(req.response) for req in corpus]
+    running = {}  # seq_id -> position
+    pending = iter(range(len(streams)))
+    tokens = 0
+    t0 = time.perf_counter()
+    while True:
+        while len(running) < args.concurrency:
+            seq_id = next(pending, None)
+            if seq_id is None:
+                break
+            running[seq_id] = 0
+        if not running:
+            break
+        for seq_id in list(running):
+            pos = running[seq_id]
+            chunk = streams[seq_id][pos:pos + args.step_tokens]
+            engine.extend(seq_id, chunk)
+            tokens += len(chunk)
+            if pos + len(chunk) >= len(streams[seq_id]):
+                engine.finish(seq_id)
+                del running[seq_id]
+            else:
+                running[seq_id] = pos + len(chunk)
+        if hasattr(engine, "flush"):
+            engine.flush()
+    update_rate = tokens / (time.perf_counter() - t0)
+
+    contexts = [(list(req.prompt) + list(req.response[:p]))[-args.max_depth:]
+                for req in held_out for p in range(0, len(req.response), 16)]
+    t0 = time.perf_counter()
+    for i in range(0, len(contexts), args.concurrency):
+        batch = contexts[i:i + args.concurrency]
+        if hasattr(engine, "speculate_many"):
+            engine.speculate_many(batch, args.max_spec_tokens, args.min_token_prob, args.tree)
+        else:
+            for ctx in batch:
+                engine.speculate(ctx, args.max_spec_tokens, args.min_token_prob, args.tree)
+    spec_rate = len(contexts) / (time.perf_counter() - t0)
+    return update_rate, spec_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--num-requests", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-depth", type=int, default=32)
+    parser.add_argument("--max-spec-tokens", type=int, default=32)
+    parser.add_argument("--min-token-prob", type=float, default=0.1)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--step-tokens", type=int, default=4,
+                        help="tokens each running request inserts per step")
+    parser.add_argument("--held-out", type=float, default=0.1,
+                        help="fraction of the corpus used for speculation contexts")
+    parser.add_argument("--tree", action="store_true", help="draft trees instead of linear drafts")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.num_requests, seed=args.seed)
+    split = len(corpus) - max(1, int(len(corpus) * args.held_out))
+    build, held_out = corpus[:split], corpus[split:]
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"{cpus} CPUs available")
+
+    print(f"{'engine':<12} {'update tok/s':>13} {'speedup':>8} {'spec ctx/s':>11} {'speedup':>8}")
+    base_update, base_spec = run(LinkedSuffixTree(args.max_depth), build, held_out, args)
+    print(f"{'in-process':<12} {base_update:>13.0f} {1:>8.2f} {base_spec:>11.0f} {1:>8.2f}")
+    for n in args.shards:
+        with ShardedSuffixTree(n, args.max_depth) as engine:
+            update, spec = run(engine, build, held_out, args)
+        mark = " *" if n > cpus else ""
+        print(f"{f'{n} shards':<12} {update:>13.0f} {update / base_update:>8.2f} "
+              f"{spec:>11.0f} {spec / base_spec:>8.2f}{mark}")
+    if max(args.shards) > cpus:
+        print(f"* more shards than the {cpus} available CPUs: the workers share cores, so "
+              f"these rows show the IPC overhead, not a scaling result")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Predict mean TPOT per concurrency level from acceptance traces, on CPU.
+
+Either loads traces recorded earlier (``--trace LABEL=PATH``, JSONL from
+suffix_decoding.save_trace) or records them by replaying a corpus through
+the suffix engine at each ``--depths`` value. Prints the prediction in the
+table layout of blog-post2/results_summary.md, and with ``--compare`` the
+published numbers for rows with the same label next to it.
+
+Run from the repository root:
+
+    python -m benchmarks.simulate_tpot --compare blog-post2/results_summary.md --section "Spec Bench"
+"""
+
+import argparse
+from pathlib import Path
+
+from suffix_decoding import (LinearStepModel, LinkedSuffixTree, RooflineStepModel, SpecCostModel,
+                             load_corpus, load_trace, parse_summary_concurrency,
+                             parse_summary_tables, replay, save_trace, simulate_tpot,
+                             synthetic_corpus, vanilla_trace)
+from suffix_decoding.latency import SPECBENCH_VANILLA_TPOT
+from suffix_decoding.simulator import format_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--trace", action="append", default=[], metavar="LABEL=PATH",
+                        help="recorded trace; may be repeated")
+    parser.add_argument("--corpus", type=Path, default=None,
+                        help="corpus to record traces from when no --trace is given")
+    parser.add_argument("--num-requests", type=int, default=100,
+                        help="synthetic requests; raised to the largest --concurrency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--depths", type=int, nargs="+", default=[64, 32, 24])
+    parser.add_argument("--max-spec-tokens", type=int, default=32)
+    parser.add_argument("--min-token-prob", type=float, default=0.1)
+    parser.add_argument("--save-traces", type=Path, default=None,
+                        help="directory to write recorded traces to")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--verify-model", choices=["linear", "roofline"], default="linear")
+    parser.add_argument("--spec-us", type=float, default=None,
+                        help="drafting cost per request-step; defaults to the "
+                             "measured cost for recorded traces and 0 for loaded ones")
+    parser.add_argument("--spec-cost-scale", type=float, default=1.0,
+                        help="multiply measured drafting cost")
+    parser.add_argument("--title", default="Simulated")
+    parser.add_argument("--compare", type=Path, default=None,
+                        help="results_summary.md to print published numbers from")
+    parser.add_argument("--section", default="Spec Bench",
+                        help="section of --compare to read")
+    args = parser.parse_args()
+
+    if args.verify_model == "linear":
+        step_model = LinearStepModel.fit(list(SPECBENCH_VANILLA_TPOT),
+                                         list(SPECBENCH_VANILLA_TPOT.values()))
+    else:
+        step_model = RooflineStepModel()
+
+    traces = {}  # label -> (trace, measured spec us per step)
+    for spec in args.trace:
+        label, _, path = spec.rpartition("=")
+        traces[label] = (load_trace(path), 0.0)
+    if not traces:
+        corpus = (load_corpus(args.corpus) if args.corpus
+                  else synthetic_corpus(max(args.num_requests, *args.concurrency), seed=args.seed))
+        for depth in args.depths:
+            trace = []
+            stats = replay(LinkedSuffixTree(depth), corpus, args.max_spec_tokens,
+                           args.min_token_prob, incremental=True, trace=trace)
+            label = f"suffix_new (depth={depth})"
+            traces[label] = (trace, stats.spec_us * args.spec_cost_scale)
+            if args.save_traces is not None:
+                args.save_traces.mkdir(parents=True, exist_ok=True)
+                save_trace(trace, args.save_traces / f"suffix_depth{depth}.jsonl")
+
+    rows = {}
+    first = next(iter(traces.values()))[0]
+    rows["vanilla"] = [simulate_tpot(vanilla_trace(first), c, step_model) for c in args.concurrency]
+    for label, (trace, measured_us) in traces.items():
+        spec_cost = SpecCostModel(us_per_step=measured_us if args.spec_us is None else args.spec_us)
+        rows[label] = [simulate_tpot(trace, c, step_model, spec_cost) for c in args.concurrency]
+    print(format_table(args.title, rows, args.concurrency))
+
+    if args.compare is not None:
+        published = parse_summary_tables(args.compare).get(args.section, {})
+        columns = parse_summary_concurrency(args.compare).get(args.section, [])
+        matched = {label: published[label] for label in rows if label in published}
+        if matched:
+            print()
+            print(format_table(f"{args.section} (published)", matched, columns))
+
+
+if __name__ == "__main__":
+    main()
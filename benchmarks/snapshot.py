@@ -0,0 +1,96 @@
+"""Warm start from a memory-mapped suffix-tree snapshot.
+
+Builds a tree from the first part of a corpus and snapshots it, then
+reports the snapshot size, the time to map it and serve a first draft, the
+time to thaw it into a mutable engine, and tokens per step on the held-out
+requests for a cold (empty) tree vs the thawed snapshot. Finally replays
+the corpus with a SnapshotWriter taking periodic background snapshots and
+reports the pause each capture costs the decode loop. The pause copies
+every node column, so it grows linearly with the tree; it is also reported
+per node, to extrapolate to larger trees.
+
+Run from the repository root:
+
+    python -m benchmarks.snapshot --num-requests 200 --warm-frac 0.8 --path /tmp/tree.snap
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from suffix_decoding import LinkedSuffixTree, load_corpus, replay, synthetic_corpus
+from suffix_decoding.snapshot import Snapshot, SnapshotWriter, save_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--num-requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-depth", type=int, default=32)
+    parser.add_argument("--max-spec-tokens", type=int, default=32)
+    parser.add_argument("--min-token-prob", type=float, default=0.1)
+    parser.add_argument("--warm-frac", type=float, default=0.8,
+                        help="fraction of the corpus used to build the snapshot")
+    parser.add_argument("--snapshot-every", type=int, default=10,
+                        help="requests between background snapshots")
+    parser.add_argument("--path", type=Path, default=Path("suffix_tree.snap"))
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.num_requests, seed=args.seed)
+    split = int(len(corpus) * args.warm_frac)
+    warm, held_out = corpus[:split], corpus[split:]
+
+    engine = LinkedSuffixTree(args.max_depth)
+    for seq_id, req in enumerate(warm):
+        engine.extend(seq_id, list(req.prompt) + list(req.response))
+        engine.finish(seq_id)
+    t0 = time.perf_counter()
+    save_snapshot(engine, args.path)
+    save_ms = 1e3 * (time.perf_counter() - t0)
+    print(f"snapshot: {engine.num_nodes} nodes, {os.path.getsize(args.path) / 2**20:.1f} MB, "
+          f"saved in {save_ms:.1f} ms")
+
+    t0 = time.perf_counter()
+    snapshot = Snapshot(args.path)
+    mapped = snapshot.engine()
+    load_ms = 1e3 * (time.perf_counter() - t0)
+    context = list(held_out[0].prompt)[-args.max_depth:] if held_out else []
+    t0 = time.perf_counter()
+    mapped.speculate(context, args.max_spec_tokens, args.min_token_prob)
+    first_ms = 1e3 * (time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    thawed = mapped.thaw()
+    thaw_ms = 1e3 * (time.perf_counter() - t0)
+    print(f"map {load_ms:.2f} ms, first draft {first_ms:.2f} ms, thaw {thaw_ms:.1f} ms")
+    del mapped
+    snapshot.close()
+
+    for label, tree in (("cold", LinkedSuffixTree(args.max_depth)), ("warm", thawed)):
+        stats = replay(tree, held_out, args.max_spec_tokens, args.min_token_prob, incremental=True)
+        print(f"{label}: {stats.tokens_per_step:.2f} tok/step on {len(held_out)} held-out requests")
+
+    engine = LinkedSuffixTree(args.max_depth)
+    writer = SnapshotWriter(engine, args.path)
+    captures = []  # (pause ms, nodes)
+    for seq_id, req in enumerate(corpus):
+        engine.extend(seq_id, list(req.prompt) + list(req.response))
+        engine.finish(seq_id)
+        if seq_id % args.snapshot_every == args.snapshot_every - 1 and writer.snapshot():
+            captures.append((writer.capture_ms, engine.num_nodes))
+    writer.close()
+    if writer.error is not None:
+        raise writer.error
+    if captures:
+        pauses = [ms for ms, _ in captures]
+        last_ms, last_nodes = captures[-1]
+        print(f"background writer: {writer.written} snapshots, {writer.skipped} skipped, "
+              f"capture pause mean {sum(pauses) / len(pauses):.1f} ms / max {max(pauses):.1f} ms, "
+              f"last write {writer.write_ms:.1f} ms")
+        print(f"last capture: {last_ms:.1f} ms for {last_nodes} nodes "
+              f"({1e6 * last_ms / last_nodes:.0f} ns/node)")
+
+
+if __name__ == "__main__":
+    main()
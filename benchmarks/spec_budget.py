@@ -0,0 +1,68 @@
+"""Per-request greedy drafting vs a shared per-step draft-token budget.
+
+Replays a corpus at each concurrency level with every request drafting as
+much as it can, with SpecBudgetScheduler choosing the budget from the
+verify-latency model, and optionally with fixed budgets, and reports
+tokens per step, verified draft tokens and predicted TPOT under the same
+model. The vanilla row decodes without speculation.
+
+Run from the repository root:
+
+    python -m benchmarks.spec_budget --verify-model roofline --budgets 16 64
+"""
+
+import argparse
+from pathlib import Path
+
+from suffix_decoding import (LinearStepModel, LinkedSuffixTree, RooflineStepModel, SpecBudgetScheduler,
+                             load_corpus, predict_tpot_ms, replay_concurrent, synthetic_corpus)
+from suffix_decoding.latency import SPECBENCH_VANILLA_TPOT
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--num-requests", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", type=float, default=0.2)
+    parser.add_argument("--max-depth", type=int, default=32)
+    parser.add_argument("--max-spec-tokens", type=int, default=32)
+    parser.add_argument("--min-token-prob", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--verify-model", choices=["linear", "roofline"], default="roofline")
+    parser.add_argument("--budgets", type=int, nargs="*", default=[],
+                        help="fixed per-step budgets to compare as well")
+    parser.add_argument("--spec-cost-scale", type=float, default=1.0,
+                        help="multiply measured drafting cost in the TPOT prediction")
+    args = parser.parse_args()
+
+    corpus = (load_corpus(args.corpus) if args.corpus
+              else synthetic_corpus(args.num_requests, noise=args.noise, seed=args.seed))
+    if args.verify_model == "linear":
+        model = LinearStepModel.fit(list(SPECBENCH_VANILLA_TPOT), list(SPECBENCH_VANILLA_TPOT.values()))
+    else:
+        model = RooflineStepModel()
+
+    policies = {"greedy": None, "load-aware": SpecBudgetScheduler(step_model=model)}
+    for budget in args.budgets:
+        policies[f"budget={budget}"] = SpecBudgetScheduler(budget=budget)
+
+    print(f"{'policy':<12} {'conc':>5} {'spec us':>8} {'tok/step':>9} {'draft/step':>11} "
+          f"{'accept rate':>12} {'TPOT ms':>8}")
+    for concurrency in args.concurrency:
+        print(f"{'vanilla':<12} {concurrency:>5} {0:>8.1f} {1:>9.2f} {0:>11.2f} {'-':>12} "
+              f"{predict_tpot_ms(model, concurrency, 1.0, 0.0):>8.2f}")
+        for label, scheduler in policies.items():
+            stats = replay_concurrent(LinkedSuffixTree(args.max_depth), corpus, concurrency,
+                                      args.max_spec_tokens, args.min_token_prob,
+                                      scheduler=scheduler)
+            draft_per_step = stats.draft_tokens / max(stats.steps, 1)
+            spec_ms = args.spec_cost_scale * stats.spec_us / 1000
+            tpot = predict_tpot_ms(model, concurrency, stats.tokens_per_step, draft_per_step, spec_ms)
+            print(f"{label:<12} {concurrency:>5} {stats.spec_us:>8.1f} {stats.tokens_per_step:>9.2f} "
+                  f"{draft_per_step:>11.2f} {stats.accepted_tokens / max(stats.draft_tokens, 1):>12.2%} "
+                  f"{tpot:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
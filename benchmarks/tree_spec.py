@@ -0,0 +1,58 @@
+"""Linear vs best-first tree speculation under the same verify budget.
+
+Replays a corpus with linear drafts and with draft trees at each token
+budget, and reports accepted tokens per step, how much of the verified
+draft is accepted, and the TPOT predicted by a step-latency model fitted
+to the vanilla column of blog-post2/results_summary.md (draft tokens cost
+verify time, so a tree only pays off if its extra branches get accepted).
+
+Run from the repository root:
+
+    python -m benchmarks.tree_spec --budgets 8 16 32 --min-token-prob 0.1
+"""
+
+import argparse
+from pathlib import Path
+
+from suffix_decoding import LinearStepModel, LinkedSuffixTree, load_corpus, predict_tpot_ms, replay, synthetic_corpus
+from suffix_decoding.latency import SPECBENCH_VANILLA_TPOT
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--num-requests", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", type=float, default=0.3,
+                        help="synthetic corpus noise; more noise gives bushier trees")
+    parser.add_argument("--max-depth", type=int, default=32)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--min-token-prob", type=float, nargs="+", default=[0.1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--spec-cost-scale", type=float, default=1.0,
+                        help="multiply measured drafting cost in the TPOT prediction")
+    args = parser.parse_args()
+
+    corpus = (load_corpus(args.corpus) if args.corpus
+              else synthetic_corpus(args.num_requests, noise=args.noise, seed=args.seed))
+    model = LinearStepModel.fit(list(SPECBENCH_VANILLA_TPOT), list(SPECBENCH_VANILLA_TPOT.values()))
+
+    print(f"{'mode':<7} {'budget':>6} {'min prob':>8} {'spec us':>8} {'tok/step':>9} "
+          f"{'draft/step':>11} {'accepted':>9} " + " ".join(f"{f'TPOT@{c}':>9}" for c in args.concurrency))
+    for min_prob in args.min_token_prob:
+        for budget in args.budgets:
+            for mode in ("linear", "tree"):
+                stats = replay(LinkedSuffixTree(args.max_depth), corpus, budget, min_prob,
+                               incremental=True, tree=mode == "tree")
+                draft_per_step = stats.draft_tokens / max(stats.steps, 1)
+                spec_ms = args.spec_cost_scale * stats.spec_us / 1000
+                tpots = [predict_tpot_ms(model, c, stats.tokens_per_step, draft_per_step, spec_ms)
+                         for c in args.concurrency]
+                print(f"{mode:<7} {budget:>6} {min_prob:>8.2f} {stats.spec_us:>8.1f} "
+                      f"{stats.tokens_per_step:>9.2f} {draft_per_step:>11.2f} "
+                      f"{stats.accepted_tokens / max(stats.draft_tokens, 1):>9.2%} "
+                      + " ".join(f"{t:>9.2f}" for t in tpots))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Tokens/step of the reference engine on each synthetic workload.
+
+Generates every workload from suffix_decoding.workloads, replays it through
+LinkedSuffixTree with per-request match pointers, and prints tokens/step
+and acceptance next to the published Suffix Decoding (linear) figure.
+``--save DIR`` also writes each corpus as JSONL, for the other benchmarks'
+``--corpus`` flag.
+
+With ``--store`` every workload is a cell of a results store with one
+trial per seed; cells that already hold ``--trials`` trials are not
+replayed again, so growing a sweep only computes the new trials.
+
+Run from the repository root:
+
+    python -m benchmarks.workloads --num-requests 200 --save /tmp/workloads
+    python -m benchmarks.workloads --store /tmp/workloads.npz --trials 3
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from suffix_decoding import LinkedSuffixTree, replay, save_corpus
+from suffix_decoding.results import Cell, ResultsStore
+from suffix_decoding.workloads import WORKLOADS, workload_corpus
+
+
+def run(name, seed, args):
+    t0 = time.perf_counter()
+    corpus = workload_corpus(name, args.num_requests, seed)
+    gen_s = time.perf_counter() - t0
+    if args.save is not None:
+        args.save.mkdir(parents=True, exist_ok=True)
+        save_corpus(corpus, args.save / f"{name}.jsonl")
+    stats = replay(LinkedSuffixTree(args.max_depth), corpus, args.max_spec_tokens,
+                   args.min_token_prob, incremental=True)
+    return corpus, stats, gen_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--workloads", nargs="+", choices=sorted(WORKLOADS),
+                        default=list(WORKLOADS))
+    parser.add_argument("--num-requests", type=int, default=None,
+                        help="requests per workload (default: the generator's)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-depth", type=int, default=64)
+    parser.add_argument("--max-spec-tokens", type=int, default=32)
+    parser.add_argument("--min-token-prob", type=float, default=0.1)
+    parser.add_argument("--save", type=Path, default=None,
+                        help="directory to write <workload>.jsonl corpora to")
+    parser.add_argument("--store", type=Path, default=None,
+                        help="results store (NPZ) to record trials in and reuse them from")
+    parser.add_argument("--trials", type=int, default=1,
+                        help="trials per workload with --store, seeded --seed + trial")
+    args = parser.parse_args()
+
+    if args.store is not None:
+        store = ResultsStore(args.store)
+        print(f"{'workload':<12} {'trials':>6} {'new':>4} {'tok/step':>9} {'std':>6} {'published':>9}")
+        for name in args.workloads:
+            cell = Cell("suffix_linear", name, args.max_depth, args.max_spec_tokens)
+            done = store.trials(cell)
+            for trial in range(done, args.trials):
+                _, stats, _ = run(name, args.seed + trial, args)
+                store.add(*cell, trial=trial, tokens_per_step=stats.tokens_per_step,
+                          accept_rate=stats.accepted_tokens / max(stats.draft_tokens, 1))
+                store.save()
+            published = WORKLOADS[name].published_tokens_per_step
+            print(f"{name:<12} {store.trials(cell):>6} {max(args.trials - done, 0):>4} "
+                  f"{store.mean('tokens_per_step', cell):>9.2f} "
+                  f"{store.std('tokens_per_step', cell):>6.2f} "
+                  f"{'-' if published is None else f'{published:.1f}':>9}")
+        return
+
+    print(f"{'workload':<12} {'requests':>8} {'tokens':>8} {'tok/step':>9} "
+          f"{'published':>9} {'accept':>7} {'gen s':>6}")
+    for name in args.workloads:
+        corpus, stats, gen_s = run(name, args.seed, args)
+        published = WORKLOADS[name].published_tokens_per_step
+        tokens = sum(len(req.prompt) + len(req.response) for req in corpus)
+        print(f"{name:<12} {len(corpus):>8} {tokens:>8} {stats.tokens_per_step:>9.2f} "
+              f"{'-' if published is None else f'{published:.1f}':>9} "
+              f"{stats.accepted_tokens / max(stats.draft_tokens, 1):>7.2f} {gen_s:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
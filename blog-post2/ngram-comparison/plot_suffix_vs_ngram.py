@@ -1,31 +1,46 @@
+import sys
+from pathlib import Path
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+# Data from the results store (results/published.npz, see suffix_decoding.results).
+# Pass a different store as argv[1].
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from suffix_decoding.results import DEFAULT_STORE, ResultsStore  # noqa: E402
+
+store = ResultsStore(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_STORE)
+
 # Data for spec_len = 32 only
 concurrency_levels = [1, 4, 16, 64]
 
+
+def tpot(method, dataset, depth=0):
+    return store.series("tpot_ms", method, dataset, concurrency_levels, depth, spec_len=32)
+
+
 # First dataset: Suffix vs N-gram (old unoptimized)
 # Use best of ngram [3,5] and [5,5] for each concurrency level
-old_suffix_times = [4.33, 4.76, 6.20, 12.03]  # ms (suffix_old)
-ngram35_times_old = [5.07, 5.43, 6.73, 13.07]  # ms (ngram [3,5])
-ngram55_times_old = [5.49, 5.80, 6.87, 11.55]  # ms (ngram [5,5])
+old_suffix_times = tpot("suffix_old", "Spec-Bench")  # ms (suffix_old)
+ngram35_times_old = tpot("ngram [3, 5]", "Spec-Bench")  # ms (ngram [3,5])
+ngram55_times_old = tpot("ngram [5, 5]", "Spec-Bench")  # ms (ngram [5,5])
 # Best N-gram for each concurrency: min of [3,5] and [5,5]
 ngram_times_old = [min(ngram35_times_old[i], ngram55_times_old[i]) for i in range(len(concurrency_levels))]
 
 # Second dataset: Suffix vs N-gram [3,5] and N-gram [5,5] (spec-bench)
-# Using suffix_new (depth=24) from results_summary.md
-vanilla_times_specbench = [5.53, 5.78, 6.73, 10.36]  # ms
-new_suffix_times_specbench = [4.32, 4.62, 5.70, 10.37]  # ms (suffix_new depth=24)
-ngram35_times_specbench = [5.07, 5.43, 6.73, 13.07]  # ms
-ngram55_times_specbench = [5.49, 5.80, 6.87, 11.55]  # ms
+# Using suffix_new (depth=24)
+vanilla_times_specbench = tpot("vanilla", "Spec-Bench")  # ms
+new_suffix_times_specbench = tpot("suffix_new", "Spec-Bench", depth=24)  # ms (suffix_new depth=24)
+ngram35_times_specbench = ngram35_times_old  # ms
+ngram55_times_specbench = ngram55_times_old  # ms
 
 
 # Third dataset: Suffix vs N-gram [3,5] and N-gram [5,5] (blazedit)
-# Using suffix_new (depth=24) from results_summary.md
-vanilla_times_blazedit = [5.62, 5.98, 7.44, 10.96]  # ms
-new_suffix_times_blazedit = [1.80, 2.01, 2.79, 5.58]  # ms (suffix_new depth=24)
-ngram35_times_blazedit = [1.84, 2.16, 3.37, 7.99]  # ms
-ngram55_times_blazedit = [2.15, 2.49, 3.54, 7.33]  # ms
+# Using suffix_new (depth=24)
+vanilla_times_blazedit = tpot("vanilla", "Blazedit")  # ms
+new_suffix_times_blazedit = tpot("suffix_new", "Blazedit", depth=24)  # ms (suffix_new depth=24)
+ngram35_times_blazedit = tpot("ngram [3, 5]", "Blazedit")  # ms
+ngram55_times_blazedit = tpot("ngram [5, 5]", "Blazedit")  # ms
 
 # Set width of bars
 bar_width = 0.35
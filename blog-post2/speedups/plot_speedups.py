@@ -1,8 +1,14 @@
+import sys
+from pathlib import Path
+
 import numpy as np
 import platform
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mtick
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from suffix_decoding.results import DEFAULT_STORE, ResultsStore  # noqa: E402
+
 # Don't use seaborn style - it may interfere with Unicode rendering
 # Use matplotlib's default style which has better font support for the star character
 
@@ -10,27 +16,26 @@ import matplotlib.ticker as mtick
 benchmarks = ['AgenticSQL', 'SWE-Bench']
 baselines = ['Vanilla', 'Eagle', 'Eagle 2', 'Eagle 3', 'PLD', 'Token Recycling', 'SuffixDecoding', 'SuffixDecoding (Hybrid)']
 
+# Data from the results store (results/published.npz, see suffix_decoding.results).
+# Pass a different store as argv[1].
+store = ResultsStore(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_STORE)
+methods = ['vanilla', 'eagle', 'eagle2', 'eagle3', 'pld', 'token_recycling',
+           'suffix_linear', 'suffix_tree', 'hybrid_linear', 'hybrid_tree']
+
+
+def best_variant(metric):
+    """One column per baseline, using the best of linear and tree for Suffix and Hybrid."""
+    table = store.table(metric, methods, benchmarks)
+    data = np.array([table[b] for b in benchmarks])
+    # fmax ignores a missing (NaN) variant, and stays NaN when both are missing.
+    return np.column_stack([data[:, :6], np.fmax(data[:, 6], data[:, 7]), np.fmax(data[:, 8], data[:, 9])])
+
+
 # Speedup data - using best performing variant for Suffix and Hybrid
-# For AgenticSQL: Suffix (linear) = 5.345 > Suffix (tree) = 5.175, so use linear
-# For AgenticSQL: Hybrid (tree) = 4.068 > Hybrid (linear) = 3.799, so use tree
-# For SWE-Bench: Suffix (linear) = 2.452 > Suffix (tree) = 2.433, so use linear
-# For SWE-Bench: Hybrid data not available (both are NaN)
-speedup_data = np.array([
-    # Vanilla   Eagle   Eagle2      Eagle3      PLD         Recycling   Suffix (best)      Hybrid (best)
-    [1,         1.595,  1.864,      1.623,     2.105,       2.710,      5.345,              4.068],  # AgenticSQL
-    [1,         np.nan, np.nan,     np.nan,     1.495,      1.358,      2.452,              np.nan],  # SWE-Bench
-])
+speedup_data = best_variant('speedup')
 
 # Mean accepted tokens data - using best performing variant for Suffix and Hybrid
-# For AgenticSQL: Suffix (linear) = 6.349 > Suffix (tree) = 6.236, so use linear
-# For AgenticSQL: Hybrid (tree) = 7.500 > Hybrid (linear) = 7.262, so use tree
-# For SWE-Bench: Suffix (linear) = 7.821 > Suffix (tree) = 7.552, so use linear
-# For SWE-Bench: Hybrid data not available (both are NaN)
-tokens_data = np.array([
-    # Vanilla   Eagle   Eagle2      Eagle3      PLD         Recycling   Suffix (best)      Hybrid (best)
-    [1.000,     2.851,  3.572,      3.160,     2.373,      3.169,      6.349,              7.500],  # AgenticSQL
-    [1.000,     np.nan, np.nan,     np.nan,     3.168,      3.054,      7.821,              np.nan],  # SWE-Bench
-])
+tokens_data = best_variant('tokens_per_step')
 
 # Set width of bars
 bar_width = 0.09
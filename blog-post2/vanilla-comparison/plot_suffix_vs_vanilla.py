@@ -1,18 +1,33 @@
+import sys
+from pathlib import Path
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+# Data from the results store (results/published.npz, see suffix_decoding.results).
+# Pass a different store as argv[1].
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from suffix_decoding.results import DEFAULT_STORE, ResultsStore  # noqa: E402
+
+store = ResultsStore(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_STORE)
+
 # Data for spec_len = 32 only
 concurrency_levels = [1, 4, 16, 64]
 
+
+def tpot(method, dataset, depth=0):
+    return store.series("tpot_ms", method, dataset, concurrency_levels, depth, spec_len=32)
+
+
 # First dataset: Suffix vs Unoptimized Suffix vs Vanilla (spec-bench)
-vanilla_times_specbench = [5.53, 5.80, 6.75, 10.48]  # ms
-new_suffix_times_specbench = [4.43, 4.70, 5.92, 10.96]  # ms
-old_suffix_times_specbench = [4.46, 4.78, 6.23, 12.11]
+vanilla_times_specbench = tpot("vanilla", "Spec-Bench")  # ms
+new_suffix_times_specbench = tpot("suffix_new", "Spec-Bench", depth=64)  # ms
+old_suffix_times_specbench = tpot("suffix_old", "Spec-Bench")
 
 # Second dataset: Suffix vs Unoptimized Suffix vs Vanilla (blazedit)
-vanilla_times_blazedit = [5.61, 5.99, 7.46, 11.12]  # ms
-new_suffix_times_blazedit = [1.71, 1.92, 2.86, 6.06]  # ms
-old_suffix_times_blazedit = [1.71, 1.99, 3.02, 6.58]  # ms
+vanilla_times_blazedit = tpot("vanilla", "Blazedit")  # ms
+new_suffix_times_blazedit = tpot("suffix_new", "Blazedit", depth=64)  # ms
+old_suffix_times_blazedit = tpot("suffix_old", "Blazedit")  # ms
 
 # Set width of bars for 3 bars
 bar_width_3 = 0.25
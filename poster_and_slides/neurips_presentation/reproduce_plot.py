@@ -1,7 +1,16 @@
+import sys
+from pathlib import Path
+
 import numpy as np
 import matplotlib.pyplot as plt
 
-# ===================== Raw data (unchanged) =====================
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from suffix_decoding.frames import ProgressiveFigure  # noqa: E402
+from suffix_decoding.results import DEFAULT_STORE, ResultsStore  # noqa: E402
+
+# ===================== Raw data (results store) =====================
+# From results/published.npz (see suffix_decoding.results); pass a different
+# store as argv[1].
 raw_baselines = [
     "Vanilla",
     "Eagle",
@@ -18,17 +27,14 @@ raw_baselines = [
 bench_order_keys = ["AgenticSQL", "SWE-Bench", "Spec-Bench"]
 bench_order_labels = ["AgenticSQL", "SWE-Bench", "SpecBench"]
 
-speedup = {
-    "Spec-Bench": [1.0, 1.8, 1.8, 2.4, 1.4, 2.2, 1.7, 1.7, 2.5, 2.5],
-    "AgenticSQL": [1.0, 1.6, 1.9, 1.6, 2.1, 2.7, 5.3, 5.2, 3.8, 4.1],
-    "SWE-Bench":  [1.0, np.nan, np.nan, np.nan, 1.5, 1.4, 2.5, 2.4, np.nan, np.nan],
-}
+raw_methods = [
+    "vanilla", "eagle", "eagle2", "eagle3", "pld", "token_recycling",
+    "suffix_linear", "suffix_tree", "hybrid_linear", "hybrid_tree",
+]
 
-tokens = {
-    "Spec-Bench": [1.0, 3.1, 3.5, 4.6, 1.6, 2.5, 1.8, 1.8, 4.6, 4.7],
-    "AgenticSQL": [1.0, 2.9, 3.6, 3.2, 2.4, 3.2, 6.3, 6.2, 7.3, 7.5],
-    "SWE-Bench":  [1.0, np.nan, np.nan, np.nan, 3.2, 3.1, 7.8, 7.6, np.nan, np.nan],
-}
+store = ResultsStore(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_STORE)
+speedup = store.table("speedup", raw_methods, bench_order_keys)
+tokens = store.table("tokens_per_step", raw_methods, bench_order_keys)
 
 # ===================== Reduction to 5 bars =====================
 # Groups -> indices in raw_baselines
@@ -81,17 +87,20 @@ def _nanmax_dict(d):
     return max(vals) if vals else 1.0
 
 # ===================== Plot helper =====================
-def plot_grouped(ax, data_by_bench, title, ylabel, annotate_fmt, num_bars_to_show=5, fixed_ylim=None, highlight_our_results=False):
+def plot_grouped(ax, frames, data_by_bench, title, ylabel, annotate_fmt, fixed_ylim=None):
     """
-    Plot grouped bar chart.
-    
+    Plot grouped bar chart; series i appears from frame i + 1 on.
+
+    In the last frame the Suffix and Suffix (hybrid) labels are bold, and the
+    biggest speedup gets a star.
+
     Args:
-        num_bars_to_show: How many bars to actually show (1-5). Others are invisible.
-        fixed_ylim: Tuple (ymin, ymax) to fix y-axis limits across all plots.
-        highlight_our_results: If True, highlight the Suffix and Suffix (hybrid) bars.
+        frames: ProgressiveFigure that reveals the series.
+        fixed_ylim: Tuple (ymin, ymax) to fix y-axis limits across all frames.
     """
     n_groups = len(bench_order_keys)
     n_series = len(series_labels)
+    last = frames.num_frames
 
     bar_w = 0.75 / n_series
     group_gap = 0.2  # space between groups
@@ -108,63 +117,44 @@ def plot_grouped(ax, data_by_bench, title, ylabel, annotate_fmt, num_bars_to_sho
 
     # Indices for our results (Suffix and Suffix (hybrid))
     our_results_indices = [3, 4]  # Suffix is index 3, Suffix (hybrid) is index 4
+    y_offset = (ax.get_ylim()[1] - ax.get_ylim()[0]) * 0.015
+    best = _nanmax_dict(data_by_bench)
 
     # Draw bars per series
     for i, (label, color) in enumerate(zip(series_labels, series_colors)):
         vals = [data_by_bench[b][i] for b in bench_order_keys]
-        
-        # Show or hide based on num_bars_to_show
-        if i < num_bars_to_show:
-            alpha = 1.0
-            show_label = True
-        else:
-            # Make invisible but keep the space
-            alpha = 0.0
-            show_label = False
-        
-        # Highlighting for our results - keep normal styling
+        first = i + 1
         is_our_result = i in our_results_indices
-        edgecolor = "white"
-        linewidth = 0.6
-            
+
         bars = ax.bar(
             xs[i], vals, width=bar_w,
-            label=label if show_label else None,
+            label=label,
             color=color,
-            edgecolor=edgecolor,
-            linewidth=linewidth,
-            alpha=alpha,
+            edgecolor="white",
+            linewidth=0.6,
         )
-
-        # Labels (centered above each bar) or red X for missing - only for visible bars
-        if i < num_bars_to_show:
-            y_offset = (ax.get_ylim()[1] - ax.get_ylim()[0]) * 0.015
-            for rect, v in zip(bars.patches, vals):
-                cx = rect.get_x() + rect.get_width() / 2.0
-                if np.isnan(v):
-                    ax.plot(cx, ax.get_ylim()[0] + y_offset * 2.0,
-                            marker='x', color='red', markersize=8, mew=1.8)
-                else:
-                    # Make text bold for our results
-                    if highlight_our_results and is_our_result:
-                        fontweight = 'bold'
-                        fontsize = 10
-                    else:
-                        fontweight = 'normal'
-                        fontsize = 9
-                    
-                    # Add star emoji for the biggest speedup (5.3x)
-                    text_content = annotate_fmt(v)
-                    if highlight_our_results and title == "Speculative Speedups over Vanilla Decoding" and abs(v - 5.3) < 0.01:
-                        text_content = "★ " + text_content
-                    
-                    ax.text(
-                        cx, v + y_offset,
-                        text_content,
-                        ha="center", va="bottom",
-                        fontsize=fontsize,
-                        fontweight=fontweight,
-                    )
+        frames.show(bars, first)
+
+        # Labels (centered above each bar) or red X for missing
+        for rect, v in zip(bars.patches, vals):
+            cx = rect.get_x() + rect.get_width() / 2.0
+            if np.isnan(v):
+                frames.show(ax.plot(cx, ax.get_ylim()[0] + y_offset * 2.0,
+                                    marker='x', color='red', markersize=8, mew=1.8), first)
+                continue
+            text = ax.text(cx, v + y_offset, annotate_fmt(v), ha="center", va="bottom",
+                           fontsize=9, fontweight="normal")
+            if not is_our_result:
+                frames.show(text, first)
+                continue
+            # Our results: normal until the last frame, then bold (with a
+            # star on the biggest speedup).
+            frames.show(text, first, last - 1)
+            text_content = annotate_fmt(v)
+            if title == "Speculative Speedups over Vanilla Decoding" and v == best:
+                text_content = "★ " + text_content
+            frames.show(ax.text(cx, v + y_offset, text_content, ha="center", va="bottom",
+                                fontsize=10, fontweight="bold"), last)
 
     centers = group_offsets + (n_series * bar_w) / 2.0
     ax.set_xticks(centers, bench_order_labels)
@@ -172,9 +162,9 @@ def plot_grouped(ax, data_by_bench, title, ylabel, annotate_fmt, num_bars_to_sho
     ax.set_xlabel("Benchmarks")
     ax.set_ylabel(ylabel)
     ax.grid(axis='y', linestyle=':', alpha=0.5)
-    
+
     # Legend only shows visible bars
-    ax.legend(ncols=3, title="Speculation Methods", frameon=True, fancybox=True, framealpha=0.9)
+    frames.legend(ax, ncols=3, title="Speculation Methods", frameon=True, fancybox=True, framealpha=0.9)
 
 # ===================== Compute fixed y-limits =====================
 # Calculate y-limits based on full data to keep them consistent across all plots
@@ -182,42 +172,37 @@ speedup_ymax = _nanmax_dict(speedup5) * 1.12
 tokens_ymax = _nanmax_dict(tokens5) * 1.12
 
 # ===================== Generate 5 progressive plots =====================
-for num_bars in range(1, 6):
-    fig = plt.figure(figsize=(10.5, 6.2))
-    
-    # Enable highlighting only for the final plot (5of5)
-    highlight = (num_bars == 5)
-    
-    # Top: Speedups
-    ax1 = fig.add_subplot(2, 1, 1)
-    plot_grouped(
-        ax1,
-        speedup5,
-        title="Speculative Speedups over Vanilla Decoding",
-        ylabel="Speedup (×)",
-        annotate_fmt=lambda v: f"{v:.1f}x",
-        num_bars_to_show=num_bars,
-        fixed_ylim=(0, speedup_ymax),
-        highlight_our_results=highlight,
-    )
-    
-    # Bottom: Mean accepted tokens per step
-    ax2 = fig.add_subplot(2, 1, 2)
-    plot_grouped(
-        ax2,
-        tokens5,
-        title="Mean Accepted Tokens per Step",
-        ylabel="Mean Accepted Tokens\n(tokens/step)",
-        annotate_fmt=lambda v: f"{v:.1f}",
-        num_bars_to_show=num_bars,
-        fixed_ylim=(0, tokens_ymax),
-        highlight_our_results=highlight,
-    )
-    
-    fig.tight_layout()
-    
-    # Save to PNG with progressive numbering
-    out_path = f"benchmark_progressive_{num_bars}of5.png"
-    plt.savefig(out_path, format="png", bbox_inches="tight", dpi=300)
+# The figure is built once; each frame reveals one more series.
+fig = plt.figure(figsize=(10.5, 6.2))
+frames = ProgressiveFigure(fig, len(series_labels))
+
+# Top: Speedups
+ax1 = fig.add_subplot(2, 1, 1)
+plot_grouped(
+    ax1, frames,
+    speedup5,
+    title="Speculative Speedups over Vanilla Decoding",
+    ylabel="Speedup (×)",
+    annotate_fmt=lambda v: f"{v:.1f}x",
+    fixed_ylim=(0, speedup_ymax),
+)
+
+# Bottom: Mean accepted tokens per step
+ax2 = fig.add_subplot(2, 1, 2)
+plot_grouped(
+    ax2, frames,
+    tokens5,
+    title="Mean Accepted Tokens per Step",
+    ylabel="Mean Accepted Tokens\n(tokens/step)",
+    annotate_fmt=lambda v: f"{v:.1f}",
+    fixed_ylim=(0, tokens_ymax),
+)
+
+frames.frame(frames.num_frames)
+fig.tight_layout()
+
+# Save to PNG with progressive numbering
+for out_path in frames.save("benchmark_progressive_{i}of{n}.png", format="png",
+                            bbox_inches="tight", dpi=300):
     print(f"Saved: {out_path}")
-    plt.close(fig)
+plt.close(fig)
@@ -0,0 +1,82 @@
+"""Suffix-tree speculation engines and the benchmarks built on them."""
+
+from .adaptive import AdaptiveSpecLength
+from .base import BatchDraft, SuffixDraft, SuffixEngine
+from .bounded import BoundedSuffixTree
+from .budget import SpecBudgetScheduler
+from .compressed import CompressedSuffixTree
+from .concurrent import ConcurrentSuffixTree
+from .corpus import TraceRequest, load_corpus, save_corpus, synthetic_corpus
+from .depth import DepthSchedule
+from .hashmap import HashmapSuffixTree
+from .hybrid import DispatchStep, Drafter, HybridDispatcher, StubDrafter
+from .instrument import EngineStats, LatencyHistogram, instrument, uninstrument
+from .latency import LinearStepModel, RooflineStepModel, StepModel, predict_tpot_ms
+from .linked import LinkedSuffixTree
+from .memo import MemoSuffixTree
+from .memory import MemoryReport, traced_report
+from .ngram import NgramProposer
+from .replay import ReplayStats, replay, replay_concurrent
+from .results import ResultsStore
+from .simulator import (SpecCostModel, load_trace, parse_summary_concurrency, parse_summary_tables,
+                        save_trace, simulate_tpot, vanilla_trace)
+from .sharded import ShardedSuffixTree
+from .snapshot import Snapshot, SnapshotWriter, load_snapshot, save_snapshot
+from .suffix_array import SuffixArrayEngine
+from .tree import SuffixTree
+from .workloads import WORKLOADS, Workload, workload_corpus
+
+__all__ = [
+    "AdaptiveSpecLength",
+    "BatchDraft",
+    "BoundedSuffixTree",
+    "CompressedSuffixTree",
+    "ConcurrentSuffixTree",
+    "DepthSchedule",
+    "DispatchStep",
+    "Drafter",
+    "EngineStats",
+    "HashmapSuffixTree",
+    "HybridDispatcher",
+    "LatencyHistogram",
+    "LinearStepModel",
+    "LinkedSuffixTree",
+    "MemoSuffixTree",
+    "MemoryReport",
+    "NgramProposer",
+    "ReplayStats",
+    "ResultsStore",
+    "RooflineStepModel",
+    "ShardedSuffixTree",
+    "Snapshot",
+    "SnapshotWriter",
+    "SpecBudgetScheduler",
+    "SpecCostModel",
+    "StepModel",
+    "StubDrafter",
+    "SuffixArrayEngine",
+    "SuffixDraft",
+    "SuffixEngine",
+    "SuffixTree",
+    "TraceRequest",
+    "WORKLOADS",
+    "Workload",
+    "instrument",
+    "load_corpus",
+    "load_snapshot",
+    "load_trace",
+    "parse_summary_concurrency",
+    "parse_summary_tables",
+    "predict_tpot_ms",
+    "replay",
+    "replay_concurrent",
+    "save_corpus",
+    "save_snapshot",
+    "save_trace",
+    "simulate_tpot",
+    "synthetic_corpus",
+    "traced_report",
+    "uninstrument",
+    "vanilla_trace",
+    "workload_corpus",
+]
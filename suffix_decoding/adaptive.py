@@ -0,0 +1,82 @@
+"""Per-request adaptive speculation length.
+
+A fixed draft length of 32 verifies up to 32 tokens per request every step
+even when the request only ever accepts one or two. AdaptiveSpecLength
+keeps an exponentially weighted average of each request's accepted tokens
+and trims drafts to a limit derived from it, except for tokens whose path
+probability says the match is confident enough to verify anyway.
+"""
+
+import math
+from dataclasses import dataclass, field
+
+from .base import SuffixDraft
+
+
+@dataclass
+class AdaptiveSpecLength:
+    """Draft-length controller with one acceptance history per request.
+
+    The limit for a request is ``ceil(gain * ewma) + 1`` clamped to
+    ``[min_tokens, max_tokens]``, where ``ewma`` averages its accepted
+    tokens per step. trim() keeps a draft's first ``limit`` tokens, plus
+    any following tokens whose estimated acceptance probability is at
+    least ``confident_prob``. A step that accepts the whole draft cannot
+    tell how much more would have been accepted, so it is recorded as
+    ``growth`` times the draft length to let the limit grow.
+
+    Args:
+        alpha: Weight of the newest step in the average.
+        gain: Headroom over the average acceptance.
+        initial: Average assumed for a request before its first step.
+        min_tokens: Smallest limit.
+        max_tokens: Largest limit; drafts are requested at this length.
+        confident_prob: Path probability that overrides the limit, or
+            None to use the limit alone.
+        growth: Multiplier applied to fully accepted drafts.
+    """
+    alpha: float = 0.3
+    gain: float = 1.5
+    initial: float = 4.0
+    min_tokens: int = 1
+    max_tokens: int = 32
+    confident_prob: float | None = 0.8
+    growth: float = 2.0
+    _ewma: dict[int, float] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        if not 0.0 < self.alpha <= 1.0:
+            raise ValueError(f"alpha must be in (0, 1], got {self.alpha}")
+        if not 0 <= self.min_tokens <= self.max_tokens:
+            raise ValueError(f"need 0 <= min_tokens <= max_tokens, "
+                             f"got [{self.min_tokens}, {self.max_tokens}]")
+
+    def limit(self, seq_id: int) -> int:
+        """Current draft-length limit of ``seq_id``, before confidence overrides."""
+        ewma = self._ewma.get(seq_id, self.initial)
+        return min(self.max_tokens, max(self.min_tokens, math.ceil(self.gain * ewma) + 1))
+
+    def trim(self, seq_id: int, draft: SuffixDraft) -> SuffixDraft:
+        """Cut ``draft`` in place to the request's limit and return it.
+
+        Works for linear drafts and for draft trees, whose flattened order
+        puts parents before children.
+        """
+        keep = self.limit(seq_id)
+        probs = draft.probs
+        if self.confident_prob is not None:
+            while keep < len(probs) and probs[keep] >= self.confident_prob:
+                keep += 1
+        draft.truncate(keep)
+        return draft
+
+    def update(self, seq_id: int, draft_len: int, accepted: int) -> None:
+        """Record a verified step; steps without a draft carry no signal."""
+        if draft_len == 0:
+            return
+        observed = self.growth * draft_len if accepted == draft_len else accepted
+        ewma = self._ewma.get(seq_id, self.initial)
+        self._ewma[seq_id] = ewma + self.alpha * (observed - ewma)
+
+    def finish(self, seq_id: int) -> None:
+        self._ewma.pop(seq_id, None)
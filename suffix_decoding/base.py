@@ -0,0 +1,342 @@
+"""Shared interface for the suffix-tree speculation engines."""
+
+import heapq
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import chain, count
+from typing import Callable, Hashable, Iterable, Iterator, Sequence
+
+import numpy as np
+
+from .memory import MemoryReport, deep_bytes
+
+# Smallest batch that speculate_batch() drafts with shared memos and writes
+# with one masked copy; below it both cost more than they save.
+_SHARED_MIN_BATCH = 12
+
+
+@dataclass
+class SuffixDraft:
+    """Draft tokens proposed by one speculate() call.
+
+    ``parents[i]`` is the index of the draft token that ``token_ids[i]``
+    continues (-1 for the last context token), so linear drafts and draft
+    trees share one layout. ``probs[i]`` is the estimated probability that
+    the path up to and including token ``i`` is accepted. ``token_ids``
+    may be a read-only memoryview into the engine's token storage
+    (CompressedSuffixTree); copy it with ``list()`` to keep it mutable.
+    """
+    token_ids: Sequence[int] = field(default_factory=list)
+    parents: list[int] = field(default_factory=list)
+    probs: list[float] = field(default_factory=list)
+    score: float = 0.0
+    match_len: int = 0
+
+    def truncate(self, keep: int) -> None:
+        """Keep the first ``keep`` tokens (parents precede children in trees)."""
+        if keep < len(self.token_ids):
+            self.token_ids = self.token_ids[:keep]
+            del self.parents[keep:], self.probs[keep:]
+            self.score = sum(self.probs)
+
+    def depths(self) -> np.ndarray:
+        """Distance of each draft token from the context (1 for a root child).
+
+        Add ``depths() - 1`` to the next position to get verification
+        position IDs.
+        """
+        depths = np.zeros(len(self.token_ids), dtype=np.int32)
+        for i, p in enumerate(self.parents):
+            depths[i] = 1 if p < 0 else depths[p] + 1
+        return depths
+
+    def attention_mask(self) -> np.ndarray:
+        """Tree attention mask for verifying the draft in one forward pass.
+
+        ``mask[i, j]`` is True when draft token ``j`` is token ``i`` or one
+        of its ancestors; every draft token also attends to the full
+        context. Parents always precede their children, so one pass builds
+        it. A linear draft gets a lower-triangular mask.
+        """
+        n = len(self.token_ids)
+        mask = np.eye(n, dtype=bool)
+        for i, p in enumerate(self.parents):
+            if p >= 0:
+                mask[i] |= mask[p]
+        return mask
+
+
+@dataclass
+class BatchDraft:
+    """Preallocated output of speculate_batch(), one row per request.
+
+    Row ``i`` holds ``lengths[i]`` draft tokens followed by -1 padding.
+    Allocate once with the largest batch and reuse it every step.
+    """
+    token_ids: np.ndarray
+    lengths: np.ndarray
+    scores: np.ndarray
+    match_lens: np.ndarray
+
+    @classmethod
+    def allocate(cls, max_batch_size: int, max_spec_tokens: int) -> "BatchDraft":
+        return cls(
+            token_ids=np.full((max_batch_size, max_spec_tokens), -1, dtype=np.int64),
+            lengths=np.zeros(max_batch_size, dtype=np.int32),
+            scores=np.zeros(max_batch_size, dtype=np.float64),
+            match_lens=np.zeros(max_batch_size, dtype=np.int32),
+        )
+
+    def row(self, i: int) -> np.ndarray:
+        """Draft tokens of request ``i`` as a view into the buffer."""
+        return self.token_ids[i, :self.lengths[i]]
+
+    def write_row(self, i: int, draft: SuffixDraft) -> None:
+        """Store ``draft`` as request ``i``, padding the rest of the row."""
+        n = len(draft.token_ids)
+        row = self.token_ids[i]
+        row[:n] = draft.token_ids
+        row[n:] = -1
+        self.lengths[i] = n
+        self.scores[i] = draft.score
+        self.match_lens[i] = draft.match_len
+
+
+class SuffixEngine:
+    """Base class for suffix-tree engines.
+
+    A tree stores every suffix (up to ``max_depth`` tokens) of every sequence
+    fed to extend(), with a count on each node. speculate() matches the tail
+    of a context against the tree and greedily follows the most frequent
+    continuation. Subclasses implement the data structure through
+    ``_matches`` and ``_draft``.
+
+    A decode loop can also keep a per-sequence match state with advance()
+    and call speculate_seq() instead of passing the context every step.
+    The default keeps the last ``max_depth`` tokens and re-matches them;
+    engines with suffix links override both to move a match pointer.
+    """
+
+    def __init__(self, max_depth: int = 64):
+        if max_depth < 1:
+            raise ValueError(f"max_depth must be positive, got {max_depth}")
+        self.max_depth = max_depth
+        self.depth_cap = max_depth
+        self._windows: dict[int, deque] = {}
+
+    def set_depth_cap(self, depth_cap: int) -> None:
+        """Limit matching to suffixes of at most ``depth_cap`` tokens.
+
+        Insertion still stores suffixes up to ``max_depth``, so the cap can be
+        lowered under load and raised again without rebuilding the tree.
+        """
+        if not 1 <= depth_cap <= self.max_depth:
+            raise ValueError(f"depth_cap must be in [1, {self.max_depth}], got {depth_cap}")
+        self.depth_cap = depth_cap
+
+    @property
+    def num_nodes(self) -> int:
+        raise NotImplementedError
+
+    def memory_report(self) -> MemoryReport:
+        """Bytes held by each component of the engine (see suffix_decoding.memory)."""
+        return MemoryReport(self._memory_components(), self._stored_tokens(), self.num_nodes)
+
+    def _memory_components(self) -> dict[str, int]:
+        return {"sequence_state": deep_bytes(self._windows)}
+
+    def _stored_tokens(self) -> int:
+        """Tokens inserted with extend() so far."""
+        raise NotImplementedError
+
+    def extend(self, seq_id: int, tokens: Sequence[int]) -> None:
+        """Append tokens to sequence ``seq_id`` and insert the new suffixes."""
+        raise NotImplementedError
+
+    def finish(self, seq_id: int) -> None:
+        """Drop the per-sequence insertion and match state; counts stay in the tree."""
+        self._windows.pop(seq_id, None)
+
+    def advance(self, seq_id: int, tokens: Sequence[int]) -> None:
+        """Append tokens to the match state of ``seq_id`` without inserting them."""
+        window = self._windows.get(seq_id)
+        if window is None:
+            window = self._windows[seq_id] = deque(maxlen=self.max_depth)
+        window.extend(tokens)
+
+    def speculate_seq(self, seq_id: int, max_spec_tokens: int = 32,
+                      min_token_prob: float = 0.1, tree: bool = False) -> SuffixDraft:
+        """Like speculate(), using the tokens passed to advance() as context."""
+        return self._best_draft(self._seq_matches(seq_id), max_spec_tokens, min_token_prob, tree)
+
+    def speculate_batch(self, seq_ids: Sequence[int], max_spec_tokens: int = 32,
+                        min_token_prob: float = 0.1,
+                        out: BatchDraft | None = None) -> BatchDraft:
+        """speculate_seq() for every request in a decode step at once.
+
+        In batches of 12 or more requests, requests whose match state is
+        identical (common when concurrent requests follow the same template)
+        are drafted once, every candidate match node is drafted at most once
+        however many requests' suffix chains reach it, and the drafts are
+        written to the buffer with one bulk copy per column. Smaller batches
+        are drafted and written one request at a time, as the memos and the
+        bulk copy cost more than they save there.
+        Results go to ``out`` (rows ``0..len(seq_ids)-1``) when given, so a
+        decode loop can reuse one allocation every step.
+        """
+        if out is None:
+            out = BatchDraft.allocate(len(seq_ids), max_spec_tokens)
+        elif out.token_ids.shape[0] < len(seq_ids) or out.token_ids.shape[1] < max_spec_tokens:
+            raise ValueError(f"buffer of shape {out.token_ids.shape} cannot hold "
+                             f"{len(seq_ids)} drafts of {max_spec_tokens} tokens")
+        drafts = self._draft_batch(seq_ids, max_spec_tokens, min_token_prob)
+        b, width = len(drafts), out.token_ids.shape[1]
+        if b < _SHARED_MIN_BATCH:
+            for i, draft in enumerate(drafts):
+                out.write_row(i, draft)
+            return out
+        # Scatter all drafts with one masked write; per-row numpy writes cost
+        # more than the drafting itself at large batch sizes.
+        lengths = out.lengths[:b]
+        lengths[:] = [len(d.token_ids) for d in drafts]
+        flat = np.fromiter(chain.from_iterable(d.token_ids for d in drafts),
+                           dtype=out.token_ids.dtype, count=int(lengths.sum()))
+        rows = out.token_ids[:b]
+        rows.fill(-1)
+        rows[np.arange(width) < lengths[:, None]] = flat
+        out.scores[:b] = [d.score for d in drafts]
+        out.match_lens[:b] = [d.match_len for d in drafts]
+        return out
+
+    def _draft_batch(self, seq_ids: Sequence[int], max_spec_tokens: int,
+                     min_token_prob: float) -> list[SuffixDraft]:
+        """One draft per request for speculate_batch(), drafting each match state once.
+
+        Drafts of individual match nodes are shared across the batch too:
+        requests with different match states still meet on the shorter
+        suffixes of their chains. Engines that override speculate_seq()
+        without using _seq_matches() override this as well.
+        """
+        if len(seq_ids) < _SHARED_MIN_BATCH:
+            return [self.speculate_seq(seq_id, max_spec_tokens, min_token_prob) for seq_id in seq_ids]
+        seq_memo: dict[Hashable, SuffixDraft] = {}
+        node_memo: dict[Hashable, SuffixDraft] = {}
+        drafts = []
+        for seq_id in seq_ids:
+            key = self._match_key(seq_id)
+            draft = seq_memo.get(key)
+            if draft is None:
+                draft = seq_memo[key] = self._best_draft(
+                    self._seq_matches(seq_id), max_spec_tokens, min_token_prob, memo=node_memo)
+            drafts.append(draft)
+        return drafts
+
+    def speculate(self, context: Sequence[int], max_spec_tokens: int = 32,
+                  min_token_prob: float = 0.1, tree: bool = False) -> SuffixDraft:
+        """Propose up to ``max_spec_tokens`` tokens that continue ``context``.
+
+        Every suffix of the context found in the tree is a candidate match,
+        longest first. Each candidate is drafted greedily and the draft with
+        the highest score wins; the search stops early once a draft reaches
+        ``max_spec_tokens``.
+
+        With ``tree`` each candidate is drafted as a tree instead (see
+        _draft_tree()); the flattened tokens come with ``parents`` and
+        attention_mask() for verification.
+        """
+        return self._best_draft(self._matches(context), max_spec_tokens, min_token_prob, tree)
+
+    def _best_draft(self, matches: Iterable[tuple[object, int]], max_spec_tokens: int,
+                    min_token_prob: float, tree: bool = False,
+                    memo: dict[Hashable, SuffixDraft] | None = None) -> SuffixDraft:
+        """Best draft over ``matches``; ``memo`` shares node drafts between calls."""
+        best = SuffixDraft()
+        if max_spec_tokens <= 0:
+            return best
+        draft_fn = self._draft_tree if tree else self._draft
+        if memo is not None:
+            draft_fn = self._memoized(draft_fn, memo)
+        for node, match_len in matches:
+            draft = draft_fn(node, match_len, max_spec_tokens, min_token_prob)
+            if draft.score > best.score:
+                best = draft
+            if len(best.token_ids) >= max_spec_tokens:
+                break
+        return best
+
+    def _memoized(self, draft_fn: Callable[..., SuffixDraft],
+                  memo: dict[Hashable, SuffixDraft]) -> Callable[..., SuffixDraft]:
+        """``draft_fn`` drafting each node at most once, keyed into ``memo``."""
+        node_key, get = self._node_key, memo.get
+
+        def draft(node, match_len, max_spec_tokens, min_token_prob):
+            # A node is one string, so it also determines match_len.
+            key = node if node_key is None else node_key(node)
+            cached = get(key)
+            if cached is None:
+                cached = memo[key] = draft_fn(node, match_len, max_spec_tokens, min_token_prob)
+            return cached
+        return draft
+
+    def _matches(self, context: Sequence[int]) -> Iterator[tuple[object, int]]:
+        """Yield ``(node, match_len)`` for each suffix of context in the tree."""
+        raise NotImplementedError
+
+    def _seq_matches(self, seq_id: int) -> Iterator[tuple[object, int]]:
+        """Like _matches(), for the match state kept by advance()."""
+        return self._matches(list(self._windows.get(seq_id, ())))
+
+    def _match_key(self, seq_id: int) -> Hashable:
+        """Hashable match state; equal keys must yield equal drafts."""
+        return tuple(self._windows.get(seq_id, ()))
+
+    # Engines whose match nodes are not hashable set this to a method that
+    # returns a hashable identity for one.
+    _node_key: Callable[[object], Hashable] | None = None
+
+    def _draft(self, node, match_len: int, max_spec_tokens: int,
+               min_token_prob: float) -> SuffixDraft:
+        """Follow the most frequent child from ``node`` while probable enough."""
+        raise NotImplementedError
+
+    def _children(self, node) -> Iterator[tuple[int, object, float]]:
+        """Yield ``(token, child, count[child] / count[node])``, most frequent first."""
+        raise NotImplementedError
+
+    def _draft_tree(self, node, match_len: int, max_spec_tokens: int,
+                    min_token_prob: float) -> SuffixDraft:
+        """Grow a draft tree from ``node`` best-first by path probability.
+
+        The frontier holds, for every drafted token (and the match itself),
+        only its most frequent child not yet drafted. Popping a candidate
+        drafts it and pushes its own best child and its next sibling, so a
+        high-fan-out node is read only as far as the tree uses it. A
+        candidate below ``min_token_prob`` is dropped together with its
+        later siblings and all descendants, none of which is more probable,
+        so the search ends once no remaining token would add that much
+        expected acceptance for its verify slot.
+        """
+        draft = SuffixDraft(match_len=match_len)
+        tiebreak = count()
+        # (-prob, tiebreak, parent prob, parent index, siblings, token, child)
+        frontier: list[tuple] = []
+
+        def push(parent_prob: float, parent_idx: int, siblings: Iterator) -> None:
+            for tok, child, ratio in siblings:
+                prob = parent_prob * ratio
+                if prob >= min_token_prob:
+                    heapq.heappush(frontier, (-prob, next(tiebreak), parent_prob,
+                                              parent_idx, siblings, tok, child))
+                return
+
+        push(1.0, -1, self._children(node))
+        while frontier and len(draft.token_ids) < max_spec_tokens:
+            neg_prob, _, parent_prob, parent_idx, siblings, tok, child = heapq.heappop(frontier)
+            idx = len(draft.token_ids)
+            draft.token_ids.append(tok)
+            draft.parents.append(parent_idx)
+            draft.probs.append(-neg_prob)
+            draft.score -= neg_prob
+            push(parent_prob, parent_idx, siblings)
+            push(-neg_prob, idx, self._children(child))
+        return draft
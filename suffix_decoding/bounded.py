@@ -0,0 +1,322 @@
+"""Memory-bounded suffix tree with cold-subtree eviction.
+
+When the live nodes exceed ``max_nodes``, or their bytes exceed
+``max_bytes``, the tree evicts cold leaves until it is back under
+``low_watermark`` of the budget. Evicting leaves round by round removes
+whole cold subtrees from the bottom up, and keeps two invariants the
+speculation path relies on:
+
+* Suffix closure: a node is only evicted once no live node's suffix link
+  points at it, so every suffix link stays valid.
+* Pinned state: nodes referenced by a sequence's insertion list or match
+  pointer are not evicted while they are referenced.
+
+If pinned nodes alone keep the tree over budget, the state of the least
+recently updated sequences is dropped, coldest first: their insertion
+list empties and their match pointer returns to the root, so their nodes
+become evictable and the sequences re-match from the root as new tokens
+arrive. The budget is therefore hard: it holds after every inserted token.
+
+Parent counts are left untouched, so ``count[child] / count[parent]`` is
+still the probability of that continuation among everything the parent
+has seen. The sibling list, inline head and child table of the parent are
+repaired on every eviction. Freed node slots are reused by later inserts.
+"""
+
+import struct
+from array import array
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .hashmap import EMPTY, NO_CHILD
+from .linked import LinkedSuffixTree
+from .memory import buffer_bytes, deep_bytes
+
+DEAD = 0xFFFFFFFF  # Parent of a free node slot.
+
+
+class BoundedSuffixTree(LinkedSuffixTree):
+    """Count-ordered suffix tree with a hard node or byte budget.
+
+    Args:
+        max_depth: Longest suffix stored, in tokens.
+        max_nodes: Live node budget, root included, or None for no node
+            limit.
+        max_bytes: Budget for the live nodes' columns plus their child
+            tables, in bytes, or None for no byte limit. Freed slots are
+            reused, so the allocated columns stay within the budget plus
+            one token's insertions.
+        low_watermark: Fraction of the budget to evict down to, so the
+            O(nodes) victim search runs once per batch of evictions.
+        policy: ``"lru"`` evicts the least recently touched leaves first;
+            ``"decay"`` evicts the lowest ``count * 0.5 ** (age / half_life)``
+            so frequent but old paths outlive one-off recent ones.
+        half_life: Age, in inserted tokens, that halves a node's weight
+            under the ``"decay"`` policy.
+        **kwargs: Passed to :class:`LinkedSuffixTree`.
+    """
+
+    def __init__(self, max_depth: int = 64, max_nodes: Optional[int] = 1 << 20,
+                 low_watermark: float = 0.9, policy: str = "lru",
+                 half_life: float = 1e6, max_bytes: Optional[int] = None, **kwargs):
+        super().__init__(max_depth, **kwargs)
+        self._parent = array("I", [0])
+        self._last = array("Q", [0])
+        # Column bytes per node, plus its slot in the child table list.
+        self.node_bytes = sum(col.itemsize for col in (
+            self._count, self._tok1, self._child1, self._table_size, self._link,
+            self._tok, self._next, self._prev, self._parent, self._last)) + struct.calcsize("P")
+        if max_nodes is None and max_bytes is None:
+            raise ValueError("at least one of max_nodes and max_bytes must be set")
+        if max_nodes is not None and max_nodes < 2:
+            raise ValueError(f"max_nodes must be at least 2, got {max_nodes}")
+        if max_bytes is not None and max_bytes < 2 * self.node_bytes:
+            raise ValueError(f"max_bytes must be at least {2 * self.node_bytes}, got {max_bytes}")
+        if not 0.0 < low_watermark <= 1.0:
+            raise ValueError(f"low_watermark must be in (0, 1], got {low_watermark}")
+        if policy not in ("lru", "decay"):
+            raise ValueError(f"policy must be 'lru' or 'decay', got {policy!r}")
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+        self.low_watermark = low_watermark
+        self.policy = policy
+        self.half_life = half_life
+        self.evicted = 0
+        self.dropped = 0
+        self._clock = 0
+        self._free: list[int] = []
+        self._table_nbytes = 0
+        self._seq_clock: dict[int, int] = {}
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self._count) - len(self._free)
+
+    @property
+    def num_bytes(self) -> int:
+        """Bytes charged against ``max_bytes``: live node columns plus child tables."""
+        return self.num_nodes * self.node_bytes + self._table_nbytes
+
+    def _new_node(self) -> int:
+        if not self._free:
+            self._parent.append(0)
+            self._last.append(self._clock)
+            return super()._new_node()
+        node = self._free.pop()
+        self._count[node] = 0
+        self._tok1[node] = EMPTY
+        self._child1[node] = NO_CHILD
+        self._tables[node] = None
+        self._table_size[node] = 0
+        self._link[node] = 0
+        self._tok[node] = EMPTY
+        self._next[node] = NO_CHILD
+        self._prev[node] = NO_CHILD
+        self._parent[node] = 0
+        self._last[node] = self._clock
+        return node
+
+    def _add_child(self, node: int, tok: int) -> int:
+        table = self._tables[node]
+        child = super()._add_child(node, tok)
+        self._parent[child] = node
+        if self._tables[node] is not table:
+            self._table_nbytes += buffer_bytes(self._tables[node])
+            if table is not None:
+                self._table_nbytes -= buffer_bytes(table)
+        return child
+
+    def extend(self, seq_id: int, tokens: Sequence[int]) -> None:
+        # LinkedSuffixTree.extend with LRU stamping and the budget check
+        # folded into the same per-token loop.
+        active = self._active.setdefault(seq_id, [])
+        count, tok1, child1, link, last = self._count, self._tok1, self._child1, self._link, self._last
+        free, node_bytes = self._free, self.node_bytes
+        max_nodes = self.max_nodes if self.max_nodes is not None else float("inf")
+        max_bytes = self.max_bytes if self.max_bytes is not None else float("inf")
+        clock = self._clock
+        for tok in tokens:
+            clock += 1
+            if len(active) == self.max_depth:
+                active.pop(0)
+            active.append(0)
+            shorter = 0
+            for i in range(len(active) - 1, -1, -1):
+                node = active[i]
+                if tok1[node] == tok:
+                    child = child1[node]
+                    count[child] += 1
+                else:
+                    child = self._child(node, tok)
+                    if child == NO_CHILD:
+                        child = self._add_child(node, tok)
+                        link[child] = shorter
+                    count[child] += 1
+                    self._promote(node, child)
+                last[child] = clock
+                active[i] = shorter = child
+            count[0] += 1
+            live = len(count) - len(free)
+            if live > max_nodes or live * node_bytes + self._table_nbytes > max_bytes:
+                self._clock = clock
+                self._seq_clock[seq_id] = clock
+                self._enforce_budget()
+        self._clock = clock
+        self._seq_clock[seq_id] = clock
+        self._reanchor(seq_id, len(tokens))
+
+    def advance(self, seq_id: int, tokens: Sequence[int]) -> None:
+        super().advance(seq_id, tokens)
+        self._last[self._pointers[seq_id][0]] = self._clock
+        self._seq_clock[seq_id] = self._clock
+
+    def finish(self, seq_id: int) -> None:
+        self._seq_clock.pop(seq_id, None)
+        super().finish(seq_id)
+
+    def _over_budget(self) -> bool:
+        return ((self.max_nodes is not None and self.num_nodes > self.max_nodes)
+                or (self.max_bytes is not None and self.num_bytes > self.max_bytes))
+
+    def _target_nodes(self) -> int:
+        """Live nodes to evict down to: the watermark of the tighter budget."""
+        limit = self.max_nodes if self.max_nodes is not None else self.num_nodes
+        if self.max_bytes is not None:
+            limit = min(limit, (self.max_bytes - self._table_nbytes) // self.node_bytes)
+        return int(limit * self.low_watermark)
+
+    def _enforce_budget(self) -> None:
+        """Evict back under budget, dropping the coldest sequences' state if needed."""
+        self.evict(self._target_nodes())
+        if not self._over_budget():
+            return
+        # Hottest first, so pop() yields the coldest.
+        seqs = sorted(self._active.keys() | self._pointers.keys(),
+                      key=lambda s: self._seq_clock.get(s, 0), reverse=True)
+        while seqs and self._over_budget():
+            self.drop_state(seqs.pop())
+            self.evict(self._target_nodes())
+
+    def drop_state(self, seq_id: int) -> None:
+        """Unpin the nodes held by ``seq_id`` so that eviction can reclaim them.
+
+        The sequence keeps running: later tokens are inserted and matched
+        starting from the root, so its drafts are short until the match
+        grows back.
+        """
+        active = self._active.get(seq_id)
+        if active:
+            active.clear()  # In place: extend() may be holding this list.
+        state = self._pointers.get(seq_id)
+        if state is not None:
+            state[0] = state[1] = 0
+        self.dropped += 1
+
+    def _memory_components(self) -> dict[str, int]:
+        components = super()._memory_components()
+        components["eviction"] = (buffer_bytes(self._parent) + buffer_bytes(self._last)
+                                  + deep_bytes(self._free) + deep_bytes(self._seq_clock))
+        return components
+
+    def evict(self, target_nodes: int) -> int:
+        """Evict cold leaves until at most ``target_nodes`` are live.
+
+        Returns the number of nodes evicted. Stops early if every remaining
+        leaf is pinned or still the target of a suffix link.
+        """
+        pinned = {node for active in self._active.values() for node in active}
+        pinned.update(state[0] for state in self._pointers.values())
+        pinned.add(0)
+        pinned_idx = np.fromiter(pinned, dtype=np.int64, count=len(pinned))
+        evicted = 0
+        while self.num_nodes > target_nodes:
+            victims = self._victims(self.num_nodes - target_nodes, pinned_idx)
+            if not victims:
+                break
+            for node in victims:
+                self._evict_node(node)
+            evicted += len(victims)
+        self.evicted += evicted
+        return evicted
+
+    def _victims(self, k: int, pinned_idx: np.ndarray) -> list[int]:
+        """Up to ``k`` evictable leaves, coldest first."""
+        parent = np.frombuffer(self._parent, dtype=np.uint32)
+        child1 = np.frombuffer(self._child1, dtype=np.uint32)
+        link = np.frombuffer(self._link, dtype=np.uint32)
+        alive = parent != DEAD
+        refs = np.bincount(link[alive], minlength=len(parent))
+        candidate = alive & (child1 == NO_CHILD) & (refs == 0)
+        candidate[pinned_idx] = False
+        idx = np.flatnonzero(candidate)
+        if idx.size == 0:
+            return []
+        last = np.frombuffer(self._last, dtype=np.uint64)[idx]
+        if self.policy == "lru":
+            score = last
+        else:
+            count = np.frombuffer(self._count, dtype=np.uint32)[idx]
+            score = count * np.exp2(-(self._clock - last.astype(np.float64)) / self.half_life)
+        if idx.size > k:
+            idx = idx[np.argpartition(score, k - 1)[:k]]
+        return idx.tolist()
+
+    def _evict_node(self, node: int) -> None:
+        """Unlink a leaf from its parent and free its slot."""
+        nxt, prev = self._next, self._prev
+        parent = self._parent[node]
+        head = self._child1[parent]
+        after = nxt[node]
+        if node == head:
+            if after == NO_CHILD:
+                self._child1[parent] = NO_CHILD
+                self._tok1[parent] = EMPTY
+            else:
+                prev[after] = prev[node]
+                self._child1[parent] = after
+                self._tok1[parent] = self._tok[after]
+        else:
+            before = prev[node]
+            nxt[before] = after
+            if after != NO_CHILD:
+                prev[after] = before
+            else:
+                prev[head] = before
+        table = self._tables[parent]
+        if table is not None:
+            size = self._table_size[parent] - 1
+            if size < self.table_min_children:
+                self._tables[parent] = None
+                self._table_nbytes -= buffer_bytes(table)
+                size = 0
+            else:
+                self._delete(table, self._tok[node])
+            self._table_size[parent] = size
+        self._parent[node] = DEAD
+        self._count[node] = 0
+        self._tables[node] = None
+        self._free.append(node)
+
+    @staticmethod
+    def _delete(table: array, tok: int) -> None:
+        """Remove ``tok`` by shifting later entries of its probe run back."""
+        mask = (len(table) >> 1) - 1
+        i = (tok * 0x9E3779B1 >> 16) & mask
+        while table[2 * i] != tok:
+            i = (i + 1) & mask
+        j = i
+        while True:
+            j = (j + 1) & mask
+            key = table[2 * j]
+            if key == EMPTY:
+                break
+            home = (key * 0x9E3779B1 >> 16) & mask
+            # Entries whose home lies cyclically in (i, j] stay put.
+            if (i < home <= j) if i <= j else (home > i or home <= j):
+                continue
+            table[2 * i] = key
+            table[2 * i + 1] = table[2 * j + 1]
+            i = j
+        table[2 * i] = EMPTY
+        table[2 * i + 1] = NO_CHILD
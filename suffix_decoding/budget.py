@@ -0,0 +1,94 @@
+"""Load-aware draft-token budget shared by all requests in a decode step.
+
+When the verify batch is compute-bound, every extra draft token costs
+forward-pass time whether or not it is accepted, so letting each request
+draft as much as it can makes speculation a net loss at high concurrency.
+SpecBudgetScheduler pools the draft tokens of all requests in a step,
+ranks them by estimated acceptance probability, and keeps only the best
+ones: requests with confident matches keep their drafts and the rest
+decode without speculation.
+"""
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from .base import SuffixDraft
+from .latency import StepModel
+
+
+@dataclass
+class SpecBudgetScheduler:
+    """Split a per-step draft-token budget across requests.
+
+    Each draft token's value is its ``probs`` entry, the probability that
+    it is accepted, so its expected contribution per verified token. Along
+    a draft (linear or flattened tree) these never increase, so the global
+    top-B tokens form a prefix of every request's draft.
+
+    The budget B is ``budget`` when given. Otherwise it is chosen every
+    step to maximize expected tokens per millisecond,
+    ``(batch_size + sum of kept probs) / step_model.step_ms(batch_size, B)``,
+    which shrinks it as the verify batch becomes compute-bound.
+
+    Args:
+        step_model: Verification latency model for the load-aware budget.
+        budget: Fixed total draft tokens per step; overrides ``step_model``.
+        max_per_request: Optional cap on any one request's share.
+    """
+    step_model: StepModel | None = None
+    budget: int | None = None
+    max_per_request: int | None = None
+
+    def __post_init__(self):
+        if self.step_model is None and self.budget is None:
+            raise ValueError("need a step_model or a fixed budget")
+
+    def allocate(self, drafts: Sequence[SuffixDraft]) -> np.ndarray:
+        """Number of leading draft tokens each request keeps this step."""
+        lengths = np.array([len(d.token_ids) for d in drafts], dtype=np.int64)
+        if self.max_per_request is not None:
+            np.minimum(lengths, self.max_per_request, out=lengths)
+        total = int(lengths.sum())
+        if total == 0:
+            return lengths
+        owner = np.repeat(np.arange(len(drafts)), lengths)
+        probs = np.fromiter((p for d, n in zip(drafts, lengths) for p in d.probs[:n]),
+                            dtype=np.float64, count=total)
+        # Stable, so equal probabilities keep draft order and stay prefixes.
+        order = np.argsort(-probs, kind="stable")
+        if self.budget is not None:
+            keep = min(self.budget, total)
+        else:
+            keep = self._best_budget(len(drafts), np.cumsum(probs[order]))
+        return np.bincount(owner[order[:keep]], minlength=len(drafts))
+
+    def _best_budget(self, batch_size: int, cum_probs: np.ndarray) -> int:
+        """Smallest B maximizing expected tokens per ms.
+
+        Expected tokens are concave in B (sorted gains) and step latency is
+        convex for the step models here, so the ratio rises then falls and
+        a binary search on its first decrease finds the peak.
+        """
+        step_ms = self.step_model.step_ms
+
+        def rate(b: int) -> float:
+            gain = batch_size + (cum_probs[b - 1] if b else 0.0)
+            return gain / step_ms(batch_size, b)
+
+        lo, hi = 0, len(cum_probs)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if rate(mid + 1) > rate(mid):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def apply(self, drafts: Sequence[SuffixDraft]) -> int:
+        """Trim ``drafts`` in place to their allocation; returns the tokens kept."""
+        counts = self.allocate(drafts)
+        for draft, keep in zip(drafts, counts.tolist()):
+            draft.truncate(keep)
+        return int(counts.sum())
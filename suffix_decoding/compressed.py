@@ -0,0 +1,335 @@
+"""Path-compressed suffix tree whose edges are spans of shared token buffers.
+
+Every sequence's tokens are appended once to its own ``array('I')`` buffer.
+An edge is a ``(buffer_id, start, end)`` span of one of those buffers, so a
+unary chain of the uncompressed tree is a single node and inserting a
+suffix never copies tokens. An edge is always labelled by one occurrence of
+its string: the tokens before ``start`` in the same buffer spell the path
+from the root, so any root path, and hence any linear draft, is one
+contiguous slice of a buffer and is returned as a memoryview into it.
+
+All positions on an edge share one count. A suffix that follows an existing
+edge part-way is *pending* on it: it has passed some of its tokens but only
+increments the edge's count once it reaches the end. Counts read
+mid-edge add the pending suffixes, so probabilities equal those of the
+uncompressed tree at any time. An edge is split only where counts really
+differ: where a suffix diverges, and where a finished sequence leaves
+suffixes pending.
+
+A suffix that ends at a count-1 leaf it created itself grows that leaf in
+place (``end += 1``), the open-ended leaf of Ukkonen's algorithm. There are
+no suffix links; matching re-walks from the root as the baseline does.
+"""
+
+from array import array
+from typing import Iterator, Sequence
+
+from .base import SuffixDraft, SuffixEngine
+from .hashmap import EMPTY, NO_CHILD
+from .memory import buffer_bytes, deep_bytes
+
+_MIN_BUFFER = 256  # Initial tokens per sequence buffer.
+
+
+class CompressedSuffixTree(SuffixEngine):
+    """Suffix tree with path-compressed, zero-copy edges ("compressed").
+
+    Args:
+        max_depth: Longest suffix stored, in tokens.
+    """
+
+    def __init__(self, max_depth: int = 64):
+        super().__init__(max_depth)
+        self._count = array("I", [0])
+        self._buf = array("I", [0])
+        self._start = array("I", [0])
+        self._end = array("I", [0])
+        self._parent = array("I", [0])
+        self._tok1 = array("I", [EMPTY])
+        self._child1 = array("I", [NO_CHILD])
+        self._more: list[dict[int, int] | None] = [None]
+        # Buffers are preallocated and never resized in place, so drafts can
+        # keep memoryviews of them while the sequence keeps growing.
+        self._buffers: list[array] = []
+        self._lengths: list[int] = []
+        self._seq_buf: dict[int, int] = {}
+        # Active suffixes as [node, rem] loci, deepest first: the suffix ends
+        # ``rem`` tokens before the end of ``node``'s edge. Pending ones
+        # (rem > 0) are also listed under their node. Counting from the end
+        # keeps a locus valid when the top of its edge is split off.
+        self._active: dict[int, list[list[int]]] = {}
+        self._pending: dict[int, list[list[int]]] = {}
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self._count)
+
+    def _stored_tokens(self) -> int:
+        return self._count[0]
+
+    def _new_node(self, buf: int, start: int, end: int, parent: int, count: int) -> int:
+        node = len(self._count)
+        self._count.append(count)
+        self._buf.append(buf)
+        self._start.append(start)
+        self._end.append(end)
+        self._parent.append(parent)
+        self._tok1.append(EMPTY)
+        self._child1.append(NO_CHILD)
+        self._more.append(None)
+        self._add_child(parent, self._buffers[buf][start], node)
+        return node
+
+    def _child(self, node: int, tok: int) -> int:
+        if self._tok1[node] == tok:
+            return self._child1[node]
+        more = self._more[node]
+        return NO_CHILD if more is None else more.get(tok, NO_CHILD)
+
+    def _add_child(self, node: int, tok: int, child: int) -> None:
+        if self._child1[node] == NO_CHILD:
+            self._tok1[node] = tok
+            self._child1[node] = child
+        elif self._more[node] is None:
+            self._more[node] = {tok: child}
+        else:
+            self._more[node][tok] = child
+
+    def _replace_child(self, node: int, tok: int, child: int) -> None:
+        if self._tok1[node] == tok:
+            self._child1[node] = child
+        else:
+            self._more[node][tok] = child
+
+    def _child_nodes(self, node: int) -> list[int]:
+        if self._child1[node] == NO_CHILD:
+            return []
+        more = self._more[node]
+        return [self._child1[node]] if more is None else [self._child1[node], *more.values()]
+
+    def _count_at(self, node: int, rem: int) -> int:
+        """Count of the string ending ``rem`` tokens before the end of ``node``'s edge."""
+        pending = self._pending.get(node)
+        if not pending:
+            return self._count[node]
+        return self._count[node] + sum(1 for locus in pending if locus[1] <= rem)
+
+    def _token(self, node: int, rem: int) -> int:
+        """The token after the locus ``(node, rem)``, for ``rem > 0``."""
+        return self._buffers[self._buf[node]][self._end[node] - rem]
+
+    def _unpend(self, locus: list[int]) -> None:
+        pending = self._pending[locus[0]]
+        for i, other in enumerate(pending):
+            if other is locus:
+                del pending[i]
+                break
+        if not pending:
+            del self._pending[locus[0]]
+
+    def _split(self, node: int, rem: int) -> int:
+        """Split ``node``'s edge ``rem`` tokens before its end; returns the new upper node.
+
+        Pending suffixes that passed the split point are counted in the
+        upper node, and those that stopped exactly there end at it.
+        """
+        parent = self._parent[node]
+        start, mid = self._start[node], self._end[node] - rem
+        upper = len(self._count)
+        self._count.append(self._count[node])
+        self._buf.append(self._buf[node])
+        self._start.append(start)
+        self._end.append(mid)
+        self._parent.append(parent)
+        self._tok1.append(EMPTY)
+        self._child1.append(NO_CHILD)
+        self._more.append(None)
+        self._replace_child(parent, self._buffers[self._buf[node]][start], upper)
+        self._start[node] = mid
+        self._parent[node] = upper
+        self._add_child(upper, self._token(node, rem), node)
+
+        below = []
+        for locus in self._pending.pop(node, ()):
+            if locus[1] > rem:
+                locus[0], locus[1] = upper, locus[1] - rem
+                self._pending.setdefault(upper, []).append(locus)
+            else:
+                self._count[upper] += 1
+                if locus[1] == rem:
+                    locus[0], locus[1] = upper, 0
+                else:
+                    below.append(locus)
+        if below:
+            self._pending[node] = below
+        return upper
+
+    def _append(self, seq_id: int, tokens: Sequence[int]) -> tuple[int, int]:
+        """Append ``tokens`` to the sequence's buffer; returns ``(buffer_id, start)``."""
+        bid = self._seq_buf.get(seq_id)
+        if bid is None:
+            bid = self._seq_buf[seq_id] = len(self._buffers)
+            self._buffers.append(array("I"))
+            self._lengths.append(0)
+        buf, n = self._buffers[bid], self._lengths[bid]
+        need = n + len(tokens)
+        if need > len(buf):
+            grown = array("I", bytes(4 * max(need, 2 * len(buf), _MIN_BUFFER)))
+            grown[:n] = buf[:n]
+            self._buffers[bid] = buf = grown
+        buf[n:need] = array("I", tokens)
+        self._lengths[bid] = need
+        return bid, n
+
+    def extend(self, seq_id: int, tokens: Sequence[int]) -> None:
+        bid, first = self._append(seq_id, tokens)
+        buf = self._buffers[bid]
+        active = self._active.setdefault(seq_id, [])
+        count, end, pending = self._count, self._end, self._pending
+        for pos in range(first, first + len(tokens)):
+            tok = buf[pos]
+            if len(active) == self.max_depth:
+                # Edges end at most max_depth deep, so this locus is at an
+                # edge end and owes no pending count.
+                active.pop(0)
+            active.append([0, 0])
+            for locus in active:
+                node, rem = locus
+                if rem:
+                    if self._token(node, rem) == tok:
+                        locus[1] = rem - 1
+                        if rem == 1:
+                            self._unpend(locus)
+                            count[node] += 1
+                        continue
+                    node = self._split(node, rem)
+                child = self._child(node, tok)
+                if child != NO_CHILD:
+                    locus[0] = child
+                    locus[1] = rem = end[child] - self._start[child] - 1
+                    if rem:
+                        pending.setdefault(child, []).append(locus)
+                    else:
+                        count[child] += 1
+                elif (node and count[node] == 1 and end[node] == pos and self._buf[node] == bid
+                      and self._child1[node] == NO_CHILD):
+                    # Our own leaf: grow it instead of chaining a new node.
+                    end[node] += 1
+                    for other in pending.get(node, ()):
+                        other[1] += 1
+                else:
+                    locus[0], locus[1] = self._new_node(bid, pos, pos + 1, node, 1), 0
+            count[0] += 1
+
+    def finish(self, seq_id: int) -> None:
+        for locus in self._active.pop(seq_id, ()):
+            # Split where the sequence's suffixes stop mid-edge; _split()
+            # settles their pending counts.
+            if locus[1]:
+                self._split(*locus)
+        bid = self._seq_buf.pop(seq_id, None)
+        if bid is not None:
+            self._buffers[bid] = self._buffers[bid][:self._lengths[bid]]
+        super().finish(seq_id)
+
+    def _matches(self, context: Sequence[int]) -> Iterator[tuple[tuple[int, int], int]]:
+        start, end, buf, buffers = self._start, self._end, self._buf, self._buffers
+        ctx = array("I", context)
+        n = len(ctx)
+        for first in range(max(0, n - self.depth_cap), n):
+            node, rem, i = 0, 0, first
+            while i < n:
+                if rem:
+                    # Compare the rest of the edge in one slice.
+                    m = min(rem, n - i)
+                    at = end[node] - rem
+                    if buffers[buf[node]][at:at + m] != ctx[i:i + m]:
+                        break
+                    rem -= m
+                    i += m
+                else:
+                    node = self._child(node, ctx[i])
+                    if node == NO_CHILD:
+                        break
+                    rem = end[node] - start[node] - 1
+                    i += 1
+            else:
+                yield (node, rem), n - first
+
+    def _draft(self, locus: tuple[int, int], match_len: int, max_spec_tokens: int,
+               min_token_prob: float) -> SuffixDraft:
+        start, end, pending = self._start, self._end, self._pending
+        draft = SuffixDraft(match_len=match_len)
+        parents, probs = draft.parents, draft.probs
+        node, rem = locus
+        here = self._count_at(node, rem)
+        prob = 1.0
+        k = 0
+        while k < max_spec_tokens:
+            if not rem:
+                best, best_count = NO_CHILD, 0
+                for child in self._child_nodes(node):
+                    c = self._count_at(child, end[child] - start[child] - 1)
+                    if c > best_count:
+                        best, best_count = child, c
+                if best == NO_CHILD:
+                    break
+                prob *= best_count / here
+                if prob < min_token_prob:
+                    break
+                node, rem, here = best, end[best] - start[best] - 1, best_count
+                parents.append(k - 1)
+                probs.append(prob)
+                draft.score += prob
+                k += 1
+            elif node not in pending:
+                # One count along the rest of the edge: take it in one go.
+                steps = min(rem, max_spec_tokens - k)
+                parents.extend(range(k - 1, k + steps - 1))
+                probs.extend([prob] * steps)
+                draft.score += prob * steps
+                rem -= steps
+                k += steps
+            else:
+                c = self._count_at(node, rem - 1)
+                prob *= c / here
+                if prob < min_token_prob:
+                    break
+                rem, here = rem - 1, c
+                parents.append(k - 1)
+                probs.append(prob)
+                draft.score += prob
+                k += 1
+        if k:
+            # The path to (node, rem) is spelled by the buffer before it.
+            stop = end[node] - rem
+            draft.token_ids = memoryview(self._buffers[self._buf[node]])[stop - k:stop]
+        return draft
+
+    def _children(self, locus: tuple[int, int]) -> Iterator[tuple[int, tuple[int, int], float]]:
+        node, rem = locus
+        total = self._count_at(node, rem)
+        if rem:
+            yield self._token(node, rem), (node, rem - 1), self._count_at(node, rem - 1) / total
+            return
+        children = []
+        for child in self._child_nodes(node):
+            rem = self._end[child] - self._start[child]
+            children.append((self._count_at(child, rem - 1), self._token(child, rem), child, rem - 1))
+        children.sort(key=lambda c: -c[0])
+        for c, tok, child, rem in children:
+            yield tok, (child, rem), c / total
+
+    def _memory_components(self) -> dict[str, int]:
+        components = super()._memory_components()
+        components["sequence_state"] += (deep_bytes(self._active) + deep_bytes(self._pending)
+                                         + deep_bytes(self._seq_buf))
+        return {
+            "counts": buffer_bytes(self._count),
+            "edge_spans": sum(buffer_bytes(col) for col in
+                              (self._buf, self._start, self._end, self._parent)),
+            "inline_child": buffer_bytes(self._tok1) + buffer_bytes(self._child1),
+            "child_dicts": deep_bytes(self._more),
+            "token_buffers": deep_bytes(self._buffers) + deep_bytes(self._lengths),
+            **components,
+        }
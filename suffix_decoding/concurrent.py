@@ -0,0 +1,116 @@
+"""Snapshot-isolated reads concurrent with tree updates.
+
+With one lock around the tree, speculation for the next step waits until
+the accepted tokens of the previous step are inserted. ConcurrentSuffixTree
+keeps two replicas of the engine instead (the left-right technique): the
+published replica is read-only while it is published, and the writer
+applies each batch to the standby replica, publishes it by swapping one
+index, and brings the retired replica up to date on its next write, once
+the last reader pinned to it has left. Readers never wait for a writer,
+only for the brief counter update that pins a replica; every read sees one
+consistent version. The price is twice the memory and each batch being
+applied twice.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Sequence
+
+from .base import SuffixDraft, SuffixEngine
+from .memory import MemoryReport, deep_bytes
+
+Batch = tuple[Sequence[tuple[int, Sequence[int]]], Sequence[int]]
+
+
+class ConcurrentSuffixTree:
+    """Two-replica engine whose readers never wait for a writer.
+
+    Per-request match state (advance() / speculate_seq()) mutates the
+    engine, so concurrent readers should draft from explicit contexts with
+    speculate().
+
+    Args:
+        factory: Builds one empty engine; called twice.
+    """
+
+    def __init__(self, factory: Callable[[], SuffixEngine]):
+        self._replicas = [factory(), factory()]
+        self._versions = [0, 0]
+        self._published = 0
+        self._readers = [0, 0]
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()
+        self._lag: list[Batch] = []  # Batches the standby replica has not seen yet.
+
+    @property
+    def version(self) -> int:
+        """Number of batches visible to new readers."""
+        return self._versions[self._published]
+
+    @contextmanager
+    def read(self) -> Iterator[tuple[int, SuffixEngine]]:
+        """Pin the published replica; yields ``(version, engine)``.
+
+        The engine does not change until the block exits. Do not call
+        mutating methods on it.
+        """
+        with self._lock:
+            i = self._published
+            self._readers[i] += 1
+        try:
+            yield self._versions[i], self._replicas[i]
+        finally:
+            with self._lock:
+                self._readers[i] -= 1
+                if self._readers[i] == 0:
+                    self._drained.notify_all()
+
+    def memory_report(self) -> MemoryReport:
+        """Both replicas' reports summed, plus the batches the standby still lags by.
+
+        Stored tokens are those of the published replica, so bytes per token
+        includes the cost of keeping two copies.
+        """
+        with self._write_lock:
+            published = self._replicas[self._published].memory_report()
+            report = published.merge(self._replicas[1 - self._published].memory_report())
+            report.stored_tokens = published.stored_tokens
+            report.components["lag_batches"] = deep_bytes(self._lag)
+        return report
+
+    def speculate(self, context: Sequence[int], max_spec_tokens: int = 32,
+                  min_token_prob: float = 0.1, tree: bool = False) -> SuffixDraft:
+        with self.read() as (_, engine):
+            return engine.speculate(context, max_spec_tokens, min_token_prob, tree)
+
+    def apply(self, updates: Sequence[tuple[int, Sequence[int]]],
+              finished: Sequence[int] = ()) -> int:
+        """Insert a batch of ``(seq_id, tokens)`` and finish ``finished``.
+
+        Returns the new version. Only waits for readers that pinned the
+        standby replica two versions ago, which is rare.
+        """
+        batch = (list(updates), list(finished))
+        with self._write_lock:
+            standby = 1 - self._published
+            with self._lock:
+                while self._readers[standby]:
+                    self._drained.wait()
+            engine = self._replicas[standby]
+            for pending in self._lag:
+                self._apply(engine, pending)
+            self._apply(engine, batch)
+            with self._lock:
+                self._versions[standby] = self._versions[self._published] + 1
+                self._published = standby
+            self._lag = [batch]
+            return self._versions[standby]
+
+    @staticmethod
+    def _apply(engine: SuffixEngine, batch: Batch) -> None:
+        updates, finished = batch
+        for seq_id, tokens in updates:
+            engine.extend(seq_id, tokens)
+        for seq_id in finished:
+            engine.finish(seq_id)
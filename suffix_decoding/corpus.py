@@ -0,0 +1,56 @@
+"""Replayable token corpora: one (prompt, response) pair of token IDs per request."""
+
+import json
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class TraceRequest:
+    prompt: list[int]
+    response: list[int]
+
+
+def load_corpus(path: str | Path) -> list[TraceRequest]:
+    """Read a JSONL corpus with ``prompt`` and ``response`` token-ID lists per line."""
+    corpus = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                obj = json.loads(line)
+                corpus.append(TraceRequest(list(obj["prompt"]), list(obj["response"])))
+    return corpus
+
+
+def save_corpus(corpus: list[TraceRequest], path: str | Path) -> None:
+    with open(path, "w") as f:
+        for req in corpus:
+            f.write(json.dumps({"prompt": req.prompt, "response": req.response}) + "\n")
+
+
+def synthetic_corpus(num_requests: int = 200, prompt_len: int = 256,
+                     response_len: int = 256, vocab_size: int = 32000,
+                     num_phrases: int = 400, phrase_len: int = 16,
+                     noise: float = 0.2, seed: int = 0) -> list[TraceRequest]:
+    """Generate a seeded corpus with cross-request reuse.
+
+    Requests are stitched together from a shared pool of phrases, with a
+    ``noise`` fraction of random tokens in between, so the suffix tree sees
+    repeated continuations the way it does on real traffic.
+    """
+    rng = random.Random(seed)
+    phrases = [[rng.randrange(vocab_size) for _ in range(phrase_len)]
+               for _ in range(num_phrases)]
+
+    def sample(length):
+        out = []
+        while len(out) < length:
+            if rng.random() < noise:
+                out.append(rng.randrange(vocab_size))
+            else:
+                out.extend(rng.choice(phrases))
+        return out[:length]
+
+    return [TraceRequest(sample(prompt_len), sample(response_len))
+            for _ in range(num_requests)]
@@ -0,0 +1,39 @@
+"""Load-dependent depth caps."""
+
+import json
+from pathlib import Path
+from typing import Sequence
+
+from .base import SuffixEngine
+
+
+class DepthSchedule:
+    """Match depth cap per concurrency band.
+
+    Args:
+        bands: ``(min_concurrency, depth)`` pairs. The band with the largest
+            ``min_concurrency`` not above the current load applies; loads
+            below every band use the first one.
+    """
+
+    def __init__(self, bands: Sequence[tuple[int, int]]):
+        if not bands:
+            raise ValueError("DepthSchedule needs at least one band")
+        self.bands = sorted((int(c), int(d)) for c, d in bands)
+
+    def depth_for(self, concurrency: int) -> int:
+        depth = self.bands[0][1]
+        for min_concurrency, band_depth in self.bands:
+            if concurrency >= min_concurrency:
+                depth = band_depth
+        return depth
+
+    def apply(self, engine: SuffixEngine, concurrency: int) -> None:
+        """Set the engine's depth cap for the current number of running requests."""
+        engine.set_depth_cap(min(self.depth_for(concurrency), engine.max_depth))
+
+    @classmethod
+    def load(cls, path: str | Path) -> "DepthSchedule":
+        """Read the ``bands`` written by benchmarks/depth_sweep.py."""
+        with open(path) as f:
+            return cls(json.load(f)["bands"])
@@ -0,0 +1,109 @@
+"""Progressive slide frames rendered from one figure.
+
+Slide builds reveal a chart a series at a time. Building a complete figure
+per frame, with the not-yet-shown series drawn invisibly to keep the
+layout, repeats all the plotting work; ProgressiveFigure builds the figure
+once, records from which frame each artist is shown, and per frame only
+toggles visibility and redraws the legends before saving. Every frame keeps
+the layout of the full figure.
+
+``bbox_inches="tight"`` is resolved once, on the last frame, instead of
+with an extra draw per frame; this also gives every frame the same size
+and alignment, so slides do not jump between builds.
+"""
+
+from typing import Iterable, Sequence
+
+from matplotlib import rcParams
+from matplotlib.artist import Artist
+from matplotlib.axes import Axes
+from matplotlib.container import Container
+from matplotlib.figure import Figure
+
+
+def _flatten(artists) -> list[Artist]:
+    out = []
+    for a in artists:
+        if isinstance(a, Container):
+            out.extend(_flatten(a.get_children()))
+        elif isinstance(a, Artist):
+            out.append(a)
+        else:
+            out.extend(_flatten(a))
+    return out
+
+
+class ProgressiveFigure:
+    """Frames ``1..num_frames`` of one figure.
+
+    Plot everything first, then register each artist (or container, such
+    as the result of ``ax.bar``) that does not appear in every frame with
+    show(). Legends registered with legend() list only the handles visible
+    in the frame. Artists never passed to show() appear in every frame.
+    """
+
+    def __init__(self, fig: Figure, num_frames: int):
+        self.fig = fig
+        self.num_frames = num_frames
+        self._ranges: list[tuple[Artist, int, int]] = []
+        self._legends: list[tuple[Axes, dict]] = []
+
+    def show(self, artists, first: int, last: int | None = None):
+        """Show ``artists`` in frames ``first..last`` (default: through the last frame)."""
+        last = self.num_frames if last is None else last
+        items = artists if isinstance(artists, (list, tuple)) else [artists]
+        for a in _flatten(items):
+            self._ranges.append((a, first, last))
+        return artists
+
+    def legend(self, ax: Axes, **kwargs) -> None:
+        """Give ``ax`` a legend of its visible labeled artists in every frame."""
+        self._legends.append((ax, kwargs))
+
+    def frame(self, i: int) -> None:
+        """Switch the figure to frame ``i``."""
+        for a, first, last in self._ranges:
+            a.set_visible(first <= i <= last)
+        for ax, kwargs in self._legends:
+            pairs = [(h, l) for h, l in zip(*ax.get_legend_handles_labels())
+                     if all(a.get_visible() for a in _flatten([h]))]
+            if pairs:
+                ax.legend([h for h, _ in pairs], [l for _, l in pairs], **kwargs)
+            elif ax.get_legend() is not None:
+                ax.get_legend().remove()
+
+    def _fixed_bbox(self, kwargs: dict) -> dict:
+        # A "tight" bbox costs a full draw per savefig; compute it once.
+        if kwargs.get("bbox_inches") != "tight":
+            return kwargs
+        self.frame(self.num_frames)
+        pad = kwargs.get("pad_inches", rcParams["savefig.pad_inches"])
+        bbox = self.fig.get_tightbbox(self.fig.canvas.get_renderer()).padded(pad)
+        return {**kwargs, "bbox_inches": bbox}
+
+    def save(self, pattern: str | Sequence[str], frames: Iterable[int] | None = None,
+             **kwargs) -> list[str]:
+        """Save each frame; returns the paths.
+
+        ``pattern`` is formatted with ``i`` (the frame) and ``n`` (the
+        number of frames), or is a list of paths, one per frame.
+        """
+        kwargs = self._fixed_bbox(kwargs)
+        paths = []
+        for i in frames if frames is not None else range(1, self.num_frames + 1):
+            self.frame(i)
+            path = pattern.format(i=i, n=self.num_frames) if isinstance(pattern, str) else pattern[i - 1]
+            self.fig.savefig(path, **kwargs)
+            paths.append(path)
+        return paths
+
+    def save_pdf(self, path: str, frames: Iterable[int] | None = None, **kwargs) -> str:
+        """Save the frames as the pages of one PDF."""
+        from matplotlib.backends.backend_pdf import PdfPages
+
+        kwargs = self._fixed_bbox(kwargs)
+        with PdfPages(path) as pdf:
+            for i in frames if frames is not None else range(1, self.num_frames + 1):
+                self.frame(i)
+                pdf.savefig(self.fig, **kwargs)
+        return path
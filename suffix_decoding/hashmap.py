@@ -0,0 +1,274 @@
+"""Array-backed suffix tree with open-addressing child tables.
+
+Nodes are integer indices into flat ``array('I')`` columns instead of Python
+objects, so a node costs a few machine words rather than an object plus a
+dict. The first child of every node is stored inline; nodes with more
+children keep the rest in a per-node open-addressing table of interleaved
+``(token, child)`` pairs with linear probing.
+
+Every node also has a suffix link to the node for its string minus the first
+token. Because all suffixes of an inserted window are inserted together,
+that node always exists, and a per-sequence match pointer (like the active
+point in Ukkonen's algorithm) can follow links when a token does not extend
+the current match instead of re-walking from the root. The pointer can only
+follow tokens already in the tree; if a sequence is advanced before its
+tokens are inserted, extend() re-anchors the pointer once the insertions
+catch up.
+"""
+
+import sys
+from array import array
+from typing import Iterator, Sequence
+
+from .base import SuffixDraft, SuffixEngine
+from .memory import buffer_bytes, deep_bytes
+
+EMPTY = 0xFFFFFFFF  # Free slot in a child table; not a valid token ID.
+NO_CHILD = 0  # The root is never anyone's child, so index 0 means "none".
+
+
+class HashmapSuffixTree(SuffixEngine):
+    """Suffix tree with compact array-backed child tables ("+Custom Hashmap").
+
+    Args:
+        max_depth: Longest suffix stored, in tokens.
+        max_load: Table load factor that triggers doubling. Lower values probe
+            less but use more memory.
+    """
+
+    def __init__(self, max_depth: int = 64, max_load: float = 0.75):
+        super().__init__(max_depth)
+        if not 0.0 < max_load < 1.0:
+            raise ValueError(f"max_load must be in (0, 1), got {max_load}")
+        self.max_load = max_load
+        self._count = array("I", [0])
+        self._tok1 = array("I", [EMPTY])
+        self._child1 = array("I", [NO_CHILD])
+        self._tables: list[array | None] = [None]
+        self._table_size = array("I", [0])
+        self._link = array("I", [0])
+        self._active: dict[int, list[int]] = {}
+        self._pointers: dict[int, list[int]] = {}
+        # Tokens passed to advance() minus tokens passed to extend(), per sequence.
+        self._ahead: dict[int, int] = {}
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self._count)
+
+    def _new_node(self) -> int:
+        self._count.append(0)
+        self._tok1.append(EMPTY)
+        self._child1.append(NO_CHILD)
+        self._tables.append(None)
+        self._table_size.append(0)
+        self._link.append(0)
+        return len(self._count) - 1
+
+    def _child(self, node: int, tok: int) -> int:
+        if self._tok1[node] == tok:
+            return self._child1[node]
+        table = self._tables[node]
+        if table is None:
+            return NO_CHILD
+        mask = (len(table) >> 1) - 1
+        i = (tok * 0x9E3779B1 >> 16) & mask
+        while True:
+            key = table[2 * i]
+            if key == tok:
+                return table[2 * i + 1]
+            if key == EMPTY:
+                return NO_CHILD
+            i = (i + 1) & mask
+
+    def _add_child(self, node: int, tok: int) -> int:
+        child = self._new_node()
+        if self._child1[node] == NO_CHILD:
+            self._tok1[node] = tok
+            self._child1[node] = child
+            return child
+        table = self._tables[node]
+        size = self._table_size[node] + 1
+        if table is None or size > self.max_load * (len(table) >> 1):
+            table = self._grow(table)
+            self._tables[node] = table
+        self._table_size[node] = size
+        self._insert(table, tok, child)
+        return child
+
+    @staticmethod
+    def _insert(table: array, tok: int, child: int) -> None:
+        mask = (len(table) >> 1) - 1
+        i = (tok * 0x9E3779B1 >> 16) & mask
+        while table[2 * i] != EMPTY:
+            i = (i + 1) & mask
+        table[2 * i] = tok
+        table[2 * i + 1] = child
+
+    def _grow(self, table: array | None) -> array:
+        capacity = 2 if table is None else len(table)
+        new = array("I", [EMPTY, NO_CHILD]) * capacity
+        if table is not None:
+            for i in range(0, len(table), 2):
+                if table[i] != EMPTY:
+                    self._insert(new, table[i], table[i + 1])
+        return new
+
+    def extend(self, seq_id: int, tokens: Sequence[int]) -> None:
+        active = self._active.setdefault(seq_id, [])
+        count, tok1, child1, link = self._count, self._tok1, self._child1, self._link
+        for tok in tokens:
+            if len(active) == self.max_depth:
+                active.pop(0)
+            active.append(0)
+            # Shallowest first, so a new node's suffix link target exists.
+            shorter = 0
+            for i in range(len(active) - 1, -1, -1):
+                node = active[i]
+                # Fast path: most nodes have a single child, stored inline.
+                child = child1[node] if tok1[node] == tok else self._child(node, tok)
+                if child == NO_CHILD:
+                    child = self._add_child(node, tok)
+                    link[child] = shorter
+                count[child] += 1
+                active[i] = shorter = child
+            count[0] += 1
+        self._reanchor(seq_id, len(tokens))
+
+    def _reanchor(self, seq_id: int, inserted: int) -> None:
+        """Catch the match pointer up with tokens it walked before they were inserted.
+
+        When the insertions of ``seq_id`` reach the pointer's position, the
+        deepest node of the insertion list is the longest match of the
+        context, so a pointer left short by the missing tokens moves there.
+        """
+        ahead = self._ahead.get(seq_id, 0)
+        self._ahead[seq_id] = ahead - inserted
+        if 0 < ahead == inserted:
+            state = self._pointers.get(seq_id)
+            active = self._active[seq_id]
+            if state is not None and len(active) > state[1]:
+                state[0], state[1] = active[0], len(active)
+
+    def finish(self, seq_id: int) -> None:
+        self._active.pop(seq_id, None)
+        self._pointers.pop(seq_id, None)
+        self._ahead.pop(seq_id, None)
+        super().finish(seq_id)
+
+    def _stored_tokens(self) -> int:
+        return self._count[0]
+
+    def _memory_components(self) -> dict[str, int]:
+        components = super()._memory_components()
+        components["sequence_state"] += (deep_bytes(self._active) + deep_bytes(self._pointers)
+                                         + deep_bytes(self._ahead))
+        return {
+            "counts": buffer_bytes(self._count),
+            "suffix_links": buffer_bytes(self._link),
+            "inline_child": buffer_bytes(self._tok1) + buffer_bytes(self._child1),
+            "child_tables": self._table_bytes() + buffer_bytes(self._table_size),
+            **components,
+        }
+
+    def _table_bytes(self) -> int:
+        return sys.getsizeof(self._tables) + sum(
+            sys.getsizeof(t) for t in self._tables if t is not None)
+
+    def advance(self, seq_id: int, tokens: Sequence[int]) -> None:
+        """Move the match pointer of ``seq_id`` over ``tokens``.
+
+        Amortized O(1) per token: the match grows by at most one token per
+        step, and every fallback along a suffix link shortens it by one.
+        Tokens not yet inserted shorten the match; extend() with the same
+        tokens afterwards re-anchors it (see _reanchor()).
+        """
+        self._ahead[seq_id] = self._ahead.get(seq_id, 0) + len(tokens)
+        state = self._pointers.get(seq_id)
+        if state is None:
+            state = self._pointers[seq_id] = [0, 0]
+        node, length = state
+        tok1, child1, link = self._tok1, self._child1, self._link
+        for tok in tokens:
+            if length == self.max_depth:
+                node = link[node]
+                length -= 1
+            while True:
+                child = child1[node] if tok1[node] == tok else self._child(node, tok)
+                if child != NO_CHILD:
+                    node = child
+                    length += 1
+                    break
+                if node == 0:
+                    break
+                node = link[node]
+                length -= 1
+        state[0], state[1] = node, length
+
+    def _seq_matches(self, seq_id: int) -> Iterator[tuple[int, int]]:
+        node, length = self._pointers.get(seq_id, (0, 0))
+        return self._link_chain(node, length)
+
+    def _match_key(self, seq_id: int) -> int:
+        # A node has a unique depth, so it identifies the whole match state.
+        return self._pointers.get(seq_id, (0, 0))[0]
+
+    def _link_chain(self, node: int, length: int) -> Iterator[tuple[int, int]]:
+        """Yield the matched node and every shorter suffix via suffix links."""
+        link = self._link
+        while length > self.depth_cap:
+            node = link[node]
+            length -= 1
+        while length > 0:
+            yield node, length
+            node = link[node]
+            length -= 1
+
+    def _matches(self, context: Sequence[int]) -> Iterator[tuple[int, int]]:
+        tok1, child1 = self._tok1, self._child1
+        n = len(context)
+        for start in range(max(0, n - self.depth_cap), n):
+            node = 0
+            for tok in context[start:]:
+                node = child1[node] if tok1[node] == tok else self._child(node, tok)
+                if node == NO_CHILD:
+                    break
+            else:
+                yield node, n - start
+
+    def _draft(self, node: int, match_len: int, max_spec_tokens: int,
+               min_token_prob: float) -> SuffixDraft:
+        count, tok1, child1, tables = self._count, self._tok1, self._child1, self._tables
+        draft = SuffixDraft(match_len=match_len)
+        prob = 1.0
+        while len(draft.token_ids) < max_spec_tokens and child1[node] != NO_CHILD:
+            best_tok, best = tok1[node], child1[node]
+            best_count = count[best]
+            table = tables[node]
+            if table is not None:
+                for i in range(0, len(table), 2):
+                    if table[i] != EMPTY and count[table[i + 1]] > best_count:
+                        best_tok, best = table[i], table[i + 1]
+                        best_count = count[best]
+            prob *= best_count / count[node]
+            if prob < min_token_prob:
+                break
+            draft.parents.append(len(draft.token_ids) - 1)
+            draft.token_ids.append(best_tok)
+            draft.probs.append(prob)
+            draft.score += prob
+            node = best
+        return draft
+
+    def _children(self, node: int) -> Iterator[tuple[int, int, float]]:
+        count, table = self._count, self._tables[node]
+        if self._child1[node] == NO_CHILD:
+            return
+        children = [(self._tok1[node], self._child1[node])]
+        if table is not None:
+            children.extend((table[i], table[i + 1]) for i in range(0, len(table), 2)
+                            if table[i] != EMPTY)
+        children.sort(key=lambda tc: -count[tc[1]])
+        total = count[node]
+        for tok, child in children:
+            yield tok, child, count[child] / total
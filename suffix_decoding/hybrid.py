@@ -0,0 +1,193 @@
+"""Per-step dispatch between suffix speculation and a model-based drafter.
+
+A hybrid that runs the draft model every step pays for it even when the
+suffix tree already has a confident match. HybridDispatcher drafts from
+the suffix tree first and only calls the drafter when the suffix draft's
+score (its expected number of accepted tokens) is below a threshold. Every
+step records which path ran and what it cost.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional, Protocol, Sequence
+
+from .base import SuffixDraft, SuffixEngine
+
+
+class Drafter(Protocol):
+    """Model-based speculator, driven by per-request state or a full context."""
+
+    def advance(self, seq_id: int, tokens: Sequence[int]) -> None:
+        """Append accepted tokens to the context of ``seq_id``."""
+        ...
+
+    def finish(self, seq_id: int) -> None:
+        ...
+
+    def speculate_seq(self, seq_id: int, max_spec_tokens: int = 32,
+                      min_token_prob: float = 0.1, tree: bool = False) -> SuffixDraft:
+        ...
+
+    def speculate(self, context: Sequence[int], max_spec_tokens: int = 32,
+                  min_token_prob: float = 0.1, tree: bool = False) -> SuffixDraft:
+        ...
+
+    def step_ms(self, draft_tokens: int) -> float:
+        """Device time of drafting ``draft_tokens`` tokens, not measured on the CPU."""
+        ...
+
+
+@dataclass
+class StubDrafter:
+    """CPU stand-in for a draft model.
+
+    Proposes drafts from another engine, assigns each token a fixed
+    acceptance probability so its score is comparable with suffix drafts,
+    and charges a modeled per-step cost in place of the draft model's
+    forward passes. An NgramProposer gives prompt-lookup drafts, which the
+    suffix tree already covers (it holds the request's own context); a
+    tree built once from other requests and never extended stands in for a
+    draft model trained on similar traffic.
+
+    Args:
+        proposer: Source of draft tokens.
+        token_prob: Estimated acceptance probability of each draft token.
+        base_ms: Modeled fixed cost of one drafting step.
+        ms_per_token: Modeled cost per drafted token (one draft forward each).
+    """
+    proposer: SuffixEngine
+    token_prob: float = 0.7
+    base_ms: float = 0.2
+    ms_per_token: float = 0.4
+
+    def advance(self, seq_id: int, tokens: Sequence[int]) -> None:
+        self.proposer.advance(seq_id, tokens)
+
+    def finish(self, seq_id: int) -> None:
+        self.proposer.finish(seq_id)
+
+    def speculate_seq(self, seq_id: int, max_spec_tokens: int = 32,
+                      min_token_prob: float = 0.1, tree: bool = False) -> SuffixDraft:
+        return self._rescore(self.proposer.speculate_seq(seq_id, max_spec_tokens), min_token_prob)
+
+    def speculate(self, context: Sequence[int], max_spec_tokens: int = 32,
+                  min_token_prob: float = 0.1, tree: bool = False) -> SuffixDraft:
+        return self._rescore(self.proposer.speculate(context, max_spec_tokens), min_token_prob)
+
+    def _rescore(self, draft: SuffixDraft, min_token_prob: float) -> SuffixDraft:
+        """Replace the proposer's probabilities with the fixed per-token estimate."""
+        prob, keep = 1.0, len(draft.token_ids)
+        for i in range(keep):
+            prob *= self.token_prob
+            if prob < min_token_prob:
+                keep = i
+                break
+            draft.probs[i] = prob
+        draft.truncate(keep)
+        draft.score = sum(draft.probs)
+        return draft
+
+    def step_ms(self, draft_tokens: int) -> float:
+        return self.base_ms + self.ms_per_token * draft_tokens
+
+
+@dataclass
+class DispatchStep:
+    """One speculation step of HybridDispatcher."""
+    seq_id: Optional[int]  # None for a context-based speculate() call.
+    path: str  # "suffix" or "model"
+    source: str  # Drafter of the returned draft: "suffix" or "model"
+    suffix_score: float
+    draft_len: int
+    suffix_us: float
+    drafter_us: float = 0.0
+    drafter_ms: float = 0.0  # Modeled device time from Drafter.step_ms().
+
+
+class HybridDispatcher(SuffixEngine):
+    """Suffix engine that falls back to a drafter on weak matches.
+
+    Each speculate_seq() or speculate() drafts from ``suffix`` first. If
+    the draft's score is at least ``score_threshold`` it is used as is
+    ("suffix" path); otherwise the drafter runs on the same request state
+    or context and the higher-scoring of the two drafts is used ("model"
+    path). ``score_threshold=0`` never calls the drafter and
+    ``float("inf")`` calls it every step, like an always-on hybrid.
+
+    Args:
+        suffix: Engine that holds the suffix tree.
+        drafter: Model-based speculator.
+        score_threshold: Minimum suffix score that skips the drafter.
+        record: Append a DispatchStep to ``steps`` for every call.
+    """
+
+    def __init__(self, suffix: SuffixEngine, drafter: Drafter,
+                 score_threshold: float = 2.0, record: bool = True):
+        super().__init__(suffix.max_depth)
+        self.suffix = suffix
+        self.drafter = drafter
+        self.score_threshold = score_threshold
+        self.record = record
+        self.steps: list[DispatchStep] = []
+
+    @property
+    def num_nodes(self) -> int:
+        return self.suffix.num_nodes
+
+    def set_depth_cap(self, depth_cap: int) -> None:
+        self.suffix.set_depth_cap(depth_cap)
+        super().set_depth_cap(depth_cap)
+
+    def extend(self, seq_id: int, tokens: Sequence[int]) -> None:
+        self.suffix.extend(seq_id, tokens)
+
+    def finish(self, seq_id: int) -> None:
+        self.suffix.finish(seq_id)
+        self.drafter.finish(seq_id)
+
+    def advance(self, seq_id: int, tokens: Sequence[int]) -> None:
+        self.suffix.advance(seq_id, tokens)
+        self.drafter.advance(seq_id, tokens)
+
+    def speculate_seq(self, seq_id: int, max_spec_tokens: int = 32,
+                      min_token_prob: float = 0.1, tree: bool = False) -> SuffixDraft:
+        return self._dispatch(seq_id, self.suffix.speculate_seq, self.drafter.speculate_seq,
+                              seq_id, max_spec_tokens, min_token_prob, tree)
+
+    def speculate(self, context: Sequence[int], max_spec_tokens: int = 32,
+                  min_token_prob: float = 0.1, tree: bool = False) -> SuffixDraft:
+        return self._dispatch(None, self.suffix.speculate, self.drafter.speculate,
+                              context, max_spec_tokens, min_token_prob, tree)
+
+    def _dispatch(self, seq_id: Optional[int], suffix_fn: Callable[..., SuffixDraft],
+                  drafter_fn: Callable[..., SuffixDraft], *args) -> SuffixDraft:
+        """Draft with ``suffix_fn(*args)``, falling back to ``drafter_fn(*args)``."""
+        clock = time.perf_counter
+        t0 = clock()
+        draft = suffix_fn(*args)
+        t1 = clock()
+        if draft.score >= self.score_threshold:
+            if self.record:
+                self.steps.append(DispatchStep(seq_id, "suffix", "suffix", draft.score,
+                                               len(draft.token_ids), 1e6 * (t1 - t0)))
+            return draft
+        suffix_score = draft.score
+        model_draft = drafter_fn(*args)
+        t2 = clock()
+        source = "suffix"
+        if model_draft.score > draft.score:
+            draft, source = model_draft, "model"
+        if self.record:
+            self.steps.append(DispatchStep(
+                seq_id, "model", source, suffix_score, len(draft.token_ids), 1e6 * (t1 - t0),
+                1e6 * (t2 - t1), self.drafter.step_ms(len(model_draft.token_ids))))
+        return draft
+
+    def _match_key(self, seq_id: int) -> Hashable:
+        # The drafter sees the whole request context, so never coalesce.
+        return seq_id
+
+    def _draft_batch(self, seq_ids: Sequence[int], max_spec_tokens: int,
+                     min_token_prob: float) -> list[SuffixDraft]:
+        # Every request is dispatched (and recorded) on its own.
+        return [self.speculate_seq(seq_id, max_spec_tokens, min_token_prob) for seq_id in seq_ids]
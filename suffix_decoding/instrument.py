@@ -0,0 +1,172 @@
+"""Opt-in per-call instrumentation of an engine's hot path.
+
+instrument() wraps one engine instance (not its class) so that every
+speculate()/speculate_seq() call and every extend() call is timed and
+recorded in log-linear histograms, together with the match length, draft
+length and nodes visited of each draft. Nothing is installed until
+instrument() is called, so an engine that is not instrumented runs the
+unmodified methods; uninstrument() removes the wrappers again.
+
+Histograms follow the HDR layout: exact below 32, then 16 linear
+sub-buckets per power of two, so any recorded value is reported within
+about 3% at a fixed few hundred buckets regardless of range.
+"""
+
+import time
+from dataclasses import dataclass, field
+
+from .base import SuffixDraft, SuffixEngine
+
+_SUB_BITS = 5
+_SUB_HALF = 1 << (_SUB_BITS - 1)
+
+
+class LatencyHistogram:
+    """Counts of non-negative integers in log-linear buckets."""
+
+    def __init__(self):
+        self.counts: list[int] = []
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        shift = value.bit_length() - _SUB_BITS
+        if shift <= 0:
+            return value
+        return shift * _SUB_HALF + (value >> shift)
+
+    @staticmethod
+    def _value(index: int) -> int:
+        """Midpoint of bucket ``index``."""
+        if index < 2 * _SUB_HALF:
+            return index
+        shift = index // _SUB_HALF - 1
+        mantissa = index % _SUB_HALF + _SUB_HALF
+        return (mantissa << shift) + (1 << shift) // 2
+
+    def record(self, value: int) -> None:
+        i = self._index(value)
+        counts = self.counts
+        if i >= len(counts):
+            counts.extend([0] * (i + 1 - len(counts)))
+        counts[i] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> int:
+        """Value at percentile ``q`` (0-100), to bucket precision."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * q // 100))  # ceil, at least the first value
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self._value(i), self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        return {"count": self.count, "mean": self.mean, "p50": self.percentile(50),
+                "p99": self.percentile(99), "p999": self.percentile(99.9), "max": self.max}
+
+
+@dataclass
+class EngineStats:
+    """Histograms filled by an instrumented engine.
+
+    Latencies are in nanoseconds. ``match_len`` is the longest suffix
+    matched by each speculate call, whether or not it drafted;
+    ``nodes_visited`` counts its candidate match nodes plus the nodes
+    stepped through while drafting from them (root re-walks inside
+    matching are not counted).
+    """
+    speculate_ns: LatencyHistogram = field(default_factory=LatencyHistogram)
+    update_ns: LatencyHistogram = field(default_factory=LatencyHistogram)
+    match_len: LatencyHistogram = field(default_factory=LatencyHistogram)
+    draft_len: LatencyHistogram = field(default_factory=LatencyHistogram)
+    nodes_visited: LatencyHistogram = field(default_factory=LatencyHistogram)
+    update_tokens: int = 0
+    _visited: int = 0
+    _match_len: int = 0
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """Counters and percentiles of every histogram, as plain numbers."""
+        out = {name: getattr(self, name).summary()
+               for name in ("speculate_ns", "update_ns", "match_len", "draft_len", "nodes_visited")}
+        out["update_tokens"] = {"count": self.update_tokens}
+        return out
+
+
+_WRAPPED = ("speculate", "speculate_seq", "extend", "_draft", "_draft_tree")
+
+
+def instrument(engine: SuffixEngine) -> EngineStats:
+    """Start recording ``engine``'s calls; returns the stats it fills.
+
+    Instrumenting an engine again returns its existing stats.
+    """
+    existing = getattr(engine, "_stats", None)
+    if existing is not None:
+        return existing
+    stats = EngineStats()
+    clock = time.perf_counter_ns
+    speculate, speculate_seq = engine.speculate, engine.speculate_seq
+    extend, draft, draft_tree = engine.extend, engine._draft, engine._draft_tree
+
+    def timed(fn):
+        def wrapper(*args, **kwargs) -> SuffixDraft:
+            stats._visited = stats._match_len = 0
+            t0 = clock()
+            result = fn(*args, **kwargs)
+            stats.speculate_ns.record(clock() - t0)
+            stats.match_len.record(stats._match_len)
+            stats.draft_len.record(len(result.token_ids))
+            stats.nodes_visited.record(stats._visited)
+            return result
+        return wrapper
+
+    def counted(fn):
+        def wrapper(node, match_len, *args, **kwargs) -> SuffixDraft:
+            result = fn(node, match_len, *args, **kwargs)
+            stats._match_len = max(stats._match_len, match_len)
+            stats._visited += 1 + len(result.token_ids)
+            return result
+        return wrapper
+
+    def timed_extend(seq_id, tokens) -> None:
+        t0 = clock()
+        extend(seq_id, tokens)
+        stats.update_ns.record(clock() - t0)
+        stats.update_tokens += len(tokens)
+
+    engine.speculate = timed(speculate)
+    engine.speculate_seq = timed(speculate_seq)
+    engine.extend = timed_extend
+    engine._draft = counted(draft)
+    engine._draft_tree = counted(draft_tree)
+    engine._stats = stats
+    return stats
+
+
+def uninstrument(engine: SuffixEngine) -> EngineStats | None:
+    """Remove the wrappers; returns the stats recorded so far."""
+    for name in _WRAPPED:
+        engine.__dict__.pop(name, None)
+    return engine.__dict__.pop("_stats", None)
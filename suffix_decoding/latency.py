@@ -0,0 +1,68 @@
+"""Step-latency models for predicting TPOT from replay statistics."""
+
+from dataclasses import dataclass
+from typing import Protocol, Sequence
+
+# Vanilla TPOT (ms) on Spec-Bench from blog-post2/results_summary.md; a
+# vanilla step verifies exactly one token per request.
+SPECBENCH_VANILLA_TPOT = {1: 5.53, 4: 5.78, 16: 6.73, 64: 10.36}
+
+
+class StepModel(Protocol):
+    """Forward-pass (verification) latency of one engine step."""
+
+    def step_ms(self, batch_size: int, draft_tokens: float) -> float:
+        """Latency for ``batch_size`` requests verifying ``draft_tokens`` in total."""
+        ...
+
+
+@dataclass
+class LinearStepModel:
+    """Forward-pass latency linear in the number of tokens in the batch.
+
+    ``step_ms = base_ms + ms_per_token * tokens`` where ``tokens`` counts one
+    token per request plus every draft token being verified. The defaults
+    are a least-squares fit to the vanilla Spec-Bench TPOT column.
+    """
+    base_ms: float = 5.476
+    ms_per_token: float = 0.0764
+
+    def step_ms(self, batch_size: int, draft_tokens: float) -> float:
+        return self.base_ms + self.ms_per_token * (batch_size + draft_tokens)
+
+    @classmethod
+    def fit(cls, concurrency: Sequence[int], tpot_ms: Sequence[float]) -> "LinearStepModel":
+        """Fit to vanilla TPOT measurements, one token per request per step."""
+        n = len(concurrency)
+        mean_x = sum(concurrency) / n
+        mean_y = sum(tpot_ms) / n
+        var = sum((x - mean_x) ** 2 for x in concurrency)
+        cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(concurrency, tpot_ms))
+        slope = cov / var if var else 0.0
+        return cls(base_ms=mean_y - slope * mean_x, ms_per_token=slope)
+
+
+@dataclass
+class RooflineStepModel:
+    """Memory-bound floor until the batch's tokens make the step compute-bound.
+
+    ``step_ms = max(base_ms, ms_per_token * tokens)``. Extra draft tokens
+    are free until ``tokens`` reaches ``base_ms / ms_per_token``.
+    """
+    base_ms: float = 5.5
+    ms_per_token: float = 0.16
+
+    def step_ms(self, batch_size: int, draft_tokens: float) -> float:
+        return max(self.base_ms, self.ms_per_token * (batch_size + draft_tokens))
+
+
+def predict_tpot_ms(model: StepModel, batch_size: int, tokens_per_step: float,
+                    draft_tokens_per_step: float, spec_ms_per_step: float = 0.0) -> float:
+    """Mean time per output token for a batch of identical requests.
+
+    ``spec_ms_per_step`` is the CPU time to draft for one request; drafting
+    for the whole batch runs before the forward pass and adds to the step.
+    """
+    step = model.step_ms(batch_size, batch_size * draft_tokens_per_step)
+    step += batch_size * spec_ms_per_step
+    return step / max(tokens_per_step, 1e-9)
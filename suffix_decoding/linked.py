@@ -0,0 +1,214 @@
+"""Array-backed suffix tree with frequency-ordered doubly-linked child lists.
+
+Every node's children form a doubly-linked list sorted by count, highest
+first. The inline first-child slot of :class:`HashmapSuffixTree` always holds
+the head of that list, so the greedy speculation walk reads the best
+continuation in O(1) instead of scanning the child table. Counts only ever
+grow by one, so an increment moves a child past siblings that had the same
+count and nothing else.
+
+``prev`` is circular (the head's ``prev`` is the tail) so appending a new
+child is O(1) without a tail pointer per node; ``next`` of the tail is
+``NO_CHILD``.
+"""
+
+from array import array
+from typing import Iterator, Sequence
+
+from .base import SuffixDraft
+from .hashmap import EMPTY, NO_CHILD, HashmapSuffixTree
+from .memory import buffer_bytes
+
+
+class LinkedSuffixTree(HashmapSuffixTree):
+    """Suffix tree with count-ordered sibling lists ("+Double Linked List").
+
+    Args:
+        max_depth: Longest suffix stored, in tokens.
+        max_load: Child table load factor that triggers doubling.
+        table_min_children: Nodes get a child hash table once they have this
+            many children; smaller nodes find children by walking the sorted
+            sibling list. Raising it saves the table memory of low-fan-out
+            nodes at the cost of slower lookups and updates.
+        max_bubble: Upper bound on how many siblings a child may move past
+            per count increment, or None for exact ordering. A bound caps
+            the worst-case update cost when many siblings tie, at the price
+            of an only partly sorted list: a child stops short of the
+            siblings it outcounts and moves further only on its next
+            increments, so the head (and the greedy draft) can stay on a
+            less frequent child. Tree drafts sort the siblings they expand.
+    """
+
+    def __init__(self, max_depth: int = 64, max_load: float = 0.75,
+                 table_min_children: int = 2, max_bubble: int | None = None):
+        super().__init__(max_depth, max_load)
+        if table_min_children < 2:
+            raise ValueError(f"table_min_children must be at least 2, got {table_min_children}")
+        if max_bubble is not None and max_bubble < 1:
+            raise ValueError(f"max_bubble must be positive or None, got {max_bubble}")
+        self.table_min_children = table_min_children
+        self.max_bubble = max_bubble
+        self._tok = array("I", [EMPTY])
+        self._next = array("I", [NO_CHILD])
+        self._prev = array("I", [NO_CHILD])
+
+    def _new_node(self) -> int:
+        self._tok.append(EMPTY)
+        self._next.append(NO_CHILD)
+        self._prev.append(NO_CHILD)
+        return super()._new_node()
+
+    def _memory_components(self) -> dict[str, int]:
+        components = super()._memory_components()
+        components["sibling_lists"] = (buffer_bytes(self._tok) + buffer_bytes(self._next)
+                                       + buffer_bytes(self._prev))
+        return components
+
+    def _child(self, node: int, tok: int) -> int:
+        if self._tok1[node] == tok:
+            return self._child1[node]
+        if self._tables[node] is not None:
+            return super()._child(node, tok)
+        child = self._child1[node]
+        while child != NO_CHILD and self._tok[child] != tok:
+            child = self._next[child]
+        return child
+
+    def _add_child(self, node: int, tok: int) -> int:
+        child = self._new_node()
+        self._tok[child] = tok
+        head = self._child1[node]
+        if head == NO_CHILD:
+            self._child1[node] = child
+            self._tok1[node] = tok
+            self._prev[child] = child
+            return child
+        # A new child has the lowest count, so it goes at the tail.
+        tail = self._prev[head]
+        self._next[tail] = child
+        self._prev[child] = tail
+        self._prev[head] = child
+
+        table = self._tables[node]
+        if table is not None:
+            size = self._table_size[node] + 1
+            if size > self.max_load * (len(table) >> 1):
+                table = self._tables[node] = self._grow(table)
+            self._table_size[node] = size
+            self._insert(table, tok, child)
+        else:
+            siblings = []
+            c = head
+            while c != NO_CHILD:
+                siblings.append(c)
+                c = self._next[c]
+            if len(siblings) >= self.table_min_children:
+                capacity = 2
+                while len(siblings) > self.max_load * capacity:
+                    capacity *= 2
+                table = array("I", [EMPTY, NO_CHILD]) * capacity
+                for c in siblings:
+                    self._insert(table, self._tok[c], c)
+                self._tables[node] = table
+                self._table_size[node] = len(siblings)
+        return child
+
+    def _promote(self, node: int, child: int) -> None:
+        """Restore count order after ``count[child]`` was incremented."""
+        count, prev, nxt = self._count, self._prev, self._next
+        head = self._child1[node]
+        if child == head:
+            return
+        c = count[child]
+        p = prev[child]
+        if count[p] >= c:
+            return
+        # Find the first sibling to pass over: the run of lower counts ends
+        # at the head or at a sibling with count >= c.
+        target = p
+        steps = 1
+        limit = self.max_bubble
+        while target != head and count[prev[target]] < c and (limit is None or steps < limit):
+            target = prev[target]
+            steps += 1
+        # Unlink child.
+        n = nxt[child]
+        nxt[p] = n
+        if n != NO_CHILD:
+            prev[n] = p
+        else:
+            prev[head] = p
+        # Relink it in front of target.
+        if target == head:
+            prev[child] = prev[head]
+            nxt[child] = head
+            prev[head] = child
+            self._child1[node] = child
+            self._tok1[node] = self._tok[child]
+        else:
+            q = prev[target]
+            nxt[q] = child
+            prev[child] = q
+            nxt[child] = target
+            prev[target] = child
+
+    def extend(self, seq_id: int, tokens: Sequence[int]) -> None:
+        active = self._active.setdefault(seq_id, [])
+        count, tok1, child1, link = self._count, self._tok1, self._child1, self._link
+        for tok in tokens:
+            if len(active) == self.max_depth:
+                active.pop(0)
+            active.append(0)
+            shorter = 0
+            for i in range(len(active) - 1, -1, -1):
+                node = active[i]
+                if tok1[node] == tok:
+                    # Already the head: incrementing cannot reorder anything.
+                    child = child1[node]
+                    count[child] += 1
+                else:
+                    child = self._child(node, tok)
+                    if child == NO_CHILD:
+                        child = self._add_child(node, tok)
+                        link[child] = shorter
+                    count[child] += 1
+                    self._promote(node, child)
+                active[i] = shorter = child
+            count[0] += 1
+        self._reanchor(seq_id, len(tokens))
+
+    def _draft(self, node: int, match_len: int, max_spec_tokens: int,
+               min_token_prob: float) -> SuffixDraft:
+        count, tok1, child1 = self._count, self._tok1, self._child1
+        draft = SuffixDraft(match_len=match_len)
+        prob = 1.0
+        while len(draft.token_ids) < max_spec_tokens and child1[node] != NO_CHILD:
+            best = child1[node]
+            prob *= count[best] / count[node]
+            if prob < min_token_prob:
+                break
+            draft.parents.append(len(draft.token_ids) - 1)
+            draft.token_ids.append(tok1[node])
+            draft.probs.append(prob)
+            draft.score += prob
+            node = best
+        return draft
+
+    def _children(self, node: int) -> Iterator[tuple[int, int, float]]:
+        # The sibling list is count-ordered, so walk it lazily, unless
+        # max_bubble may have left it partly unsorted.
+        count, tok, nxt = self._count, self._tok, self._next
+        total = count[node]
+        child = self._child1[node]
+        if self.max_bubble is not None:
+            siblings = []
+            while child != NO_CHILD:
+                siblings.append(child)
+                child = nxt[child]
+            siblings.sort(key=count.__getitem__, reverse=True)
+            for child in siblings:
+                yield tok[child], child, count[child] / total
+            return
+        while child != NO_CHILD:
+            yield tok[child], child, count[child] / total
+            child = nxt[child]
@@ -0,0 +1,162 @@
+"""Suffix tree that memoizes each node's greedy continuation path.
+
+A linear draft follows the most frequent child again and again from the
+matched node, and between decode steps that path rarely changes: counts
+along it grow, but which child is the most frequent seldom does. Every node
+keeps its most frequent child in a column that extend() maintains in O(1)
+per increment, and drafting caches the chain of those best children from
+the matched node as a list of tokens and nodes, as far as the draft went. A
+repeated draft from the same node is a slice of the cached tokens plus one
+division per token for the probabilities, which always come from the live
+counts; a longer draft extends the cached path in place.
+
+A cached path only depends on the best-child choices along it, so it is
+dropped only when one of them changes. The nodes whose paths pass through
+a node are found by walking up parent pointers for as long as each node is
+its parent's best child, and only from nodes marked as lying on a cached
+path, so an increment that changes no cached ranking costs nothing beyond
+the comparison.
+"""
+
+import sys
+from array import array
+from typing import Sequence
+
+from .base import SuffixDraft
+from .hashmap import NO_CHILD, HashmapSuffixTree
+from .memory import buffer_bytes, deep_bytes
+
+
+class MemoSuffixTree(HashmapSuffixTree):
+    """Hashmap suffix tree with memoized best-continuation paths ("memo").
+
+    Args:
+        max_depth: Longest suffix stored, in tokens.
+        max_load: Child table load factor that triggers doubling.
+
+    ``memo_hits`` counts drafts served entirely from cached paths and
+    ``memo_misses`` drafts that had to walk the tree (drafts from a leaf
+    are neither); ``rank_changes``
+    counts best-child changes of nodes on cached paths, ``invalidated`` the
+    cached paths they dropped and ``invalidation_steps`` the nodes walked to
+    find them.
+    """
+
+    def __init__(self, max_depth: int = 64, max_load: float = 0.75):
+        super().__init__(max_depth, max_load)
+        self._best = array("I", [NO_CHILD])
+        self._best_tok = array("I", [0])
+        self._parent = array("I", [0])
+        # Set on every node of a cached path (cleared lazily, so it may be stale).
+        self._on_path = bytearray(1)
+        # node -> [tokens, nodes]: the chain of best children from the node,
+        # as far as drafts have followed it.
+        self._paths: dict[int, list[list[int]]] = {}
+        self._longest_path = 0
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self.rank_changes = 0
+        self.invalidated = 0
+        self.invalidation_steps = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.memo_hits / max(self.memo_hits + self.memo_misses, 1)
+
+    def _new_node(self) -> int:
+        self._best.append(NO_CHILD)
+        self._best_tok.append(0)
+        self._parent.append(0)
+        self._on_path.append(0)
+        return super()._new_node()
+
+    def _memory_components(self) -> dict[str, int]:
+        components = super()._memory_components()
+        components["memo"] = (buffer_bytes(self._best) + buffer_bytes(self._best_tok)
+                              + buffer_bytes(self._parent) + sys.getsizeof(self._on_path)
+                              + deep_bytes(self._paths))
+        return components
+
+    def _invalidate(self, node: int) -> None:
+        """Drop the cached paths that read ``node``'s best child, after it changed."""
+        self._on_path[node] = 0
+        self.rank_changes += 1
+        paths, parent, best = self._paths, self._parent, self._best
+        # A path of n tokens reads the best child of its first n nodes.
+        for _ in range(self._longest_path):
+            self.invalidation_steps += 1
+            if paths.pop(node, None) is not None:
+                self.invalidated += 1
+            if node == 0:
+                break
+            up = parent[node]
+            if best[up] != node:
+                break
+            node = up
+
+    def extend(self, seq_id: int, tokens: Sequence[int]) -> None:
+        active = self._active.setdefault(seq_id, [])
+        count, tok1, child1, link = self._count, self._tok1, self._child1, self._link
+        best, best_tok, on_path = self._best, self._best_tok, self._on_path
+        for tok in tokens:
+            if len(active) == self.max_depth:
+                active.pop(0)
+            active.append(0)
+            shorter = 0
+            for i in range(len(active) - 1, -1, -1):
+                node = active[i]
+                child = child1[node] if tok1[node] == tok else self._child(node, tok)
+                if child == NO_CHILD:
+                    child = self._add_child(node, tok)
+                    link[child] = shorter
+                    self._parent[child] = node
+                count[child] += 1
+                b = best[node]
+                if b != child and (b == NO_CHILD or count[child] > count[b]):
+                    # Keep the current best on ties, as the child scan does.
+                    best[node] = child
+                    best_tok[node] = tok
+                    if on_path[node]:
+                        self._invalidate(node)
+                active[i] = shorter = child
+            count[0] += 1
+        self._reanchor(seq_id, len(tokens))
+
+    def _draft(self, node: int, match_len: int, max_spec_tokens: int,
+               min_token_prob: float) -> SuffixDraft:
+        entry = self._paths.get(node)
+        count, best = self._count, self._best
+        draft = SuffixDraft(match_len=match_len)
+        if entry is None and best[node] == NO_CHILD:
+            return draft
+        tokens, nodes = ([], []) if entry is None else entry
+        prob, total = 1.0, count[node]
+        k, at, walked = 0, node, False
+        while k < max_spec_tokens:
+            if k == len(nodes):
+                # Past the cached part: extend the path from its last node.
+                child = best[at]
+                if child == NO_CHILD:
+                    break
+                if entry is None:
+                    entry = self._paths[node] = [tokens, nodes]
+                tokens.append(self._best_tok[at])
+                nodes.append(child)
+                self._on_path[at] = 1
+                walked = True
+            at = nodes[k]
+            prob *= count[at] / total
+            if prob < min_token_prob:
+                break
+            draft.probs.append(prob)
+            draft.score += prob
+            total = count[at]
+            k += 1
+        if walked:
+            self.memo_misses += 1
+            self._longest_path = max(self._longest_path, len(nodes))
+        elif nodes:
+            self.memo_hits += 1
+        draft.token_ids = tokens[:k]
+        draft.parents = list(range(-1, k - 1))
+        return draft
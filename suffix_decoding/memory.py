@@ -0,0 +1,140 @@
+"""Per-component memory accounting for the engines.
+
+SuffixEngine.memory_report() breaks an engine's bytes down by component.
+Array-backed parts (the ``array('I')`` columns, child tables, mapped
+snapshot sections) are sized exactly from their buffers. Object-based parts
+(the baseline's node objects and dicts, per-sequence state) are sized by
+walking them with ``sys.getsizeof``, which misses the allocator's per-object
+overhead; traced_report() builds an engine under tracemalloc and books the
+difference between the traced and the walked total as its own component.
+
+Sizes per stored token (every token inserted with extend()) make engines
+comparable and extrapolate to larger corpora: tree size grows roughly
+linearly in the tokens inserted once ``max_depth`` is reached.
+"""
+
+import sys
+import tracemalloc
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable
+
+from .corpus import TraceRequest
+
+UNTRACKED = "untracked"  # Traced bytes the component walk did not find.
+
+
+def buffer_bytes(buf) -> int:
+    """Bytes held by one array column: its allocation, or a mapped view's extent."""
+    if isinstance(buf, memoryview):
+        return buf.nbytes
+    if isinstance(buf, array):
+        return sys.getsizeof(buf)
+    return deep_bytes(buf)
+
+
+def deep_bytes(obj, _seen: set | None = None) -> int:
+    """``sys.getsizeof`` of ``obj`` and the containers and objects it holds.
+
+    Small ints shared by the interpreter are not counted; objects reached
+    twice are counted once.
+    """
+    seen = set() if _seen is None else _seen
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or (type(o) is int and -5 <= o <= 256):
+            continue
+        seen.add(id(o))
+        if isinstance(o, (array, memoryview)):
+            total += buffer_bytes(o)
+            continue
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            stack.extend(o)
+        elif hasattr(o, "__dict__"):
+            stack.extend(vars(o).values())
+    return total
+
+
+@dataclass
+class MemoryReport:
+    """Bytes per component of one engine.
+
+    ``traced_bytes`` is set by traced_report(): what tracemalloc saw the
+    engine's modules allocate and keep during the build.
+    """
+    components: dict[str, int] = field(default_factory=dict)
+    stored_tokens: int = 0
+    num_nodes: int = 0
+    traced_bytes: int | None = None
+
+    @property
+    def total(self) -> int:
+        return sum(self.components.values())
+
+    @property
+    def bytes_per_token(self) -> float:
+        return self.total / max(self.stored_tokens, 1)
+
+    @property
+    def bytes_per_node(self) -> float:
+        return self.total / max(self.num_nodes, 1)
+
+    def forecast(self, tokens: int) -> int:
+        """Bytes for a corpus of ``tokens`` tokens, at this report's bytes per token."""
+        return round(self.bytes_per_token * tokens)
+
+    def merge(self, other: "MemoryReport") -> "MemoryReport":
+        """Component-wise sum, e.g. over the shards or replicas of one engine."""
+        components = dict(self.components)
+        for name, nbytes in other.components.items():
+            components[name] = components.get(name, 0) + nbytes
+        traced = (None if self.traced_bytes is None or other.traced_bytes is None
+                  else self.traced_bytes + other.traced_bytes)
+        return MemoryReport(components, self.stored_tokens + other.stored_tokens,
+                            self.num_nodes + other.num_nodes, traced)
+
+    def format(self) -> str:
+        lines = [f"{'component':<16} {'MB':>9} {'share':>6} {'B/token':>8}"]
+        for name, nbytes in sorted(self.components.items(), key=lambda kv: -kv[1]):
+            lines.append(f"{name:<16} {nbytes / 2**20:>9.2f} {nbytes / max(self.total, 1):>6.1%} "
+                         f"{nbytes / max(self.stored_tokens, 1):>8.1f}")
+        lines.append(f"{'total':<16} {self.total / 2**20:>9.2f} {'':>6} {self.bytes_per_token:>8.1f}")
+        return "\n".join(lines)
+
+
+def traced_report(factory: Callable, corpus: Iterable[TraceRequest]) -> tuple:
+    """Build ``factory()`` from ``corpus`` under tracemalloc; returns ``(engine, report)``.
+
+    Each request's prompt and response are inserted as one sequence. The
+    traced total counts allocations made in this package that are still
+    alive after the build, so it includes per-object allocator overhead
+    the component walk cannot see.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        engine = factory()
+        for seq_id, req in enumerate(corpus):
+            engine.extend(seq_id, list(req.prompt) + list(req.response))
+            engine.finish(seq_id)
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started:
+            tracemalloc.stop()
+    package = tracemalloc.Filter(True, str(Path(__file__).resolve().parent / "*"))
+    diff = after.filter_traces([package]).compare_to(before.filter_traces([package]), "filename")
+    report = engine.memory_report()
+    report.traced_bytes = sum(stat.size_diff for stat in diff)
+    if report.traced_bytes > report.total:
+        report.components[UNTRACKED] = report.traced_bytes - report.total
+    return engine, report
@@ -0,0 +1,106 @@
+"""N-gram (prompt lookup) speculation baseline.
+
+Looks up the trailing n-gram of a request's own context earlier in that
+context and proposes the tokens that followed its most recent occurrence.
+The search is vectorized with NumPy: candidate positions are the
+occurrences of the last token, and each further step to the left filters
+them with one fancy-indexed comparison, so a call costs O(context) array
+work instead of a Python loop over the context.
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+from .base import SuffixDraft, SuffixEngine
+
+
+class NgramProposer(SuffixEngine):
+    """Prompt-lookup speculation with n-gram sizes in ``[min_ngram, max_ngram]``.
+
+    It implements the engine interface so the same replay harness can drive
+    it, but it keeps no cross-request state: extend() is a no-op and drafts
+    come only from the context of the request itself. Drafts are always
+    linear; ``tree`` is accepted for interface compatibility.
+
+    Args:
+        min_ngram: Shortest trailing n-gram that may produce a draft.
+        max_ngram: Longest trailing n-gram tried; longer matches win.
+        lookback: Trailing context tokens searched (the ``max_depth`` of the
+            engine interface).
+    """
+
+    def __init__(self, min_ngram: int = 3, max_ngram: int = 5, lookback: int = 1 << 20):
+        super().__init__(lookback)
+        if not 1 <= min_ngram <= max_ngram:
+            raise ValueError(f"need 1 <= min_ngram <= max_ngram, got [{min_ngram}, {max_ngram}]")
+        self.min_ngram = min_ngram
+        self.max_ngram = max_ngram
+        self._buffers: dict[int, list] = {}  # seq_id -> [int64 buffer, length]
+
+    @property
+    def num_nodes(self) -> int:
+        return 0
+
+    def extend(self, seq_id: int, tokens: Sequence[int]) -> None:
+        pass
+
+    def finish(self, seq_id: int) -> None:
+        self._buffers.pop(seq_id, None)
+        super().finish(seq_id)
+
+    def advance(self, seq_id: int, tokens: Sequence[int]) -> None:
+        state = self._buffers.get(seq_id)
+        if state is None:
+            state = self._buffers[seq_id] = [np.empty(max(256, len(tokens)), dtype=np.int64), 0]
+        buf, n = state
+        if n + len(tokens) > len(buf):
+            grown = np.empty(max(2 * len(buf), n + len(tokens)), dtype=np.int64)
+            grown[:n] = buf[:n]
+            buf = state[0] = grown
+        buf[n:n + len(tokens)] = tokens
+        state[1] = n + len(tokens)
+
+    def speculate_seq(self, seq_id: int, max_spec_tokens: int = 32,
+                      min_token_prob: float = 0.1, tree: bool = False) -> SuffixDraft:
+        state = self._buffers.get(seq_id)
+        if state is None:
+            return SuffixDraft()
+        buf, n = state
+        return self._lookup(buf[max(0, n - self.depth_cap):n], max_spec_tokens)
+
+    def speculate(self, context: Sequence[int], max_spec_tokens: int = 32,
+                  min_token_prob: float = 0.1, tree: bool = False) -> SuffixDraft:
+        ctx = np.asarray(context, dtype=np.int64)
+        return self._lookup(ctx[max(0, len(ctx) - self.depth_cap):], max_spec_tokens)
+
+    def _match_key(self, seq_id: int) -> int:
+        # Drafts depend on the whole context, so requests never coalesce.
+        return seq_id
+
+    def _draft_batch(self, seq_ids: Sequence[int], max_spec_tokens: int,
+                     min_token_prob: float) -> list[SuffixDraft]:
+        # No match nodes to share: one lookup per request.
+        return [self.speculate_seq(seq_id, max_spec_tokens, min_token_prob) for seq_id in seq_ids]
+
+    def _lookup(self, ctx: np.ndarray, max_spec_tokens: int) -> SuffixDraft:
+        n = len(ctx)
+        if n < self.min_ngram + 1 or max_spec_tokens <= 0:
+            return SuffixDraft()
+        # Positions p < n - 1 whose token equals the last one; p + 1 is the
+        # first proposed token. Grow the match leftwards while any survive.
+        ends = np.flatnonzero(ctx[:n - 1] == ctx[n - 1])
+        best, best_len = ends, 1
+        for j in range(1, min(self.max_ngram, n - 1)):
+            ends = ends[ends >= j]
+            ends = ends[ctx[ends - j] == ctx[n - 1 - j]]
+            if ends.size == 0:
+                break
+            best, best_len = ends, j + 1
+        if best_len < self.min_ngram or best.size == 0:
+            return SuffixDraft()
+        start = int(best[-1]) + 1
+        tokens = ctx[start:start + max_spec_tokens].tolist()
+        k = len(tokens)
+        return SuffixDraft(token_ids=tokens, parents=list(range(-1, k - 1)),
+                           probs=[1.0] * k, score=float(k), match_len=best_len)
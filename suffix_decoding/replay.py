@@ -0,0 +1,244 @@
+"""Replay a token corpus through an engine the way a decode loop would."""
+
+import time
+from dataclasses import dataclass
+
+from .adaptive import AdaptiveSpecLength
+from .base import BatchDraft, SuffixDraft, SuffixEngine
+from .budget import SpecBudgetScheduler
+from .corpus import TraceRequest
+
+
+@dataclass
+class ReplayStats:
+    steps: int = 0
+    generated_tokens: int = 0
+    draft_tokens: int = 0
+    accepted_tokens: int = 0
+    spec_seconds: float = 0.0
+    update_seconds: float = 0.0
+    update_tokens: int = 0
+    batch_steps: int = 0
+
+    @property
+    def spec_us(self) -> float:
+        """Mean speculate() time per decode step, in microseconds."""
+        return 1e6 * self.spec_seconds / max(self.steps, 1)
+
+    @property
+    def spec_us_per_token(self) -> float:
+        """Mean speculate() time per generated token, in microseconds."""
+        return 1e6 * self.spec_seconds / max(self.generated_tokens, 1)
+
+    @property
+    def update_us(self) -> float:
+        """Mean extend() time per inserted token, in microseconds."""
+        return 1e6 * self.update_seconds / max(self.update_tokens, 1)
+
+    @property
+    def spec_us_per_batch(self) -> float:
+        """Mean speculation time per engine step across the whole batch."""
+        return 1e6 * self.spec_seconds / max(self.batch_steps, 1)
+
+    @property
+    def tokens_per_step(self) -> float:
+        """Mean tokens emitted per step: accepted drafts plus the bonus token."""
+        return self.generated_tokens / max(self.steps, 1)
+
+
+def _accepted_len(draft_tokens, response: list[int], pos: int) -> int:
+    """Number of leading draft tokens that match ``response[pos:]``."""
+    accepted = 0
+    for tok in draft_tokens:
+        if pos + accepted >= len(response) or response[pos + accepted] != tok:
+            break
+        accepted += 1
+    return accepted
+
+
+def _accepted_tree_len(draft: SuffixDraft, response: list[int], pos: int) -> int:
+    """Length of the longest root path of a draft tree that matches ``response[pos:]``."""
+    node, accepted = -1, 0
+    while pos + accepted < len(response):
+        want = response[pos + accepted]
+        for i, (tok, parent) in enumerate(zip(draft.token_ids, draft.parents)):
+            if parent == node and tok == want:
+                node = i
+                accepted += 1
+                break
+        else:
+            break
+    return accepted
+
+
+def replay(engine: SuffixEngine, corpus: list[TraceRequest],
+           max_spec_tokens: int = 32, min_token_prob: float = 0.1,
+           incremental: bool = False,
+           trace: list[list[tuple[int, int]]] | None = None,
+           tree: bool = False,
+           spec_length: AdaptiveSpecLength | None = None) -> ReplayStats:
+    """Decode every response in ``corpus`` against ``engine``.
+
+    Each step speculates from the current context, accepts the longest draft
+    prefix that matches the recorded response plus one bonus token, and
+    feeds the emitted tokens back with extend(). Prompts are inserted before
+    decoding starts. Requests are replayed one after another, so later
+    requests benefit from earlier ones.
+
+    With ``incremental`` the loop keeps a match state per request through
+    advance() and speculate_seq() instead of passing the trailing context;
+    the advance() time counts as speculation time.
+
+    If ``trace`` is a list, one ``[(draft_len, accepted_len), ...]`` list
+    per request is appended to it, for the offline TPOT simulator.
+
+    With ``tree`` the engine drafts token trees, and a step accepts the
+    longest root path that matches the response.
+
+    With ``spec_length`` every draft is trimmed by the controller (the trim
+    counts as speculation time) and each step's outcome is fed back to it.
+    """
+    stats = ReplayStats()
+    clock = time.perf_counter
+    depth = engine.max_depth
+    for seq_id, req in enumerate(corpus):
+        t0 = clock()
+        engine.extend(seq_id, req.prompt)
+        stats.update_seconds += clock() - t0
+        stats.update_tokens += len(req.prompt)
+
+        if incremental:
+            t0 = clock()
+            engine.advance(seq_id, req.prompt)
+            stats.spec_seconds += clock() - t0
+
+        context = list(req.prompt)
+        response = req.response
+        steps = [] if trace is not None else None
+        pos = 0
+        while pos < len(response):
+            if incremental:
+                t0 = clock()
+                draft = engine.speculate_seq(seq_id, max_spec_tokens, min_token_prob, tree)
+            else:
+                window = context[-depth:]
+                t0 = clock()
+                draft = engine.speculate(window, max_spec_tokens, min_token_prob, tree)
+            if spec_length is not None:
+                spec_length.trim(seq_id, draft)
+            stats.spec_seconds += clock() - t0
+
+            if tree:
+                accepted = _accepted_tree_len(draft, response, pos)
+            else:
+                accepted = _accepted_len(draft.token_ids, response, pos)
+            if spec_length is not None:
+                spec_length.update(seq_id, len(draft.token_ids), accepted)
+            emitted = response[pos:pos + accepted + 1]
+
+            t0 = clock()
+            engine.extend(seq_id, emitted)
+            stats.update_seconds += clock() - t0
+            if incremental:
+                t0 = clock()
+                engine.advance(seq_id, emitted)
+                stats.spec_seconds += clock() - t0
+
+            stats.steps += 1
+            stats.draft_tokens += len(draft.token_ids)
+            stats.accepted_tokens += accepted
+            stats.generated_tokens += len(emitted)
+            stats.update_tokens += len(emitted)
+            if steps is not None:
+                steps.append((len(draft.token_ids), accepted))
+            context.extend(emitted)
+            pos += len(emitted)
+        engine.finish(seq_id)
+        if spec_length is not None:
+            spec_length.finish(seq_id)
+        if steps is not None:
+            trace.append(steps)
+    return stats
+
+
+def replay_concurrent(engine: SuffixEngine, corpus: list[TraceRequest],
+                      concurrency: int, max_spec_tokens: int = 32,
+                      min_token_prob: float = 0.1, batched: bool = True,
+                      scheduler: SpecBudgetScheduler | None = None) -> ReplayStats:
+    """Decode ``concurrency`` requests at a time, one engine step per iteration.
+
+    Every step drafts for all running requests, either in one
+    speculate_batch() call or with a speculate_seq() loop, then applies each
+    request's accepted tokens. A finished request's slot is refilled from
+    the corpus before the next step. Match state is kept with advance().
+
+    With ``scheduler`` every request drafts through speculate_seq() (the
+    scheduler needs per-token probabilities) and the drafts are trimmed to
+    the step's shared budget before verification; scheduling counts as
+    speculation time.
+    """
+    stats = ReplayStats()
+    clock = time.perf_counter
+    out = BatchDraft.allocate(concurrency, max_spec_tokens)
+    pending = iter(enumerate(corpus))
+    running: dict[int, int] = {}  # seq_id -> position in the response
+
+    def admit():
+        while len(running) < concurrency:
+            nxt = next(pending, None)
+            if nxt is None:
+                return
+            seq_id, req = nxt
+            t0 = clock()
+            engine.extend(seq_id, req.prompt)
+            stats.update_seconds += clock() - t0
+            stats.update_tokens += len(req.prompt)
+            t0 = clock()
+            engine.advance(seq_id, req.prompt)
+            stats.spec_seconds += clock() - t0
+            running[seq_id] = 0
+
+    admit()
+    while running:
+        seq_ids = list(running)
+        t0 = clock()
+        if scheduler is not None:
+            full = [engine.speculate_seq(seq_id, max_spec_tokens, min_token_prob)
+                    for seq_id in seq_ids]
+            scheduler.apply(full)
+            drafts = [d.token_ids for d in full]
+        elif batched:
+            engine.speculate_batch(seq_ids, max_spec_tokens, min_token_prob, out)
+            drafts = [out.row(i) for i in range(len(seq_ids))]
+        else:
+            drafts = [engine.speculate_seq(seq_id, max_spec_tokens, min_token_prob).token_ids
+                      for seq_id in seq_ids]
+        stats.spec_seconds += clock() - t0
+        stats.batch_steps += 1
+
+        for seq_id, draft in zip(seq_ids, drafts):
+            response = corpus[seq_id].response
+            pos = running[seq_id]
+            accepted = _accepted_len(draft, response, pos)
+            emitted = response[pos:pos + accepted + 1]
+
+            t0 = clock()
+            engine.extend(seq_id, emitted)
+            stats.update_seconds += clock() - t0
+            t0 = clock()
+            engine.advance(seq_id, emitted)
+            stats.spec_seconds += clock() - t0
+
+            stats.steps += 1
+            stats.draft_tokens += len(draft)
+            stats.accepted_tokens += accepted
+            stats.generated_tokens += len(emitted)
+            stats.update_tokens += len(emitted)
+            pos += len(emitted)
+            if pos >= len(response):
+                del running[seq_id]
+                engine.finish(seq_id)
+            else:
+                running[seq_id] = pos
+        admit()
+    return stats
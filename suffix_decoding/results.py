@@ -0,0 +1,160 @@
+"""Columnar store of benchmark trials, the single source of the published numbers.
+
+One row per trial, keyed by ``(method, dataset, depth, spec_len,
+concurrency)`` plus the trial index, with one float column per metric
+(``tpot_ms``, ``speedup``, ``tokens_per_step``, ...; NaN where a trial did
+not record it). Rows are kept in memory as columns and saved as an NPZ of
+plain arrays, so the file loads without pickle.
+
+Per-cell aggregates (count, sum and sum of squares per metric) are updated
+as trials are added, so reading a mean never rescans the rows, and a sweep
+can ask which cells still lack trials and compute only those. The plot
+scripts and blog-post2/results_summary.md are generated from the store
+(``python -m benchmarks.results``); ``depth``, ``spec_len`` and
+``concurrency`` are 0 where a result does not depend on them or the source
+did not record them.
+"""
+
+import math
+import os
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+import numpy as np
+
+DEFAULT_STORE = Path(__file__).resolve().parents[1] / "results" / "published.npz"
+
+
+class Cell(NamedTuple):
+    method: str
+    dataset: str
+    depth: int = 0
+    spec_len: int = 0
+    concurrency: int = 0
+
+
+_INT_KEYS = ("depth", "spec_len", "concurrency", "trial")
+
+
+class ResultsStore:
+    """Per-trial rows with incrementally maintained per-cell aggregates.
+
+    Args:
+        path: NPZ file to load (if it exists) and save to.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path is not None else None
+        self._keys: dict[str, list] = {k: [] for k in ("method", "dataset", *_INT_KEYS)}
+        self._metrics: dict[str, list[float]] = {}
+        self._agg: dict[Cell, dict[str, list[float]]] = {}  # metric -> [n, sum, sumsq]
+        self._trials: dict[Cell, set[int]] = {}
+        if self.path is not None and self.path.exists():
+            with np.load(self.path) as data:
+                columns = {name: data[name].tolist() for name in data.files}
+            metrics = [name for name in columns if name not in self._keys]
+            for i in range(len(columns["method"])):
+                cell = Cell(*(columns[k][i] for k in Cell._fields))
+                self._append(cell, columns["trial"][i],
+                             {m: columns[m][i] for m in metrics})
+
+    def __len__(self) -> int:
+        return len(self._keys["method"])
+
+    @property
+    def metrics(self) -> list[str]:
+        return list(self._metrics)
+
+    def add(self, method: str, dataset: str, depth: int = 0, spec_len: int = 0,
+            concurrency: int = 0, trial: int | None = None, **metrics: float) -> int:
+        """Record one trial of a cell; returns its trial index.
+
+        ``trial`` defaults to the next unused index of the cell. Re-adding
+        an existing trial raises ValueError.
+        """
+        cell = Cell(method, dataset, depth, spec_len, concurrency)
+        trials = self._trials.get(cell, set())
+        if trial is None:
+            trial = max(trials, default=-1) + 1
+        elif trial in trials:
+            raise ValueError(f"{cell} already has trial {trial}")
+        self._append(cell, trial, metrics)
+        return trial
+
+    def _append(self, cell: Cell, trial: int, metrics: dict[str, float]) -> None:
+        n = len(self)
+        for key, value in zip(Cell._fields, cell):
+            self._keys[key].append(value)
+        self._keys["trial"].append(trial)
+        for name in metrics:
+            if name not in self._metrics:
+                self._metrics[name] = [math.nan] * n
+        agg = self._agg.setdefault(cell, {})
+        for name, column in self._metrics.items():
+            value = float(metrics.get(name, math.nan))
+            column.append(value)
+            if not math.isnan(value):
+                acc = agg.setdefault(name, [0, 0.0, 0.0])
+                acc[0] += 1
+                acc[1] += value
+                acc[2] += value * value
+        self._trials.setdefault(cell, set()).add(trial)
+
+    def trials(self, cell: Cell) -> int:
+        """Number of trials recorded for ``cell``."""
+        return len(self._trials.get(cell, ()))
+
+    def missing(self, cells: Iterable[Cell], trials: int = 1) -> list[Cell]:
+        """The cells with fewer than ``trials`` trials, in order."""
+        return [cell for cell in cells if self.trials(cell) < trials]
+
+    def cells(self, **match) -> list[Cell]:
+        """Recorded cells whose fields equal ``match``, in insertion order."""
+        return [cell for cell in self._agg
+                if all(getattr(cell, k) == v for k, v in match.items())]
+
+    def mean(self, metric: str, cell: Cell) -> float:
+        """Mean of ``metric`` over the cell's trials; NaN if none recorded it."""
+        acc = self._agg.get(cell, {}).get(metric)
+        return acc[1] / acc[0] if acc else math.nan
+
+    def std(self, metric: str, cell: Cell) -> float:
+        """Sample standard deviation of ``metric`` over the cell's trials."""
+        acc = self._agg.get(cell, {}).get(metric)
+        if not acc or acc[0] < 2:
+            return math.nan
+        n, s, sq = acc
+        return math.sqrt(max(sq - s * s / n, 0.0) / (n - 1))
+
+    def series(self, metric: str, method: str, dataset: str, concurrency: Iterable[int],
+               depth: int = 0, spec_len: int = 0) -> list[float]:
+        """Means of ``metric`` for one method across concurrency levels."""
+        return [self.mean(metric, Cell(method, dataset, depth, spec_len, c)) for c in concurrency]
+
+    def table(self, metric: str, methods: Iterable[str], datasets: Iterable[str],
+              **fixed) -> dict[str, list[float]]:
+        """``{dataset: [mean per method]}`` for cells matching ``fixed``."""
+        methods = list(methods)
+        return {dataset: [self.mean(metric, Cell(m, dataset, **fixed)) for m in methods]
+                for dataset in datasets}
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """All rows as arrays: the key columns, ``trial`` and one per metric."""
+        out = {"method": np.array(self._keys["method"], dtype=str),
+               "dataset": np.array(self._keys["dataset"], dtype=str)}
+        for key in _INT_KEYS:
+            out[key] = np.array(self._keys[key], dtype=np.int32)
+        for name, column in self._metrics.items():
+            out[name] = np.array(column, dtype=np.float64)
+        return out
+
+    def save(self, path: str | Path | None = None) -> None:
+        """Write the store to ``path`` (default: the path it was opened from)."""
+        path = Path(path) if path is not None else self.path
+        if path is None:
+            raise ValueError("no path to save the results store to")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **self.columns())
+        os.replace(tmp, path)
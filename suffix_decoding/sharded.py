@@ -0,0 +1,296 @@
+"""Suffix tree partitioned across worker processes.
+
+Every suffix is owned by the shard its first token hashes to, so each node
+of the global tree lives in exactly one shard and the update work splits
+across processes instead of contending for one GIL. Suffix links would
+cross shards, so shards re-match contexts from the root like the baseline
+engine, each only for the suffixes that start with one of its tokens.
+
+The coordinator batches work per step: tokens to insert, and contexts to
+draft for, are written to one shared-memory ``uint32`` buffer that every
+shard maps, and only small ``(seq_id, offset, length)`` records travel over
+the pipes. Each shard returns its best draft per context, linear or a
+tree, and the coordinator keeps the best of those, longest match first as
+in speculate().
+"""
+
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Sequence
+
+import numpy as np
+
+from .base import SuffixDraft, SuffixEngine
+from .hashmap import NO_CHILD
+from .linked import LinkedSuffixTree
+from .memory import MemoryReport, deep_bytes
+
+
+def shard_of(tok: int, num_shards: int) -> int:
+    """Shard owning the suffixes that start with ``tok``."""
+    return ((tok * 0x9E3779B1) >> 16) % num_shards
+
+
+class ShardSuffixTree(LinkedSuffixTree):
+    """One shard: the suffixes whose first token hashes to ``shard_id``.
+
+    Insertion keeps, per sequence, the nodes of its owned trailing suffixes
+    with their depths, since the owned suffixes are not a contiguous range
+    of lengths. Suffix links are not maintained; matching re-walks from the
+    root for each owned start position. The root count still counts every
+    token so depth-1 probabilities match the unsharded tree.
+    """
+
+    def __init__(self, shard_id: int, num_shards: int, max_depth: int = 64, **kwargs):
+        super().__init__(max_depth, **kwargs)
+        self.shard_id = shard_id
+        self.num_shards = num_shards
+        self._depths: dict[int, list[int]] = {}
+
+    def extend(self, seq_id: int, tokens: Sequence[int]) -> None:
+        nodes = self._active.setdefault(seq_id, [])
+        depths = self._depths.setdefault(seq_id, [])
+        count, tok1, child1 = self._count, self._tok1, self._child1
+        for tok in tokens:
+            if depths and depths[0] == self.max_depth:
+                del nodes[0], depths[0]
+            if shard_of(tok, self.num_shards) == self.shard_id:
+                nodes.append(0)
+                depths.append(0)
+            for i, node in enumerate(nodes):
+                if tok1[node] == tok:
+                    child = child1[node]
+                    count[child] += 1
+                else:
+                    child = self._child(node, tok)
+                    if child == NO_CHILD:
+                        child = self._add_child(node, tok)
+                    count[child] += 1
+                    self._promote(node, child)
+                nodes[i] = child
+                depths[i] += 1
+            count[0] += 1
+
+    def finish(self, seq_id: int) -> None:
+        self._depths.pop(seq_id, None)
+        super().finish(seq_id)
+
+    def _memory_components(self) -> dict[str, int]:
+        components = super()._memory_components()
+        components["sequence_state"] += deep_bytes(self._depths)
+        return components
+
+    def _matches(self, context: Sequence[int]):
+        n = len(context)
+        for start in range(max(0, n - self.depth_cap), n):
+            if shard_of(context[start], self.num_shards) != self.shard_id:
+                continue
+            node = 0
+            for tok in context[start:]:
+                node = self._child(node, tok)
+                if node == NO_CHILD:
+                    break
+            else:
+                yield node, n - start
+
+
+def _shard_main(conn, shm_name: str, capacity: int, shard_id: int, num_shards: int,
+                max_depth: int, kwargs: dict) -> None:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buf = np.ndarray((capacity,), dtype=np.uint32, buffer=shm.buf)
+    tree = ShardSuffixTree(shard_id, num_shards, max_depth, **kwargs)
+    try:
+        while True:
+            cmd, *args = conn.recv()
+            if cmd == "extend":
+                for seq_id, off, n, finish in args[0]:
+                    if n:
+                        tree.extend(seq_id, buf[off:off + n].tolist())
+                    if finish:
+                        tree.finish(seq_id)
+                conn.send(None)
+            elif cmd == "speculate":
+                records, max_spec_tokens, min_token_prob, as_tree = args
+                drafts = []
+                for off, n in records:
+                    d = tree.speculate(buf[off:off + n].tolist(), max_spec_tokens, min_token_prob,
+                                       as_tree)
+                    drafts.append((d.token_ids, d.parents, d.probs, d.score, d.match_len))
+                conn.send(drafts)
+            elif cmd == "depth_cap":
+                tree.set_depth_cap(args[0])
+                conn.send(None)
+            elif cmd == "num_nodes":
+                conn.send(tree.num_nodes)
+            elif cmd == "memory":
+                conn.send(tree.memory_report())
+            elif cmd == "stop":
+                return
+    finally:
+        del buf
+        shm.close()
+
+
+class ShardedSuffixTree(SuffixEngine):
+    """Global suffix tree split across ``num_shards`` worker processes.
+
+    extend() and finish() are queued and sent to every shard in one batch
+    before the next speculation (or on flush()). speculate_batch() drafts
+    all requests of a step in one round trip. Use as a context manager, or
+    call close(), to stop the workers and free the shared buffer.
+
+    Args:
+        num_shards: Worker processes.
+        max_depth: Longest suffix stored, in tokens.
+        capacity: Tokens the shared buffer holds; larger batches are sent
+            in several rounds.
+        **kwargs: Passed to each shard's LinkedSuffixTree.
+    """
+
+    def __init__(self, num_shards: int, max_depth: int = 64, capacity: int = 1 << 20, **kwargs):
+        super().__init__(max_depth)
+        if num_shards < 1:
+            raise ValueError(f"num_shards must be positive, got {num_shards}")
+        self.num_shards = num_shards
+        self.capacity = capacity
+        self._shm = shared_memory.SharedMemory(create=True, size=4 * capacity)
+        self._buf = np.ndarray((capacity,), dtype=np.uint32, buffer=self._shm.buf)
+        self._pending: list[tuple[int, Sequence[int], bool]] = []
+        ctx = mp.get_context("spawn")
+        self._conns = []
+        self._procs = []
+        for shard_id in range(num_shards):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_shard_main, daemon=True,
+                               args=(child, self._shm.name, capacity, shard_id, num_shards,
+                                     max_depth, kwargs))
+            proc.start()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+    def __enter__(self) -> "ShardedSuffixTree":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _broadcast(self, msg: tuple) -> list:
+        for conn in self._conns:
+            conn.send(msg)
+        return [conn.recv() for conn in self._conns]
+
+    @property
+    def num_nodes(self) -> int:
+        self.flush()
+        # Every shard has its own root.
+        return sum(self._broadcast(("num_nodes",))) - (self.num_shards - 1)
+
+    def memory_report(self) -> MemoryReport:
+        """Sum of the shards' reports plus the shared buffer and queued updates."""
+        self.flush()
+        shards = self._broadcast(("memory",))
+        report = shards[0]
+        for shard in shards[1:]:
+            report = report.merge(shard)
+        # Every shard has its own root and counts every token.
+        report.stored_tokens = shards[0].stored_tokens
+        report.num_nodes -= self.num_shards - 1
+        report.components["shared_buffer"] = self._buf.nbytes
+        report.components["sequence_state"] += super()._memory_components()["sequence_state"]
+        return report
+
+    def set_depth_cap(self, depth_cap: int) -> None:
+        super().set_depth_cap(depth_cap)
+        self._broadcast(("depth_cap", depth_cap))
+
+    def extend(self, seq_id: int, tokens: Sequence[int]) -> None:
+        self._pending.append((seq_id, tokens, False))
+
+    def finish(self, seq_id: int) -> None:
+        self._pending.append((seq_id, (), True))
+        super().finish(seq_id)
+
+    def flush(self) -> None:
+        """Send queued extend() / finish() calls to the shards and wait for them."""
+        records, off = [], 0
+        for seq_id, tokens, finish in self._pending:
+            start = 0
+            while True:
+                n = min(len(tokens) - start, self.capacity - off)
+                if n == 0 and start < len(tokens):
+                    # Buffer full: ship this round and start over.
+                    self._broadcast(("extend", records))
+                    records, off = [], 0
+                    continue
+                self._buf[off:off + n] = tokens[start:start + n]
+                start += n
+                done = start == len(tokens)
+                records.append((seq_id, off, n, finish and done))
+                off += n
+                if done:
+                    break
+        if records:
+            self._broadcast(("extend", records))
+        self._pending.clear()
+
+    def speculate_many(self, contexts: Sequence[Sequence[int]], max_spec_tokens: int = 32,
+                       min_token_prob: float = 0.1, tree: bool = False) -> list[SuffixDraft]:
+        """speculate() for several contexts in one round trip per shard."""
+        self.flush()
+        drafts: list[SuffixDraft] = []
+        start = 0
+        while start < len(contexts):
+            records, off, end = [], 0, start
+            while end < len(contexts):
+                ctx = contexts[end][-self.depth_cap:]
+                if off + len(ctx) > self.capacity:
+                    break
+                self._buf[off:off + len(ctx)] = ctx
+                records.append((off, len(ctx)))
+                off += len(ctx)
+                end += 1
+            if end == start:
+                raise ValueError(f"context of {len(contexts[start])} tokens exceeds the buffer")
+            replies = self._broadcast(("speculate", records, max_spec_tokens, min_token_prob, tree))
+            for i in range(end - start):
+                drafts.append(self._merge([reply[i] for reply in replies], max_spec_tokens))
+            start = end
+        return drafts
+
+    @staticmethod
+    def _merge(candidates: list[tuple], max_spec_tokens: int) -> SuffixDraft:
+        # Same rule as _best_draft() over the shards' best drafts: every
+        # candidate node lives in one shard, so this is the unsharded result.
+        best = SuffixDraft()
+        for token_ids, parents, probs, score, match_len in sorted(candidates, key=lambda c: -c[4]):
+            if score > best.score:
+                best = SuffixDraft(token_ids, parents, probs, score, match_len)
+            if len(best.token_ids) >= max_spec_tokens:
+                break
+        return best
+
+    def speculate(self, context: Sequence[int], max_spec_tokens: int = 32,
+                  min_token_prob: float = 0.1, tree: bool = False) -> SuffixDraft:
+        return self.speculate_many([list(context)], max_spec_tokens, min_token_prob, tree)[0]
+
+    def speculate_seq(self, seq_id: int, max_spec_tokens: int = 32,
+                      min_token_prob: float = 0.1, tree: bool = False) -> SuffixDraft:
+        return self.speculate(list(self._windows.get(seq_id, ())), max_spec_tokens,
+                              min_token_prob, tree)
+
+    def _draft_batch(self, seq_ids: Sequence[int], max_spec_tokens: int,
+                     min_token_prob: float) -> list[SuffixDraft]:
+        return self.speculate_many([list(self._windows.get(seq_id, ())) for seq_id in seq_ids],
+                                   max_spec_tokens, min_token_prob)
+
+    def close(self) -> None:
+        if not self._procs:
+            return
+        for conn in self._conns:
+            conn.send(("stop",))
+        for proc in self._procs:
+            proc.join()
+        self._procs.clear()
+        del self._buf
+        self._shm.close()
+        self._shm.unlink()
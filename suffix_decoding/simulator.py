@@ -0,0 +1,145 @@
+"""Offline TPOT simulator driven by per-request acceptance traces.
+
+A trace lists, for every request, the ``(draft_len, accepted_len)`` of each
+decode step, as recorded by :func:`suffix_decoding.replay` with ``trace=``.
+The simulator schedules those requests at a fixed concurrency, charges each
+engine step the drafting cost plus a pluggable verification latency, and
+reports mean TPOT in the table layout of blog-post2/results_summary.md.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from .latency import StepModel
+
+Trace = list[list[tuple[int, int]]]
+
+
+@dataclass
+class SpecCostModel:
+    """CPU time to draft for one request in one step."""
+    us_per_step: float = 0.0
+    us_per_draft_token: float = 0.0
+
+    def step_ms(self, draft_len: int) -> float:
+        return (self.us_per_step + self.us_per_draft_token * draft_len) / 1000
+
+
+def load_trace(path: str | Path) -> Trace:
+    """Read a JSONL trace with one ``{"steps": [[draft, accepted], ...]}`` per request."""
+    trace = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                trace.append([tuple(step) for step in json.loads(line)["steps"]])
+    return trace
+
+
+def save_trace(trace: Trace, path: str | Path) -> None:
+    with open(path, "w") as f:
+        for steps in trace:
+            f.write(json.dumps({"steps": [list(step) for step in steps]}) + "\n")
+
+
+def vanilla_trace(trace: Trace) -> Trace:
+    """The same requests decoded one token per step without speculation."""
+    return [[(0, 0)] * sum(accepted + 1 for _, accepted in steps) for steps in trace]
+
+
+def simulate_tpot(trace: Trace, concurrency: int, step_model: StepModel,
+                  spec_cost: SpecCostModel | None = None) -> float:
+    """Mean TPOT (ms) over requests when ``concurrency`` of them run at once.
+
+    Requests are admitted in trace order whenever a slot frees up. Each step
+    costs the drafting time of every running request plus
+    ``step_model.step_ms(batch_size, total_draft_tokens)``. A request's TPOT
+    is the time from its first to its last step divided by its tokens.
+
+    Raises ValueError when the trace has fewer (non-empty) requests than
+    ``concurrency``, since the batch could never fill.
+    """
+    available = sum(1 for steps in trace if steps)
+    if available < concurrency:
+        raise ValueError(f"trace has {available} requests, fewer than concurrency {concurrency}")
+    spec_cost = spec_cost or SpecCostModel()
+    pending = iter(range(len(trace)))
+    running: dict[int, list] = {}  # request -> [next step, start ms, tokens]
+    tpots = []
+    now = 0.0
+
+    def admit():
+        while len(running) < concurrency:
+            idx = next(pending, None)
+            if idx is None:
+                return
+            if trace[idx]:
+                running[idx] = [0, now, 0]
+
+    admit()
+    while running:
+        draft_total = 0
+        spec_ms = 0.0
+        for idx, state in running.items():
+            draft_len, _ = trace[idx][state[0]]
+            draft_total += draft_len
+            spec_ms += spec_cost.step_ms(draft_len)
+        now += spec_ms + step_model.step_ms(len(running), draft_total)
+        for idx in list(running):
+            state = running[idx]
+            _, accepted = trace[idx][state[0]]
+            state[0] += 1
+            state[2] += accepted + 1
+            if state[0] == len(trace[idx]):
+                tpots.append((now - state[1]) / state[2])
+                del running[idx]
+        admit()
+    return sum(tpots) / max(len(tpots), 1)
+
+
+def format_table(title: str, rows: dict[str, list[float]], concurrency: list[int]) -> str:
+    """Render one dataset section in the results_summary.md layout."""
+    lines = [f"## {title}", "",
+             "| Baseline | " + " | ".join(f"Concurrency {c}" for c in concurrency) + " |",
+             "|----------|" + "------------------|" * len(concurrency)]
+    for label, values in rows.items():
+        lines.append(f"| {label} | " + " | ".join(f"{v:.2f}" for v in values) + " |")
+    return "\n".join(lines)
+
+
+def parse_summary_concurrency(path: str | Path) -> dict[str, list[int]]:
+    """Concurrency of each column of the TPOT tables of results_summary.md, per section."""
+    columns: dict[str, list[int]] = {}
+    section = None
+    with open(path) as f:
+        for line in f:
+            heading = re.match(r"##\s+(.*)", line)
+            if heading:
+                section = heading.group(1).strip()
+                continue
+            levels = re.findall(r"\|\s*Concurrency\s+(\d+)\s*", line)
+            if section is not None and levels:
+                columns.setdefault(section, [int(c) for c in levels])
+    return columns
+
+
+def parse_summary_tables(path: str | Path) -> dict[str, dict[str, list[float]]]:
+    """Read the TPOT tables of results_summary.md as ``{section: {row: values}}``."""
+    tables: dict[str, dict[str, list[float]]] = {}
+    section = None
+    with open(path) as f:
+        for line in f:
+            heading = re.match(r"##\s+(.*)", line)
+            if heading:
+                section = heading.group(1).strip()
+                continue
+            cells = [c.strip() for c in line.strip().strip("|").split("|")]
+            if section is None or len(cells) < 2 or not line.lstrip().startswith("|"):
+                continue
+            try:
+                values = [float(c) for c in cells[1:]]
+            except ValueError:
+                continue  # header or separator row
+            tables.setdefault(section, {})[cells[0]] = values
+    return tables
@@ -0,0 +1,344 @@
+"""Versioned on-disk snapshots of the array-backed suffix trees.
+
+A snapshot is one flat file: a fixed header, a section directory, then
+64-byte aligned sections holding the node columns as raw native-endian
+``uint32`` (``uint64`` for table offsets). Child tables are packed back to
+back in one ``pool`` section, indexed per node by ``toff`` / ``tlen``.
+HashmapSuffixTree, LinkedSuffixTree (and BoundedSuffixTree, saved as one)
+and MemoSuffixTree can be saved; other engines raise TypeError rather than
+lose the state of their subclass.
+
+load_snapshot() maps the file read-only and hands the engine memoryview
+casts of the sections instead of ``array('I')`` columns, so nothing is
+copied or parsed and a multi-GB tree can serve speculate() right away.
+Snapshot.arrays exposes the same sections as zero-copy NumPy views for
+bulk analysis. A mapped tree is read-only; thaw() copies it into a
+regular engine (one memcpy per column plus one per child table) when it
+should keep learning.
+
+SnapshotWriter captures a live engine between updates and serializes it on
+a background thread, so the decode loop only pauses for the in-memory copy:
+one copy per column plus one per child table, found from the copied table
+sizes rather than by scanning every node.
+"""
+
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+from .bounded import BoundedSuffixTree
+from .hashmap import HashmapSuffixTree
+from .linked import LinkedSuffixTree
+from .memo import MemoSuffixTree
+
+MAGIC = b"SFXTREE\0"
+VERSION = 1
+KIND_HASHMAP = 1
+KIND_LINKED = 2
+KIND_MEMO = 3
+
+# magic, version, kind, little_endian, max_depth, table_min_children,
+# max_bubble (0 = None), max_load, num_nodes, num_sections
+_HEADER = struct.Struct("<8sIIIIIIdQI")
+_SECTION = struct.Struct("<8sQQ")  # name, offset, nbytes
+_ALIGN = 64
+
+_COLUMNS = ("count", "tok1", "child1", "link", "tsize")
+_LINKED_COLUMNS = ("tok", "next", "prev")
+_MEMO_COLUMNS = ("best", "besttok", "parent")
+
+
+def _column_attrs(kind: int) -> dict[str, str]:
+    attrs = {"count": "_count", "tok1": "_tok1", "child1": "_child1",
+             "link": "_link", "tsize": "_table_size"}
+    if kind == KIND_LINKED:
+        attrs.update(tok="_tok", next="_next", prev="_prev")
+    elif kind == KIND_MEMO:
+        attrs.update(best="_best", besttok="_best_tok", parent="_parent")
+    return attrs
+
+
+def _kind(engine: HashmapSuffixTree) -> int:
+    kinds = {HashmapSuffixTree: KIND_HASHMAP, MappedHashmapSuffixTree: KIND_HASHMAP,
+             LinkedSuffixTree: KIND_LINKED, MappedLinkedSuffixTree: KIND_LINKED,
+             BoundedSuffixTree: KIND_LINKED, MemoSuffixTree: KIND_MEMO}
+    kind = kinds.get(type(engine))
+    if kind is None:
+        raise TypeError(f"cannot snapshot a {type(engine).__name__}: only "
+                        f"{', '.join(sorted(cls.__name__ for cls in kinds))} are supported")
+    return kind
+
+
+def _capture(engine: HashmapSuffixTree) -> dict:
+    """Copy everything a snapshot needs; must run between engine updates."""
+    kind = _kind(engine)
+    columns = {name: getattr(engine, attr)[:] for name, attr in _column_attrs(kind).items()}
+    # A node has a child table exactly when its table size is non-zero.
+    nodes = np.flatnonzero(np.frombuffer(columns["tsize"], dtype=np.uint32)).tolist()
+    tables = engine._tables
+    return {
+        "kind": kind,
+        "max_depth": engine.max_depth,
+        "max_load": engine.max_load,
+        "table_min_children": getattr(engine, "table_min_children", 0),
+        "max_bubble": getattr(engine, "max_bubble", None) or 0,
+        "columns": columns,
+        "num_nodes": len(columns["count"]),
+        # Tables are mutated in place by inserts, so copy them too.
+        "tables": {node: tables[node][:] for node in nodes},
+    }
+
+
+def _write(capture: dict, path: str | Path) -> None:
+    tables, num_nodes = capture["tables"], capture["num_nodes"]
+    tlen = np.zeros(num_nodes, dtype=np.uint32)
+    tlen[list(tables)] = [len(t) for t in tables.values()]
+    toff = np.zeros(num_nodes, dtype=np.uint64)
+    np.cumsum(tlen[:-1], out=toff[1:])
+    sections = [(name, capture["columns"][name]) for name in _COLUMNS]
+    sections += [("toff", toff), ("tlen", tlen)]
+    if capture["kind"] == KIND_LINKED:
+        sections += [(name, capture["columns"][name]) for name in _LINKED_COLUMNS]
+    elif capture["kind"] == KIND_MEMO:
+        sections += [(name, capture["columns"][name]) for name in _MEMO_COLUMNS]
+    pool_bytes = 4 * int(tlen.sum(dtype=np.uint64))
+
+    directory = []
+    offset = _HEADER.size + _SECTION.size * (len(sections) + 1)
+    for name, data in sections + [("pool", None)]:
+        offset = -(-offset // _ALIGN) * _ALIGN
+        nbytes = pool_bytes if data is None else memoryview(data).nbytes
+        directory.append((name, offset, nbytes))
+        offset += nbytes
+
+    tmp = Path(f"{path}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, capture["kind"], sys.byteorder == "little",
+                             capture["max_depth"], capture["table_min_children"],
+                             capture["max_bubble"], capture["max_load"], num_nodes,
+                             len(directory)))
+        for name, off, nbytes in directory:
+            f.write(_SECTION.pack(name.encode(), off, nbytes))
+        for (name, off, _), (_, data) in zip(directory, sections):
+            f.write(b"\0" * (off - f.tell()))
+            f.write(data)
+        f.write(b"\0" * (directory[-1][1] - f.tell()))
+        for t in tables.values():
+            f.write(t)
+    os.replace(tmp, path)
+
+
+def save_snapshot(engine: HashmapSuffixTree, path: str | Path) -> None:
+    """Write ``engine`` to ``path`` atomically (via a temporary file and rename).
+
+    Only the shared tree is saved; per-sequence insertion and match state
+    is not. A BoundedSuffixTree is saved as a LinkedSuffixTree, its free
+    slots kept as unreachable nodes; a MemoSuffixTree keeps its best-child
+    columns but not its cached paths. Raises TypeError for other engines.
+    """
+    _write(_capture(engine), path)
+
+
+class Snapshot:
+    """A snapshot file mapped into memory.
+
+    ``columns`` holds memoryview casts used by the engine for fast scalar
+    access and ``arrays`` the same bytes as read-only NumPy arrays; neither
+    copies.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, kind, little, self.max_depth, self.table_min_children,
+         max_bubble, self.max_load, self.num_nodes, num_sections) = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a suffix-tree snapshot")
+        if version != VERSION:
+            raise ValueError(f"{path} has snapshot version {version}, expected {VERSION}")
+        if bool(little) != (sys.byteorder == "little"):
+            raise ValueError(f"{path} was written on a machine with the other byte order")
+        if kind not in (KIND_HASHMAP, KIND_LINKED, KIND_MEMO):
+            raise ValueError(f"{path} has unknown engine kind {kind}")
+        self.kind = kind
+        self.max_bubble = max_bubble or None
+        buf = self._buf = memoryview(self._mmap)
+        self.columns: dict[str, memoryview] = {}
+        self.arrays: dict[str, np.ndarray] = {}
+        for i in range(num_sections):
+            raw, offset, nbytes = _SECTION.unpack_from(self._mmap, _HEADER.size + i * _SECTION.size)
+            name = raw.rstrip(b"\0").decode()
+            fmt = "Q" if name == "toff" else "I"
+            self.columns[name] = buf[offset:offset + nbytes].cast(fmt)
+            self.arrays[name] = np.frombuffer(self._mmap, dtype=np.dtype(fmt), offset=offset,
+                                              count=nbytes // struct.calcsize(fmt))
+
+    def engine(self) -> HashmapSuffixTree:
+        """A read-only engine serving straight from the mapping.
+
+        A MemoSuffixTree snapshot maps as a HashmapSuffixTree, whose drafts
+        are the same; thaw() restores the MemoSuffixTree.
+        """
+        cls = MappedLinkedSuffixTree if self.kind == KIND_LINKED else MappedHashmapSuffixTree
+        return cls(self)
+
+    def close(self) -> None:
+        """Unmap the file. Engines over it stop working; NumPy views taken
+        from ``arrays`` must be dropped first."""
+        for column in self.columns.values():
+            column.release()
+        self.columns.clear()
+        self.arrays.clear()
+        self._buf.release()
+        self._mmap.close()
+
+
+def load_snapshot(path: str | Path) -> HashmapSuffixTree:
+    """Map a snapshot and return a read-only engine over it."""
+    return Snapshot(path).engine()
+
+
+class _TableView:
+    """``engine._tables`` stand-in that slices child tables out of the pool."""
+
+    def __init__(self, toff: memoryview, tlen: memoryview, pool: memoryview):
+        self._toff, self._tlen, self._pool = toff, tlen, pool
+
+    def __len__(self) -> int:
+        return len(self._tlen)
+
+    def __getitem__(self, node: int) -> memoryview | None:
+        n = self._tlen[node]
+        if n == 0:
+            return None
+        off = self._toff[node]
+        return self._pool[off:off + n]
+
+
+class _Mapped:
+    """Serves the engine's read paths from a Snapshot's sections."""
+
+    def _attach(self, snapshot: Snapshot) -> None:
+        self.snapshot = snapshot
+        for name, attr in _column_attrs(snapshot.kind).items():
+            setattr(self, attr, snapshot.columns[name])
+        self._tables = _TableView(snapshot.columns["toff"], snapshot.columns["tlen"],
+                                  snapshot.columns["pool"])
+
+    def extend(self, seq_id, tokens) -> None:
+        raise RuntimeError("a mapped snapshot is read-only; thaw() it to insert")
+
+    def _table_bytes(self) -> int:
+        columns = self.snapshot.columns
+        return columns["toff"].nbytes + columns["tlen"].nbytes + columns["pool"].nbytes
+
+    def thaw(self) -> HashmapSuffixTree:
+        """A mutable copy of the tree as a regular engine."""
+        snap = self.snapshot
+        if snap.kind == KIND_LINKED:
+            engine = LinkedSuffixTree(snap.max_depth, snap.max_load,
+                                      snap.table_min_children, snap.max_bubble)
+        elif snap.kind == KIND_MEMO:
+            engine = MemoSuffixTree(snap.max_depth, snap.max_load)
+            engine._on_path = bytearray(snap.num_nodes)
+        else:
+            engine = HashmapSuffixTree(snap.max_depth, snap.max_load)
+        for name, attr in _column_attrs(snap.kind).items():
+            column = array("I")
+            column.frombytes(snap.columns[name].cast("B"))
+            setattr(engine, attr, column)
+        tables: list[array | None] = [None] * snap.num_nodes
+        toff, tlen, pool = snap.columns["toff"], snap.columns["tlen"], snap.columns["pool"]
+        for node in np.flatnonzero(snap.arrays["tlen"]).tolist():
+            table = tables[node] = array("I")
+            table.frombytes(pool[toff[node]:toff[node] + tlen[node]].cast("B"))
+        engine._tables = tables
+        return engine
+
+
+class MappedHashmapSuffixTree(_Mapped, HashmapSuffixTree):
+    """Read-only HashmapSuffixTree over a mapped snapshot."""
+
+    def __init__(self, snapshot: Snapshot):
+        super().__init__(snapshot.max_depth, snapshot.max_load)
+        self._attach(snapshot)
+
+
+class MappedLinkedSuffixTree(_Mapped, LinkedSuffixTree):
+    """Read-only LinkedSuffixTree over a mapped snapshot."""
+
+    def __init__(self, snapshot: Snapshot):
+        super().__init__(snapshot.max_depth, snapshot.max_load,
+                         snapshot.table_min_children, snapshot.max_bubble)
+        self._attach(snapshot)
+
+
+class SnapshotWriter:
+    """Periodic snapshots of a live engine, written on a background thread.
+
+    Call snapshot() from the thread that updates the engine, between
+    updates: it copies the tree in memory (the only pause the decode loop
+    sees, linear in the number of nodes; ``capture_ms`` records it) and
+    queues the copy. Serialization and disk I/O happen on the
+    writer thread while updates continue. A request made while a write is
+    still in flight is skipped rather than queued.
+    """
+
+    def __init__(self, engine: HashmapSuffixTree, path: str | Path):
+        self.engine = engine
+        self.path = Path(path)
+        self.written = 0
+        self.skipped = 0
+        self.capture_ms = 0.0  # Last in-memory copy, paid by the caller.
+        self.write_ms = 0.0  # Last background serialization and write.
+        self.error: Exception | None = None
+        self._queue: queue.Queue = queue.Queue()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self._thread.start()
+
+    def snapshot(self) -> bool:
+        """Capture the engine now; returns False if the previous write is still running."""
+        if not self._idle.is_set():
+            self.skipped += 1
+            return False
+        t0 = time.perf_counter()
+        capture = _capture(self.engine)
+        self.capture_ms = 1e3 * (time.perf_counter() - t0)
+        self._idle.clear()
+        self._queue.put(capture)
+        return True
+
+    def flush(self) -> None:
+        """Wait for the pending write, if any."""
+        self._idle.wait()
+
+    def close(self) -> None:
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            capture = self._queue.get()
+            if capture is None:
+                return
+            try:
+                t0 = time.perf_counter()
+                _write(capture, self.path)
+                self.write_ms = 1e3 * (time.perf_counter() - t0)
+                self.written += 1
+            except Exception as e:  # Surfaced through .error on the caller's side.
+                self.error = e
+            finally:
+                self._idle.set()
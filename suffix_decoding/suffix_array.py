@@ -0,0 +1,374 @@
+"""Suffix-array engine for large, mostly read-only corpora.
+
+Instead of a node per (suffix, depth), the indexed text is kept as flat
+NumPy arrays: the concatenated token sequences separated by sentinels, its
+suffix array sorted on the first ``max_depth`` tokens, the LCP of adjacent
+suffixes (capped at ``max_depth``, one byte each) and, for matching, the
+positions of each token in the BWT. That is about 16 bytes per token,
+independent of how repetitive the corpus is.
+
+Every string ``w`` of at most ``max_depth`` tokens owns one range of the
+suffix array, whose size is its count. Matching extends the context's
+suffixes to the left with FM-index backward search, which gives the range
+of every suffix of the context in one pass over it. Continuation
+statistics are computed per matched range: its children are the runs of
+the range that share the next token, delimited by LCP values equal to the
+depth.
+
+Updates go to a small delta: every sequence's tokens since the last rebuild,
+preceded by up to ``max_depth - 1`` of its indexed tokens so that
+occurrences spanning the boundary are found. The delta is append-only, so
+concurrent sequences interleave in it; each position links to the previous
+and next token of its sequence, and each token keeps the list of its
+positions. Matching starts from the positions of the context's last token
+and filters them while following the links backwards, so an update costs
+only its own tokens and a lookup only the occurrences it filters. Only
+occurrences that end in new tokens add to the counts, so index and delta
+counts add up exactly to the counts of the tree engines; the others are
+kept to continue them into the new tokens. Once the delta reaches
+``rebuild_ratio`` of the index (and at least ``min_rebuild_tokens``), both
+are merged into a new index, which keeps the amortized update cost
+logarithmic.
+"""
+
+import sys
+from array import array
+from typing import Iterator, Sequence
+
+import numpy as np
+
+from .base import SuffixDraft, SuffixEngine
+from .hashmap import EMPTY
+from .memory import buffer_bytes, deep_bytes
+
+# Matched range of one string of ``depth`` tokens: suffix-array range
+# [lo, hi) plus the end positions of its occurrences in the delta.
+_State = tuple[int, int, int, np.ndarray]
+
+_NO_POSITIONS = np.empty(0, dtype=np.int64)
+
+
+def _suffix_array(text: np.ndarray, depth: int) -> tuple[np.ndarray, np.ndarray]:
+    """Suffix array of the token positions of ``text``, sorted on ``depth`` tokens, and its LCP.
+
+    Prefix doubling: each round ranks positions on twice as many tokens
+    with one sort. Sentinels get ranks of their own, above every token, so
+    no suffix compares equal across one. The ranks of every round are kept
+    to compute the capped LCP of adjacent suffixes by binary lifting.
+    """
+    n = len(text)
+    is_token = text != EMPTY
+    rank = np.empty(n, dtype=np.int64)
+    values, inverse = np.unique(text[is_token], return_inverse=True)
+    rank[is_token] = inverse
+    rank[~is_token] = len(values) + np.arange(n - is_token.sum())
+    levels = [rank]
+    k = 1
+    while k < depth:
+        shifted = np.full(n, -1, dtype=np.int64)
+        shifted[:-k] = rank[k:]
+        rank = np.unique(rank * (n + 1) + shifted + 1, return_inverse=True)[1]
+        levels.append(rank)
+        k *= 2
+    sa = np.argsort(rank, kind="stable")
+    sa = sa[is_token[sa]]
+
+    lcp = np.zeros(len(sa), dtype=np.int64)
+    a, b = sa[:-1], sa[1:]
+    common = lcp[1:]
+    for j in range(len(levels) - 1, -1, -1):
+        ranks = levels[j]
+        ia, ib = a + common, b + common
+        ok = (ib < n) & (ia < n)
+        same = np.zeros(len(a), dtype=bool)
+        same[ok] = ranks[ia[ok]] == ranks[ib[ok]]
+        common += same << j
+    np.minimum(lcp, depth, out=lcp)
+    return sa.astype(np.uint32), lcp.astype(np.uint8 if depth < 256 else np.uint16)
+
+
+class SuffixArrayEngine(SuffixEngine):
+    """Suffix array + LCP index with a delta for recent tokens ("suffix array").
+
+    Args:
+        max_depth: Longest suffix counted, in tokens.
+        rebuild_ratio: Rebuild once the delta holds this fraction of the
+            indexed tokens. Lower values keep lookups in the delta cheap at
+            the cost of more frequent rebuilds.
+        min_rebuild_tokens: Never rebuild for fewer new tokens than this.
+    """
+
+    def __init__(self, max_depth: int = 64, rebuild_ratio: float = 0.25,
+                 min_rebuild_tokens: int = 4096):
+        super().__init__(max_depth)
+        if rebuild_ratio <= 0:
+            raise ValueError(f"rebuild_ratio must be positive, got {rebuild_ratio}")
+        self.rebuild_ratio = rebuild_ratio
+        self.min_rebuild_tokens = min_rebuild_tokens
+        self.rebuilds = 0
+        self._total = 0
+        self._text = np.full(1, EMPTY, dtype=np.uint32)
+        self._sa = np.empty(0, dtype=np.uint32)
+        self._lcp = np.empty(0, dtype=np.uint8)
+        # First column of the suffix array: token values and where each starts.
+        self._first = np.empty(0, dtype=np.uint32)
+        self._first_start = np.zeros(1, dtype=np.int64)
+        # Suffix-array indices grouped by their BWT token (the token before
+        # the suffix), for counting occurrences in backward search.
+        self._occ = np.empty(0, dtype=np.uint32)
+        self._occ_tokens = np.empty(0, dtype=np.uint32)
+        self._occ_start = np.zeros(1, dtype=np.int64)
+        # Every sequence ever seen owns a slot: its span in the text and the
+        # tokens it received since the last rebuild.
+        self._slots: dict[int, int] = {}
+        self._spans: list[tuple[int, int]] = []
+        self._fresh: dict[int, array] = {}
+        self._fresh_tokens = 0
+        self._reset_delta()
+
+    def _reset_delta(self) -> None:
+        # Position 0 is an EMPTY that the first and last token of every
+        # sequence in the delta link to.
+        self._dtext = array("I", [EMPTY])
+        self._dnew = bytearray(1)
+        self._dprev = array("I", [0])
+        self._dnext = array("I", [0])
+        self._dlast: dict[int, int] = {}  # slot -> its last delta position
+        self._dpos: dict[int, array] = {}  # token -> its delta positions
+
+    @property
+    def num_nodes(self) -> int:
+        """Indexed and delta tokens; there are no nodes."""
+        return self._total
+
+    def _stored_tokens(self) -> int:
+        return self._total
+
+    def extend(self, seq_id: int, tokens: Sequence[int]) -> None:
+        if not len(tokens):
+            return
+        slot = self._slots.get(seq_id)
+        if slot is None:
+            slot = self._slots[seq_id] = len(self._spans)
+            self._spans.append((0, 0))
+        self._fresh.setdefault(slot, array("I")).extend(tokens)
+        if slot not in self._dlast:
+            start, end = self._spans[slot]
+            self._append_delta(slot, self._text[max(start, end - self.max_depth + 1):end].tolist(),
+                               False)
+        self._append_delta(slot, tokens, True)
+        self._fresh_tokens += len(tokens)
+        self._total += len(tokens)
+        if self._fresh_tokens >= max(self.min_rebuild_tokens, self.rebuild_ratio * len(self._sa)):
+            self.rebuild()
+
+    def finish(self, seq_id: int) -> None:
+        # The slot's tokens stay indexed; a new sequence with this ID starts a new slot.
+        self._slots.pop(seq_id, None)
+        super().finish(seq_id)
+
+    def rebuild(self) -> None:
+        """Merge the delta into the index."""
+        if not self._fresh:
+            return
+        pieces, spans, pos = [np.full(1, EMPTY, dtype=np.uint32)], [], 1
+        for slot, (start, end) in enumerate(self._spans):
+            fresh = self._fresh.get(slot)
+            tokens = self._text[start:end]
+            if fresh is not None:
+                tokens = np.concatenate([tokens, np.frombuffer(fresh, dtype=np.uint32)])
+            pieces.append(tokens)
+            pieces.append(np.full(1, EMPTY, dtype=np.uint32))
+            spans.append((pos, pos + len(tokens)))
+            pos += len(tokens) + 1
+        # Padding, so reading up to max_depth past any suffix stays in bounds.
+        pieces.append(np.full(self.max_depth, EMPTY, dtype=np.uint32))
+        text = np.concatenate(pieces)
+        sa, lcp = _suffix_array(text, self.max_depth)
+
+        first = text[sa]
+        self._first, first_start = np.unique(first, return_index=True)
+        self._first_start = np.append(first_start, len(sa))
+        bwt = text[sa.astype(np.int64) - 1]
+        order = np.argsort(bwt, kind="stable")
+        self._occ = order.astype(np.uint32)
+        self._occ_tokens, occ_start = np.unique(bwt[order], return_index=True)
+        self._occ_start = np.append(occ_start, len(sa))
+        self._text, self._sa, self._lcp, self._spans = text, sa, lcp, spans
+        self._fresh.clear()
+        self._fresh_tokens = 0
+        self._reset_delta()
+        self.rebuilds += 1
+
+    def _append_delta(self, slot: int, tokens: Sequence[int], new: bool) -> None:
+        """Append tokens of ``slot`` to the delta, linked after its last position."""
+        if not len(tokens):
+            return
+        first = len(self._dtext)
+        last = self._dlast.get(slot, 0)
+        end = first + len(tokens)
+        if last:
+            self._dnext[last] = first
+        self._dtext.extend(tokens)
+        self._dnew.extend(b"\1" * len(tokens) if new else bytes(len(tokens)))
+        self._dprev.append(last)
+        self._dprev.extend(range(first, end - 1))
+        self._dnext.extend(range(first + 1, end))
+        self._dnext.append(0)
+        self._dlast[slot] = end - 1
+        positions = self._dpos
+        for pos, tok in enumerate(tokens, first):
+            found = positions.get(tok)
+            if found is None:
+                positions[tok] = array("I", [pos])
+            else:
+                found.append(pos)
+
+    @staticmethod
+    def _view(column: array | bytearray, dtype=np.uint32) -> np.ndarray:
+        # A fresh view per call: a column cannot grow while a view of it is alive.
+        return np.frombuffer(column, dtype=dtype)
+
+    def _bucket(self, values: np.ndarray, starts: np.ndarray, tok: int) -> tuple[int, int]:
+        i = int(np.searchsorted(values, tok))
+        if i == len(values) or values[i] != tok:
+            return 0, 0
+        return int(starts[i]), int(starts[i + 1])
+
+    def _matches(self, context: Sequence[int]) -> Iterator[tuple[_State, int]]:
+        n = min(len(context), self.depth_cap)
+        if not n:
+            return iter(())
+        ctx = np.asarray(context[len(context) - n:], dtype=np.int64)
+        if self._fresh:
+            delta, prev = self._view(self._dtext), self._view(self._dprev)
+        else:
+            delta = prev = None
+        states = []
+        lo = hi = 0
+        ends = starts = _NO_POSITIONS
+        for depth in range(1, n + 1):
+            tok = int(ctx[n - depth])
+            if depth == 1:
+                lo, hi = self._bucket(self._first, self._first_start, tok)
+            elif hi > lo:
+                # Backward search: suffixes in [lo, hi) preceded by tok.
+                s, e = self._bucket(self._occ_tokens, self._occ_start, tok)
+                c_lo, _ = self._bucket(self._first, self._first_start, tok)
+                lo, hi = (c_lo + np.searchsorted(self._occ[s:e], [lo, hi])).tolist()
+            if delta is not None:
+                if depth == 1:
+                    found = self._dpos.get(tok)
+                    if found is not None:
+                        ends = starts = np.array(found, dtype=np.int64)
+                elif len(ends):
+                    # Step every occurrence one token back along its sequence.
+                    starts = prev[starts].astype(np.int64)
+                    keep = delta[starts] == tok
+                    ends, starts = ends[keep], starts[keep]
+            if hi <= lo and not len(ends):
+                break
+            states.append((depth, lo, hi, ends))
+        return ((state, state[0]) for state in reversed(states))
+
+    def _node_key(self, state: _State) -> tuple:
+        depth, lo, hi, ends = state
+        return depth, lo, hi, ends.tobytes()
+
+    def _count(self, state: _State) -> int:
+        _, lo, hi, ends = state
+        if not len(ends):
+            return hi - lo
+        return hi - lo + int(np.count_nonzero(self._view(self._dnew, bool)[ends]))
+
+    def _continuations(self, state: _State) -> dict[int, list]:
+        """Next token -> [count, lo, hi, delta ends] of the string extended by it."""
+        depth, lo, hi, ends = state
+        out: dict[int, list] = {}
+        if depth >= self.max_depth:
+            return out
+        if hi > lo:
+            bounds = np.concatenate([[lo], lo + 1 + np.flatnonzero(self._lcp[lo + 1:hi] <= depth)])
+            toks = self._text[self._sa[bounds].astype(np.int64) + depth]
+            for tok, a, b in zip(toks.tolist(), bounds.tolist(), [*bounds[1:].tolist(), hi]):
+                if tok != EMPTY:
+                    out[tok] = [b - a, a, b, _NO_POSITIONS]
+        if len(ends):
+            delta, new = self._view(self._dtext), self._view(self._dnew, bool)
+            after = self._view(self._dnext)[ends].astype(np.int64)
+            nxt = delta[after]
+            for tok in np.unique(nxt[nxt != EMPTY]).tolist():
+                child_ends = after[nxt == tok]
+                entry = out.setdefault(tok, [0, 0, 0, _NO_POSITIONS])
+                entry[0] += int(np.count_nonzero(new[child_ends]))
+                entry[3] = child_ends
+        return out
+
+    def _tail(self, state: _State, limit: int) -> list[int]:
+        """Continuation of a string with a single occurrence, up to ``limit`` tokens."""
+        depth, lo, hi, ends = state
+        limit = min(limit, self.max_depth - depth)
+        if not len(ends):
+            start = int(self._sa[lo]) + depth
+            # Drafts are short: scanning a list beats a vectorized search here.
+            tokens = self._text[start:start + limit].tolist()
+            return tokens[:tokens.index(EMPTY)] if EMPTY in tokens else tokens
+        # Indexed occurrences in the delta may continue into new tokens.
+        text, after, pos, tokens = self._dtext, self._dnext, int(ends[0]), []
+        for _ in range(limit):
+            pos = after[pos]
+            if not pos:
+                break
+            tokens.append(text[pos])
+        return tokens
+
+    def _draft(self, state: _State, match_len: int, max_spec_tokens: int,
+               min_token_prob: float) -> SuffixDraft:
+        draft = SuffixDraft(match_len=match_len)
+        prob = 1.0
+        while len(draft.token_ids) < max_spec_tokens:
+            total = self._count(state)
+            if total == 1:
+                # One occurrence: every further token has probability 1.
+                tail = self._tail(state, max_spec_tokens - len(draft.token_ids))
+                k = len(draft.token_ids)
+                draft.parents.extend(range(k - 1, k + len(tail) - 1))
+                draft.token_ids.extend(tail)
+                draft.probs.extend([prob] * len(tail))
+                draft.score += prob * len(tail)
+                break
+            children = self._continuations(state)
+            if not children:
+                break
+            tok, (count, c_lo, c_hi, c_ends) = max(children.items(), key=lambda kv: kv[1][0])
+            prob *= count / total
+            if prob < min_token_prob:
+                break
+            draft.parents.append(len(draft.token_ids) - 1)
+            draft.token_ids.append(tok)
+            draft.probs.append(prob)
+            draft.score += prob
+            state = (state[0] + 1, c_lo, c_hi, c_ends)
+        return draft
+
+    def _children(self, state: _State) -> Iterator[tuple[int, _State, float]]:
+        depth = state[0]
+        total = self._count(state)
+        children = sorted(self._continuations(state).items(), key=lambda kv: -kv[1][0])
+        for tok, (count, c_lo, c_hi, c_ends) in children:
+            yield tok, (depth + 1, c_lo, c_hi, c_ends), count / total
+
+    def _memory_components(self) -> dict[str, int]:
+        components = super()._memory_components()
+        components["sequence_state"] += deep_bytes(self._slots) + deep_bytes(self._spans)
+        delta = (buffer_bytes(self._dtext) + sys.getsizeof(self._dnew) + buffer_bytes(self._dprev)
+                 + buffer_bytes(self._dnext) + deep_bytes(self._dlast) + deep_bytes(self._dpos))
+        return {
+            "text": self._text.nbytes,
+            "suffix_array": self._sa.nbytes,
+            "lcp": self._lcp.nbytes,
+            "bwt_index": (self._occ.nbytes + self._occ_tokens.nbytes + self._occ_start.nbytes
+                          + self._first.nbytes + self._first_start.nbytes),
+            "delta": sum(buffer_bytes(a) for a in self._fresh.values()) + delta,
+            **components,
+        }
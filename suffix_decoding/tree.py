@@ -0,0 +1,101 @@
+"""Baseline suffix tree: one Python object per node, children in a dict."""
+
+import sys
+from typing import Iterator, Sequence
+
+from .base import SuffixDraft, SuffixEngine
+from .memory import deep_bytes
+
+
+class _Node:
+
+    def __init__(self):
+        self.count = 0
+        self.children = {}
+
+
+class SuffixTree(SuffixEngine):
+    """Reference engine ("Baseline" in the ablation).
+
+    Each sequence keeps the list of nodes its trailing suffixes end at,
+    deepest first, so appending a token touches at most ``max_depth`` nodes.
+    Matching re-walks the tree from the root for every suffix of the context.
+    """
+
+    def __init__(self, max_depth: int = 64):
+        super().__init__(max_depth)
+        self._root = _Node()
+        self._num_nodes = 1
+        self._active: dict[int, list[_Node]] = {}
+
+    @property
+    def num_nodes(self) -> int:
+        return self._num_nodes
+
+    def extend(self, seq_id: int, tokens: Sequence[int]) -> None:
+        active = self._active.setdefault(seq_id, [])
+        for tok in tokens:
+            if len(active) == self.max_depth:
+                # The deepest suffix cannot grow past max_depth.
+                active.pop(0)
+            active.append(self._root)
+            for i, node in enumerate(active):
+                child = node.children.get(tok)
+                if child is None:
+                    child = node.children[tok] = _Node()
+                    self._num_nodes += 1
+                child.count += 1
+                active[i] = child
+            self._root.count += 1
+
+    def finish(self, seq_id: int) -> None:
+        self._active.pop(seq_id, None)
+        super().finish(seq_id)
+
+    def _stored_tokens(self) -> int:
+        return self._root.count
+
+    def _memory_components(self) -> dict[str, int]:
+        nodes = children = counts = 0
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            nodes += sys.getsizeof(node)
+            children += sys.getsizeof(node.children)
+            if node.count > 256:  # Smaller ints are shared by the interpreter.
+                counts += sys.getsizeof(node.count)
+            stack.extend(node.children.values())
+        components = super()._memory_components()
+        components["sequence_state"] += deep_bytes(self._active)
+        return {"nodes": nodes, "child_dicts": children, "counts": counts, **components}
+
+    def _matches(self, context: Sequence[int]) -> Iterator[tuple[_Node, int]]:
+        n = len(context)
+        for start in range(max(0, n - self.depth_cap), n):
+            node = self._root
+            for tok in context[start:]:
+                node = node.children.get(tok)
+                if node is None:
+                    break
+            else:
+                yield node, n - start
+
+    def _draft(self, node: _Node, match_len: int, max_spec_tokens: int,
+               min_token_prob: float) -> SuffixDraft:
+        draft = SuffixDraft(match_len=match_len)
+        prob = 1.0
+        while len(draft.token_ids) < max_spec_tokens and node.children:
+            tok, child = max(node.children.items(), key=lambda kv: kv[1].count)
+            prob *= child.count / node.count
+            if prob < min_token_prob:
+                break
+            draft.parents.append(len(draft.token_ids) - 1)
+            draft.token_ids.append(tok)
+            draft.probs.append(prob)
+            draft.score += prob
+            node = child
+        return draft
+
+    def _children(self, node: _Node) -> Iterator[tuple[int, _Node, float]]:
+        for tok, child in sorted(node.children.items(), key=lambda kv: -kv[1].count):
+            yield tok, child, child.count / node.count
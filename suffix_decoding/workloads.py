@@ -0,0 +1,212 @@
+"""Seeded token-ID workloads with the repetition structure of the evaluated datasets.
+
+The artifact's traces need the datasets and the model, so these generators
+stand in for them offline. Each reproduces the reuse pattern that drives
+suffix decoding on its workload rather than any actual text:
+
+- ``agentic_sql``: a few long SQL templates re-emitted across requests with
+  different slot fillers, under a shared schema prompt (high cross-request
+  reuse).
+- ``swe_bench``: patches that quote most of a source file from the prompt,
+  with a few rewritten lines per hunk (long copies from the prompt).
+- ``blazedit``: the prompt document rewritten with scattered small edits
+  (near-copy of the prompt).
+- ``spec_bench``: open-ended chat, mostly fresh tokens with a little phrase
+  and prompt reuse (low reuse).
+
+Parameters are tuned so LinkedSuffixTree, replayed incrementally at depth
+64 with 32 draft tokens, lands near the published Suffix Decoding (linear)
+tokens/step in ``Workload.published_tokens_per_step``; see
+``benchmarks/workloads.py``.
+"""
+
+import random
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Callable
+
+from .corpus import TraceRequest
+
+
+def _tokens(rng: random.Random, n: int, vocab_size: int) -> list[int]:
+    return [rng.randrange(vocab_size) for _ in range(n)]
+
+
+def _mutate(rng: random.Random, tokens: list[int], rate: float, max_run: int,
+            vocab_size: int) -> list[int]:
+    """Copy ``tokens``, starting a replace, insert or delete run with probability ``rate`` per token."""
+    out: list[int] = []
+    i = 0
+    while i < len(tokens):
+        if rng.random() >= rate:
+            out.append(tokens[i])
+            i += 1
+            continue
+        run = rng.randint(1, max_run)
+        op = rng.random()
+        if op < 0.5:  # Replace.
+            out.extend(_tokens(rng, run, vocab_size))
+            i += run
+        elif op < 0.8:  # Insert.
+            out.extend(_tokens(rng, run, vocab_size))
+        else:  # Delete.
+            i += run
+    return out
+
+
+def agentic_sql_corpus(num_requests: int = 200, vocab_size: int = 32000,
+                       num_schemas: int = 4, schema_len: int = 384,
+                       question_len: int = 48, num_templates: int = 24,
+                       template_len: int = 52, num_slots: int = 3,
+                       fillers_per_slot: int = 6, statements: tuple[int, int] = (2, 5),
+                       seed: int = 0) -> list[TraceRequest]:
+    """Agentic SQL generation: templated statements with slot fillers.
+
+    Every prompt is one of ``num_schemas`` schema preambles plus a fresh
+    question. The response is a few statements, each a template from a
+    shared pool whose ``num_slots`` slots take one of ``fillers_per_slot``
+    short fillers (table and column names) drawn from the schema.
+    """
+    rng = random.Random(seed)
+    schemas = [_tokens(rng, schema_len, vocab_size) for _ in range(num_schemas)]
+    templates = []
+    for _ in range(num_templates):
+        cuts = sorted(rng.sample(range(1, template_len), num_slots))
+        body = _tokens(rng, template_len, vocab_size)
+        templates.append([body[a:b] for a, b in zip([0] + cuts, cuts + [template_len])])
+
+    corpus = []
+    for _ in range(num_requests):
+        schema = rng.randrange(num_schemas)
+        fillers = [[schemas[schema][j:j + rng.randint(1, 3)]
+                    for j in rng.sample(range(schema_len - 3), fillers_per_slot)]
+                   for _ in range(num_slots)]
+        response: list[int] = []
+        for _ in range(rng.randint(*statements)):
+            pieces = rng.choice(templates)
+            response.extend(pieces[0])
+            for slot, piece in enumerate(pieces[1:]):
+                response.extend(rng.choice(fillers[slot]))
+                response.extend(piece)
+        prompt = schemas[schema] + _tokens(rng, question_len, vocab_size)
+        corpus.append(TraceRequest(prompt, response))
+    return corpus
+
+
+def swe_bench_corpus(num_requests: int = 100, vocab_size: int = 32000,
+                     num_files: int = 300, file_len: int = 768,
+                     files_per_prompt: tuple[int, int] = (1, 3),
+                     issue_len: int = 128, hunks: tuple[int, int] = (1, 4),
+                     hunk_len: tuple[int, int] = (64, 256), edit_rate: float = 0.015,
+                     max_edit: int = 12, seed: int = 0) -> list[TraceRequest]:
+    """Repository patching: responses quote hunks of the prompt's files with edits.
+
+    Prompts hold an issue and a few source files from a shared repository
+    pool. The response is a few hunks, each a stretch of one of those files
+    copied with sparse rewritten runs (the changed lines of the patch).
+    """
+    rng = random.Random(seed)
+    files = [_tokens(rng, file_len, vocab_size) for _ in range(num_files)]
+    corpus = []
+    for _ in range(num_requests):
+        shown = rng.sample(files, rng.randint(*files_per_prompt))
+        prompt = _tokens(rng, issue_len, vocab_size)
+        for f in shown:
+            prompt.extend(f)
+        response: list[int] = []
+        for _ in range(rng.randint(*hunks)):
+            f = rng.choice(shown)
+            n = rng.randint(*hunk_len)
+            start = rng.randrange(len(f) - n)
+            response.extend(_mutate(rng, f[start:start + n], edit_rate, max_edit, vocab_size))
+        corpus.append(TraceRequest(prompt, response))
+    return corpus
+
+
+def blazedit_corpus(num_requests: int = 100, vocab_size: int = 32000,
+                    doc_len: tuple[int, int] = (256, 768), instruction_len: int = 32,
+                    edit_rate: float = 0.03, max_edit: int = 8,
+                    seed: int = 0) -> list[TraceRequest]:
+    """Document editing: the response is the prompt document with small edits.
+
+    Documents are unique per request, so all reuse is within the request:
+    the model re-emits the document and diverges at each edit.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(num_requests):
+        doc = _tokens(rng, rng.randint(*doc_len), vocab_size)
+        prompt = _tokens(rng, instruction_len, vocab_size) + doc
+        corpus.append(TraceRequest(prompt, _mutate(rng, doc, edit_rate, max_edit, vocab_size)))
+    return corpus
+
+
+def spec_bench_corpus(num_requests: int = 100, vocab_size: int = 32000,
+                      prompt_len: tuple[int, int] = (64, 512),
+                      response_len: tuple[int, int] = (128, 384),
+                      num_phrases: int = 2000, phrase_len: tuple[int, int] = (2, 8),
+                      phrase_frac: float = 0.12, copy_frac: float = 0.08,
+                      copy_len: tuple[int, int] = (4, 16),
+                      seed: int = 0) -> list[TraceRequest]:
+    """Open-ended chat: mostly fresh tokens, short stock phrases, rare quotes.
+
+    Responses mix fresh tokens, short phrases from a large shared pool (with
+    a Zipf-like preference for common ones) and, with ``copy_frac``, short
+    quotes from the prompt (the summarization and RAG categories).
+    """
+    rng = random.Random(seed)
+    phrases = [_tokens(rng, rng.randint(*phrase_len), vocab_size) for _ in range(num_phrases)]
+    cum_weights = list(accumulate(1 / (rank + 1) for rank in range(num_phrases)))
+
+    corpus = []
+    for _ in range(num_requests):
+        prompt = _tokens(rng, rng.randint(*prompt_len), vocab_size)
+        length = rng.randint(*response_len)
+        response: list[int] = []
+        while len(response) < length:
+            r = rng.random()
+            if r < phrase_frac:
+                response.extend(rng.choices(phrases, cum_weights=cum_weights)[0])
+            elif r < phrase_frac + copy_frac:
+                n = rng.randint(*copy_len)
+                start = rng.randrange(max(1, len(prompt) - n))
+                response.extend(prompt[start:start + n])
+            else:
+                response.append(rng.randrange(vocab_size))
+        corpus.append(TraceRequest(prompt, response[:length]))
+    return corpus
+
+
+@dataclass(frozen=True)
+class Workload:
+    """A generator and the published tokens/step it is tuned against.
+
+    ``published_tokens_per_step`` is Suffix Decoding (linear) from the
+    NeurIPS presentation, or None where no tokens/step was published.
+    """
+
+    name: str
+    generate: Callable[..., list[TraceRequest]]
+    published_tokens_per_step: float | None
+
+
+WORKLOADS = {
+    w.name: w for w in (
+        Workload("agentic_sql", agentic_sql_corpus, 6.3),
+        Workload("swe_bench", swe_bench_corpus, 7.8),
+        Workload("blazedit", blazedit_corpus, None),
+        Workload("spec_bench", spec_bench_corpus, 1.8),
+    )
+}
+
+
+def workload_corpus(name: str, num_requests: int | None = None, seed: int = 0,
+                    **kwargs) -> list[TraceRequest]:
+    """Generate the named workload; ``kwargs`` override the generator's defaults."""
+    try:
+        workload = WORKLOADS[name]
+    except KeyError:
+        raise ValueError(f"unknown workload {name!r}; choose from {sorted(WORKLOADS)}") from None
+    if num_requests is not None:
+        kwargs["num_requests"] = num_requests
+    return workload.generate(seed=seed, **kwargs)